@@ -7,7 +7,7 @@ from flask import Flask
 from flask_cors import CORS
 
 # Importer les modules existants
-from questionnaire_logic import EORTCQuestionnaire
+from questionnaire_logic import EORTCQuestionnaire, spoken_texts
 from audio_handler_simple_flask import (
     AudioHandlerSimple as AudioHandler,
     VoiceRecognitionHandler,
@@ -22,6 +22,15 @@ from config_flask import Config
 
 # Importer la base de données
 from models.database_flask import DatabaseManager
+from models.analytics_flask import CohortAnalytics
+from audio_index_flask import AudioIndex
+from audio_stitch_flask import ResultAudioStitcher
+from speech_client_flask import SpeechClient
+from transcription_jobs_flask import TranscriptionExecutor
+from voice_activity_flask import VoiceActivityDetector
+
+# Commandes CLI (flask --app app_flask ...)
+from cli_flask import register_commands
 
 
 def create_app():
@@ -41,17 +50,46 @@ def create_app():
 
     # Initialiser les gestionnaires
     app.questionnaire = EORTCQuestionnaire()
-    app.db = DatabaseManager()
 
-    # Forcer l'initialisation de la base de données
+    # Index des audios pré-générés (parcouru une fois, puis si un dossier change)
+    app.audio_index = AudioIndex(
+        app.config["AUDIO_CACHE_DIR"],
+        check_interval=app.config["AUDIO_INDEX_CHECK_SECONDS"],
+        renditions_dir=app.config["AUDIO_RENDITIONS_DIR"],
+        bundle_path=app.config["AUDIO_BUNDLE_PATH"],
+    )
+    app.audio_index.register_questions(
+        {number: q.speech_text for number, q in app.questionnaire.questions.items()}
+    )
+    # Message de fin assemblé à partir de segments pré-générés (mémorisé)
+    app.result_audio = ResultAudioStitcher(app.audio_index)
+    # Un seul gestionnaire de base par processus, partagé par toutes les routes
+    app.db = DatabaseManager(
+        app.config["DATABASE_PATH"],
+        pool_size=app.config["DB_POOL_SIZE"],
+        busy_timeout_ms=app.config["DB_BUSY_TIMEOUT_MS"],
+        mmap_size=app.config["DB_MMAP_SIZE"],
+        synchronous=app.config["DB_SYNCHRONOUS"],
+        write_behind=app.config["DB_WRITE_BEHIND"],
+        write_behind_max_pending=app.config["DB_WRITE_BEHIND_MAX_PENDING"],
+        write_behind_max_delay_ms=app.config["DB_WRITE_BEHIND_MAX_DELAY_MS"],
+    )
+
+    # Migrer le schéma une seule fois au démarrage (pas à chaque requête)
     print("INFO: Initialisation de la base de donnees...")
     try:
-        # Tester la connexion
-        test_session = app.db.get_session("test")
-        print("INFO: Base de donnees initialisee avec succes")
+        schema_version = app.db.migrate()
+        print(f"INFO: Base de donnees initialisee (schema v{schema_version})")
     except Exception as e:
         print(f"WARNING: Erreur initialisation base: {e}")
 
+    # Agrégats de cohorte construits à la première demande, puis par jour modifié
+    app.analytics = CohortAnalytics(
+        app.db,
+        refresh_interval=app.config["ANALYTICS_REFRESH_SECONDS"],
+        rebuild_interval=app.config["ANALYTICS_REBUILD_SECONDS"],
+    )
+
     # Configuration audio (mode préenregistré par défaut)
     api_key = os.environ.get("GOOGLE_CLOUD_API_KEY")
     if api_key and api_key.strip():
@@ -59,7 +97,13 @@ def create_app():
             api_key=api_key,
             use_gemini_tts=app.config.get("USE_GEMINI_TTS", False),
             use_pro_model=app.config.get("USE_PRO_MODEL", False),
+            api_url=app.config.get("TTS_API_URL"),
+            max_cache_bytes=app.config["AUDIO_CACHE_MAX_BYTES"],
         )
+        # Questions, messages de fin et test audio : jamais évincés du cache
+        app.audio_handler.pin_texts(spoken_texts().values())
+        # Fichier évincé : retiré de l'index, plus d'URL vers un fichier absent
+        app.audio_handler.on_evict = app.audio_index.forget
         print("INFO: Audio handler configuré avec API TTS")
     else:
         app.audio_handler = None
@@ -67,10 +111,36 @@ def create_app():
 
     app.voice_handler = VoiceRecognitionHandler()
 
+    # Client Speech-to-Text partagé : connexions réutilisées d'un extrait à l'autre
+    app.speech_client = SpeechClient(
+        api_key=app.config.get("GOOGLE_CLOUD_API_KEY") or os.environ.get("GOOGLE_CLOUD_API_KEY"),
+        api_url=app.config.get("STT_API_URL"),
+        pool_size=app.config["STT_POOL_SIZE"],
+        connect_timeout=app.config["STT_CONNECT_TIMEOUT"],
+        read_timeout=app.config["STT_READ_TIMEOUT"],
+        retries=app.config["STT_RETRIES"],
+    )
+    # Extraits PCM silencieux écartés, silences retirés avant l'appel amont
+    app.voice_activity = VoiceActivityDetector(
+        threshold_db=app.config["VAD_THRESHOLD_DB"],
+        min_speech_ms=app.config["VAD_MIN_SPEECH_MS"],
+        padding_ms=app.config["VAD_PADDING_MS"],
+    )
+    # Appels Speech-to-Text hors des threads de requête (mode asynchrone)
+    app.transcriptions = TranscriptionExecutor(
+        app.db,
+        max_workers=app.config["TRANSCRIPTION_WORKERS"],
+        max_pending=app.config["TRANSCRIPTION_MAX_PENDING"],
+        job_ttl=app.config["TRANSCRIPTION_JOB_TTL_SECONDS"],
+    )
+
     # Enregistrer les blueprints
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix="/api")
 
+    # Enregistrer les commandes CLI
+    register_commands(app)
+
     # Créer les dossiers nécessaires
     os.makedirs("data", exist_ok=True)
     os.makedirs("static/audio_cache", exist_ok=True)
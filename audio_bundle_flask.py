@@ -0,0 +1,219 @@
+"""
+Paquet audio unique (« bundle ») adressé par contenu
+
+Les audios pré-générés existent en double (``.audio_cache`` et
+``static/audio_cache``) et chaque requête ouvrait son propre fichier.
+L'outil de paquetage regroupe tous les extraits dans un seul fichier,
+dédupliqués par hash de contenu :
+
+    EORTCAB1 | longueur de l'en-tête (u32) | en-tête JSON | extraits alignés
+
+L'en-tête indexe ``content_hash -> [offset, taille, durée]`` et
+``hash du texte -> content_hash``. Chaque extrait est aligné sur 4 Ko (une
+page) : une lecture ne touche que les pages de son extrait.
+
+Le serveur projette le paquet en mémoire (mmap) une fois par worker ; les
+extraits sont servis par ``sendfile`` via ``wsgi.file_wrapper`` (gunicorn)
+ou, à défaut, par tranches ``memoryview`` du mmap.
+
+Utilisation : ``python audio_bundle_flask.py [sortie]`` ou
+``flask --app app_flask pack-audio-bundle``.
+"""
+
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+MAGIC = b"EORTCAB1"
+FORMAT_VERSION = 1
+ALIGNMENT = 4096
+CHUNK_SIZE = 64 * 1024
+
+
+class BundleClip(NamedTuple):
+    """Position d'un extrait dans le paquet"""
+
+    offset: int
+    size: int
+    duration: Optional[float]
+
+
+def _aligned(position: int) -> int:
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def pack_bundle(output, source_dirs: Iterable, voice_name: str = "Achernar") -> Dict:
+    """Regroupe les audios des dossiers sources dans un paquet (écriture atomique)
+
+    Les dossiers sont parcourus dans l'ordre donné : pour un même texte, le
+    premier fichier trouvé l'emporte (même règle que ``AudioIndex``). Les
+    contenus identiques ne sont stockés qu'une fois.
+    """
+    from audio_index_flask import AudioIndex
+
+    texts: Dict[str, str] = {}
+    sources = {}
+    files = 0
+    source_bytes = 0
+    for directory in source_dirs:
+        index = AudioIndex(directory, voice_name=voice_name, check_interval=float("inf"))
+        for entry in index.entries():
+            files += 1
+            source_bytes += entry.size
+            texts.setdefault(entry.text_hash, entry.content_hash)
+            sources.setdefault(entry.content_hash, entry)
+
+    # Offsets calculés avant écriture : l'en-tête les contient
+    clips = {}
+    data_start = 0
+    while True:
+        # La taille de l'en-tête dépend des offsets (nombre de chiffres) : on
+        # recalcule jusqu'à stabilité (la taille ne fait que croître)
+        position = data_start
+        for content_hash in sorted(sources):
+            entry = sources[content_hash]
+            clips[content_hash] = [position, entry.size, entry.duration]
+            position = _aligned(position + entry.size)
+        header = {
+            "version": FORMAT_VERSION,
+            "voice": voice_name,
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "clips": clips,
+            "texts": texts,
+        }
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        needed = _aligned(len(MAGIC) + 4 + len(encoded))
+        if needed == data_start:
+            break
+        data_start = needed
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=output.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+            for content_hash in sorted(sources):
+                offset, size, _ = clips[content_hash]
+                f.seek(offset)
+                data = sources[content_hash].path.read_bytes()
+                if len(data) != size:
+                    raise ValueError(f"Fichier modifié pendant le paquetage: {sources[content_hash].path}")
+                f.write(data)
+            f.truncate(_aligned(f.tell()))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    return {
+        "path": str(output),
+        "files": files,
+        "texts": len(texts),
+        "clips": len(clips),
+        "source_bytes": source_bytes,
+        "bundle_bytes": output.stat().st_size,
+    }
+
+
+class AudioBundle:
+    """Paquet projeté en mémoire (lecture seule, partagé par les threads du worker)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.size = stat.st_size
+            self.mtime = stat.st_mtime
+            self._inode = (stat.st_dev, stat.st_ino)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"Paquet audio invalide: {self.path}")
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start : start + header_len])
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Version de paquet non supportée: {header.get('version')}")
+
+        self.voice_name = header["voice"]
+        self.created_at = header["created_at"]
+        self.clips: Dict[str, BundleClip] = {
+            content_hash: BundleClip(*values) for content_hash, values in header["clips"].items()
+        }
+        self.texts: Dict[str, str] = header["texts"]
+
+        for clip in self.clips.values():
+            if clip.offset + clip.size > self.size:
+                raise ValueError(f"Paquet audio tronqué: {self.path}")
+
+    def view(self, clip: BundleClip, start: int = 0, length: Optional[int] = None) -> memoryview:
+        """Tranche de l'extrait sans copie (valide tant que le paquet est référencé)"""
+        if length is None:
+            length = clip.size - start
+        return memoryview(self._mmap)[clip.offset + start : clip.offset + start + length]
+
+    def iter_clip(self, clip: BundleClip, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """Contenu de l'extrait par blocs (les serveurs WSGI exigent des bytes)"""
+        view = self.view(clip, start, length)
+        for position in range(0, len(view), CHUNK_SIZE):
+            yield view[position : position + CHUNK_SIZE].tobytes()
+
+    def open_clip(self, clip: BundleClip, start: int = 0):
+        """Fichier positionné sur l'extrait, pour ``sendfile`` (descripteur propre à
+        la requête : la position de lecture n'est pas partagée entre threads)
+
+        Retourne None si le paquet a été remplacé sur disque depuis sa
+        projection (les offsets ne seraient plus valides).
+        """
+        try:
+            f = open(self.path, "rb", buffering=0)
+        except OSError:
+            return None
+        stat = os.fstat(f.fileno())
+        if (stat.st_dev, stat.st_ino) != self._inode:
+            f.close()
+            return None
+        f.seek(clip.offset + start)
+        return f
+
+    def stats(self) -> Dict:
+        return {
+            "path": str(self.path),
+            "size": self.size,
+            "clips": len(self.clips),
+            "texts": len(self.texts),
+            "created_at": self.created_at,
+        }
+
+
+def main(argv=None) -> int:
+    """Paquetage hors application (commande de build du déploiement)"""
+    from config_flask import Config
+
+    args = argv if argv is not None else sys.argv[1:]
+    output = args[0] if args else Config.AUDIO_BUNDLE_PATH
+    print_report(pack_bundle(output, Config.AUDIO_BUNDLE_SOURCES))
+    return 0
+
+
+def print_report(report: Dict, echo=print):
+    echo(
+        f"Paquet {report['path']} : {report['files']} fichiers, {report['texts']} textes, "
+        f"{report['clips']} extraits uniques"
+    )
+    echo(
+        f"  {report['source_bytes'] / 1024 / 1024:.1f} Mo sources -> "
+        f"{report['bundle_bytes'] / 1024 / 1024:.1f} Mo"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
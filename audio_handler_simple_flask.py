@@ -13,19 +13,52 @@ import os
 import hashlib
 import wave
 import struct
-from typing import Optional, List
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
+import base64
 import re
+from collections import OrderedDict, deque
+
+
+class SynthesisError(Exception):
+    """Échec de synthèse ; ``retryable`` si un nouvel essai peut réussir
+    (erreur réseau, quota 429, erreur serveur 5xx)"""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: float = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class _Flight:
+    """Synthèse en cours d'un texte, attendue par les requêtes concurrentes"""
+
+    __slots__ = ("done", "path", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.path = None
+        self.error = None
 
 
 class AudioHandlerSimple:
-    """Gestionnaire audio simplifié pour le web"""
+    """Gestionnaire audio simplifié pour le web
+
+    Synthèse à la demande (``get_or_synthesize``) : une seule requête amont
+    par texte, les requêtes concurrentes attendent son résultat. Le cache est
+    borné en octets (``max_cache_bytes``) avec éviction LRU ; les textes
+    épinglés (audios du questionnaire) ne sont jamais évincés.
+    """
 
     def __init__(
         self,
         api_key: str = None,
         use_gemini_tts: bool = False,
         use_pro_model: bool = True,
+        api_url: str = None,
+        cache_dir=None,
+        timeout: tuple = (5, 120),
+        max_cache_bytes: int = None,
     ):
         self.api_key = api_key or os.environ.get("GOOGLE_CLOUD_API_KEY")
         if not self.api_key:
@@ -49,6 +82,11 @@ class AudioHandlerSimple:
             self.language_code = "fr-FR"
             print("Utilisation de Cloud Text-to-Speech (voix Neural2)")
 
+        # URL d'API surchargeable (serveur TTS local de test, proxy)
+        if api_url:
+            self.api_url = api_url
+        self.timeout = timeout
+
         self.is_speaking = False
         self.current_thread = None
         self.stop_flag = threading.Event()
@@ -59,17 +97,166 @@ class AudioHandlerSimple:
         )
 
         project_dir = Path(__file__).parent
-        self.cache_dir = project_dir / "static" / "audio_cache" / cache_type
+        # Chemin absolu : les chemins de l'index (relatifs) y sont ramenés
+        self.cache_dir = Path(
+            os.path.abspath(
+                cache_dir if cache_dir else project_dir / "static" / "audio_cache" / cache_type
+            )
+        )
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
         print(f"Cache permanent : {self.cache_dir}")
 
+        # Synthèses en cours (hash du texte -> _Flight)
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+        # LRU des fichiers du cache (chemin -> taille), du moins au plus récent
+        self.max_cache_bytes = max_cache_bytes
+        self._lru: "OrderedDict[Path, int]" = OrderedDict()
+        self._cache_bytes = 0
+        self._pinned = set()
+        self._cache_lock = threading.Lock()
+        # Rappel (chemin) après chaque éviction : l'index audio oublie le fichier
+        self.on_evict = None
+        self._load_lru()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "synthesized": 0,
+            "errors": 0,
+            "evictions": 0,
+            "evicted_bytes": 0,
+        }
+        self._latencies = deque(maxlen=200)
+
     def _get_cache_path(self, text: str, use_style_prompt: bool = True) -> Path:
         """Génère le chemin de cache pour un texte donné"""
         cache_key = f"{self.voice_name}_{text}"
         text_hash = hashlib.md5(cache_key.encode("utf-8")).hexdigest()
         return self.cache_dir / f"{text_hash}.wav"
 
+    # ------------------------------------------------------------------
+    # Cache borné (LRU) et épinglage
+    # ------------------------------------------------------------------
+
+    def _load_lru(self):
+        """Ordre initial : date de modification (le plus ancien évincé en premier)"""
+        try:
+            files = sorted(
+                ((f.stat().st_mtime, f, f.stat().st_size) for f in self.cache_dir.glob("*.wav")),
+                key=lambda item: item[0],
+            )
+        except OSError:
+            files = []
+        for _, path, size in files:
+            self._lru[path] = size
+            self._cache_bytes += size
+
+    def pin_texts(self, texts):
+        """Épingle des textes : leurs fichiers ne sont jamais évincés"""
+        with self._cache_lock:
+            self._pinned.update(self._get_cache_path(text) for text in texts)
+
+    def may_evict(self, path: Path) -> bool:
+        """Fichier de ce cache susceptible d'être évincé (par ce worker ou un autre)"""
+        key = Path(os.path.abspath(path))
+        return (
+            self.max_cache_bytes is not None
+            and key.parent == self.cache_dir
+            and key not in self._pinned
+        )
+
+    def record_hit(self, path: Path) -> bool:
+        """Signale un fichier servi depuis le cache (compteur et ordre LRU)
+
+        Seuls les fichiers évinçables du LRU comptent : un audio épinglé ou
+        hors de ce cache n'est pas un hit de la synthèse à la demande.
+        """
+        key = Path(os.path.abspath(path))
+        with self._cache_lock:
+            if key not in self._lru or key in self._pinned:
+                return False
+            self._lru.move_to_end(key)
+            self._stats["hits"] += 1
+        return True
+
+    def _register(self, path: Path):
+        """Ajoute un fichier synthétisé au LRU puis évince au-delà du budget"""
+        size = path.stat().st_size
+        evicted = []
+        with self._cache_lock:
+            self._cache_bytes += size - self._lru.pop(path, 0)
+            self._lru[path] = size
+            if self.max_cache_bytes is None:
+                return
+            for victim in list(self._lru):
+                if self._cache_bytes <= self.max_cache_bytes:
+                    break
+                if victim in self._pinned or victim == path:
+                    continue
+                victim_size = self._lru.pop(victim)
+                self._cache_bytes -= victim_size
+                self._stats["evictions"] += 1
+                self._stats["evicted_bytes"] += victim_size
+                try:
+                    victim.unlink()
+                except FileNotFoundError:
+                    pass
+                evicted.append(victim)
+                print(f"INFO: Audio évincé du cache : {victim.name}")
+        # Hors verrou : l'index ne doit plus fournir l'URL d'un fichier supprimé
+        if self.on_evict is not None:
+            for victim in evicted:
+                self.on_evict(victim)
+
+    # ------------------------------------------------------------------
+    # Synthèse à la demande (single-flight)
+    # ------------------------------------------------------------------
+
+    def get_or_synthesize(self, text: str) -> Path:
+        """Fichier audio d'un texte, synthétisé à la demande s'il manque
+
+        Une seule synthèse par texte à la fois : les requêtes concurrentes
+        attendent celle en cours. Lève SynthesisError en cas d'échec.
+        """
+        cache_path = self._get_cache_path(text)
+        if cache_path.exists():
+            self.record_hit(cache_path)
+            return cache_path
+
+        with self._flights_lock:
+            flight = self._flights.get(cache_path.stem)
+            leader = flight is None
+            if leader:
+                flight = self._flights[cache_path.stem] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            if not flight.done.wait(timeout=sum(self.timeout)):
+                raise SynthesisError("Délai dépassé en attente de la synthèse", retryable=True)
+            if flight.error is not None:
+                raise flight.error
+            return flight.path
+
+        self._stats["misses"] += 1
+        try:
+            self.synthesize_to_cache(text)
+            self._register(cache_path)
+            flight.path = cache_path
+            return cache_path
+        except Exception as e:
+            self._stats["errors"] += 1
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[cache_path.stem]
+            flight.done.set()
+
     def get_audio_path(self, text: str) -> Optional[Path]:
         """Retourne le chemin du fichier audio (pour lecture web)"""
         cache_path = self._get_cache_path(text)
@@ -77,31 +264,152 @@ class AudioHandlerSimple:
             return cache_path
         return None
 
-    def get_cache_info(self) -> dict:
-        """Retourne des informations détaillées sur le cache"""
-        try:
-            files = list(self.cache_dir.glob("*.wav"))
-            total_size = sum(f.stat().st_size for f in files)
-            return {
-                "count": len(files),
-                "size_bytes": total_size,
-                "size_mb": total_size / (1024 * 1024),
-                "path": str(self.cache_dir),
-            }
-        except:
+    # Format PCM renvoyé par Gemini TTS (audio/L16 brut, sans en-tête)
+    GEMINI_SAMPLE_RATE = 24000
+
+    def _request_body(self, text: str) -> dict:
+        if self.use_gemini_tts:
             return {
-                "count": 0,
-                "size_bytes": 0,
-                "size_mb": 0,
-                "path": str(self.cache_dir),
+                "contents": [{"parts": [{"text": text}]}],
+                "generationConfig": {
+                    "responseModalities": ["AUDIO"],
+                    "speechConfig": {
+                        "voiceConfig": {
+                            "prebuiltVoiceConfig": {"voiceName": self.voice_name}
+                        }
+                    },
+                },
             }
+        return {
+            "input": {"text": text},
+            "voice": {"languageCode": self.language_code, "name": self.voice_name},
+            "audioConfig": {
+                "audioEncoding": "LINEAR16",
+                "sampleRateHertz": self.GEMINI_SAMPLE_RATE,
+            },
+        }
+
+    @staticmethod
+    def _pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+        """Ajoute un en-tête WAV (mono, 16 bits) à du PCM brut"""
+        header = struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + len(pcm), b"WAVE",
+            b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+            b"data", len(pcm),
+        )
+        return header + pcm
+
+    def synthesize(self, text: str, session: requests.Session = None) -> bytes:
+        """Synthétise un texte et retourne le fichier WAV (bytes)
+
+        Lève SynthesisError (``retryable`` pour réseau, 429 et 5xx).
+        """
+        http = session or requests
+        started = time.perf_counter()
+        try:
+            response = http.post(
+                self.api_url,
+                params={"key": self.api_key} if self.api_key else None,
+                json=self._request_body(text),
+                timeout=self.timeout,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise SynthesisError(f"Erreur réseau TTS: {e}", retryable=True)
+        finally:
+            self._latencies.append(time.perf_counter() - started)
+
+        if response.status_code != 200:
+            retry_after = response.headers.get("Retry-After")
+            raise SynthesisError(
+                f"Erreur TTS {response.status_code}: {response.text[:200]}",
+                retryable=response.status_code == 429 or response.status_code >= 500,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+
+        try:
+            payload = response.json()
+            if self.use_gemini_tts:
+                part = payload["candidates"][0]["content"]["parts"][0]["inlineData"]
+                audio = self._pcm_to_wav(
+                    base64.b64decode(part["data"]), self.GEMINI_SAMPLE_RATE
+                )
+            else:
+                # LINEAR16 : Cloud TTS renvoie un WAV complet
+                audio = base64.b64decode(payload["audioContent"])
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise SynthesisError(f"Réponse TTS invalide: {e}")
+
+        if not audio.startswith(b"RIFF"):
+            raise SynthesisError("Réponse TTS invalide: WAV attendu")
+        self._stats["synthesized"] += 1
+        return audio
+
+    def synthesize_to_cache(
+        self, text: str, force: bool = False, session: requests.Session = None
+    ) -> Optional[Path]:
+        """Synthétise un texte dans le cache ; None s'il y était déjà
+
+        Écriture atomique (fichier temporaire puis ``os.replace``) : un
+        fichier du cache est toujours complet, même après interruption.
+        """
+        cache_path = self._get_cache_path(text)
+        if cache_path.exists() and not force:
+            return None
+
+        audio = self.synthesize(text, session=session)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, cache_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return cache_path
+
+    def get_cache_info(self) -> dict:
+        """Retourne des informations détaillées sur le cache"""
+        with self._cache_lock:
+            count = len(self._lru)
+            total_size = self._cache_bytes
+            pinned = sum(1 for path in self._pinned if path in self._lru)
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        latencies = sorted(self._latencies)
+        return {
+            "count": count,
+            "size_bytes": total_size,
+            "size_mb": total_size / (1024 * 1024),
+            "max_bytes": self.max_cache_bytes,
+            "pinned": pinned,
+            "path": str(self.cache_dir),
+            **stats,
+            "hit_ratio": stats["hits"] / lookups if lookups else 0.0,
+            "in_flight": len(self._flights),
+            "upstream_latency_ms": {
+                "count": len(latencies),
+                "p50": latencies[len(latencies) // 2] * 1000 if latencies else None,
+                "p95": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None,
+                "max": latencies[-1] * 1000 if latencies else None,
+            },
+        }
 
 
 class VoiceRecognitionHandler:
     """Gestionnaire de reconnaissance vocale TRÈS amélioré"""
 
+    # L'API Speech-to-Text ne renseigne la confiance que de la première
+    # hypothèse : les suivantes se partagent le reste (1 - confiance) en
+    # parts décroissantes de ce facteur
+    ALTERNATIVE_DECAY = 0.6
+
     def __init__(self):
         self.recognition_enabled = False
+        # Interprétations N-best : reconnues, et reconnues grâce à une
+        # alternative autre que la première (une répétition évitée)
+        self.stats = {"interpretations": 0, "matched": 0, "rescued": 0}
         print("INFO Reconnaissance vocale configurée pour Web Speech API uniquement")
 
     def _normalize_text(self, text: str) -> str:
@@ -139,6 +447,78 @@ class VoiceRecognitionHandler:
 
         return False
 
+    def interpret_alternatives(
+        self,
+        alternatives: List[Dict],
+        scale: str,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[Dict]:
+        """Interprète toutes les hypothèses de la reconnaissance (N-best)
+
+        ``alternatives`` : ``{"transcript", "confidence"}`` par ordre de
+        vraisemblance, non filtrées. Chaque hypothèse est interprétée ; les
+        hypothèses qui désignent le même score cumulent leur confiance (OU
+        bruité : 1 - produit des (1 - confiance)). Le score de confiance
+        cumulée maximale l'emporte (à égalité, celui de l'hypothèse la mieux
+        classée).
+
+        ``accept(transcript)`` écarte les hypothèses qui ne sont pas des
+        réponses (commande de navigation, phrase) après le calcul de leur
+        poids : une première hypothèse écartée garde sa part de confiance,
+        les suivantes ne prennent pas sa place.
+
+        Retourne ``{"score", "confidence", "transcript", "scores"}`` ou None
+        si aucune hypothèse n'est interprétable. Une première hypothèse sans
+        confiance compte pour 1 si elle est seule (transcription unique),
+        sinon pour ``1 - ALTERNATIVE_DECAY``.
+        """
+        self.stats["interpretations"] += 1
+        combined: Dict[int, float] = {}
+        best_transcript: Dict[int, tuple] = {}
+        first_score = None
+        share = 0.0
+        for rank, alternative in enumerate(alternatives):
+            confidence = min(float(alternative.get("confidence") or 0.0), 1.0)
+            if rank == 0:
+                if confidence > 0:
+                    weight = confidence
+                else:
+                    weight = 1.0 if len(alternatives) == 1 else 1 - self.ALTERNATIVE_DECAY
+                share = (1 - weight) * (1 - self.ALTERNATIVE_DECAY)
+            else:
+                weight = confidence if confidence > 0 else share
+                share *= self.ALTERNATIVE_DECAY
+
+            transcript = alternative.get("transcript", "")
+            if accept is not None and not accept(transcript):
+                continue
+            score = self.interpret_response(transcript, scale)
+            if rank == 0:
+                first_score = score
+            if not score:
+                continue
+            combined[score] = 1 - (1 - combined.get(score, 0.0)) * (1 - weight)
+            if score not in best_transcript or weight > best_transcript[score][0]:
+                best_transcript[score] = (weight, rank, alternative["transcript"])
+
+        if not combined:
+            return None
+
+        score = max(combined, key=lambda s: (combined[s], -best_transcript[s][1]))
+        self.stats["matched"] += 1
+        if score != first_score:
+            self.stats["rescued"] += 1
+        print(
+            f"OK - N-best: {score} (confiance cumulée {combined[score]:.2f}, "
+            f"{len(alternatives)} hypothèses, scores {combined})"
+        )
+        return {
+            "score": score,
+            "confidence": combined[score],
+            "transcript": best_transcript[score][2],
+            "scores": combined,
+        }
+
     def interpret_response(self, text: str, scale: str) -> Optional[int]:
         """Interprète une réponse vocale et retourne le score"""
         if not text:
@@ -0,0 +1,354 @@
+"""
+Index en mémoire des fichiers audio pré-générés
+
+Remplace la recherche par ``glob`` à chaque requête : le cache
+(``static/audio_cache`` et ses sous-dossiers) est parcouru une fois au
+démarrage puis seulement quand la date de modification d'un dossier change
+(vérification limitée à une fois toutes les ``check_interval`` secondes) ou
+sur rechargement explicite. Une recherche est un accès dictionnaire.
+
+Chaque fichier est aussi indexé par le hash de son contenu : c'est la clé
+des URL immuables ``/api/audio/<hash>.wav``. Ce hash (SHA-256) est calculé
+au parcours, pour chaque fichier nouveau ou modifié : le premier parcours
+lit donc tous les fichiers, les suivants réutilisent les entrées
+inchangées. Les variantes compressées (``audio_renditions_flask``) sont
+rattachées au fichier source par ce hash.
+
+Si un paquet audio (``audio_bundle_flask``) est configuré, il est projeté en
+mémoire et ses extraits complètent l'index : un déploiement peut ne livrer
+que le paquet.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+from audio_bundle_flask import AudioBundle, BundleClip
+
+
+class AudioEntry:
+    """Fichier audio résolu (chemin, taille, date, durée, hash du contenu)
+
+    Durée et hash sont calculés à la construction (lecture du fichier).
+    """
+
+    __slots__ = ("path", "text_hash", "size", "mtime", "duration", "content_hash", "renditions")
+
+    def __init__(self, path: Path, size: int, mtime: float):
+        self.path = path
+        self.text_hash = path.stem
+        self.size = size
+        self.mtime = mtime
+        self.duration = self._read_duration(path)
+        self.content_hash = hashlib.sha256(path.read_bytes()).hexdigest()[:32]
+        # codec -> (chemin, taille) des variantes compressées disponibles
+        self.renditions: Dict[str, tuple] = {}
+
+    @classmethod
+    def from_bundle(cls, text_hash: str, content_hash: str, clip: BundleClip, mtime: float) -> "AudioEntry":
+        """Entrée présente uniquement dans le paquet audio (pas de fichier)"""
+        entry = cls.__new__(cls)
+        entry.path = None
+        entry.text_hash = text_hash
+        entry.size = clip.size
+        entry.mtime = mtime
+        entry.duration = clip.duration
+        entry.content_hash = content_hash
+        entry.renditions = {}
+        return entry
+
+    @staticmethod
+    def _read_duration(path: Path) -> Optional[float]:
+        try:
+            with wave.open(str(path), "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError, OSError):
+            return None
+
+
+class AudioIndex:
+    """Index hash du texte -> fichier audio, et question -> fichier audio"""
+
+    def __init__(
+        self,
+        base_dir="static/audio_cache",
+        voice_name: str = "Achernar",
+        check_interval: float = 5.0,
+        renditions_dir=None,
+        bundle_path=None,
+    ):
+        self.base_dir = Path(base_dir)
+        self.renditions_dir = Path(renditions_dir) if renditions_dir else None
+        self.bundle_path = Path(bundle_path) if bundle_path else None
+        self.bundle: Optional[AudioBundle] = None
+        self.voice_name = voice_name
+        self.check_interval = check_interval
+
+        self._entries: Dict[str, AudioEntry] = {}
+        self._by_content: Dict[str, AudioEntry] = {}
+        self._question_hashes: Dict[int, str] = {}
+        self._dir_mtimes: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._scans = 0
+        self._last_scan_ms = 0.0
+
+        self.reload()
+
+    def text_hash(self, text: str) -> str:
+        """Même clé que ``AudioHandlerSimple._get_cache_path``"""
+        return hashlib.md5(f"{self.voice_name}_{text}".encode("utf-8")).hexdigest()
+
+    def register_questions(self, speech_texts: Mapping[int, str]):
+        """Associe les numéros de question au hash de leur texte de synthèse"""
+        self._question_hashes = {
+            number: self.text_hash(text) for number, text in speech_texts.items()
+        }
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def lookup(self, text: str) -> Optional[AudioEntry]:
+        """Fichier audio d'un texte (None si absent du cache)"""
+        return self._get(self.text_hash(text))
+
+    def for_question(self, question_num: int) -> Optional[AudioEntry]:
+        """Fichier audio d'une question (None si absent du cache)"""
+        text_hash = self._question_hashes.get(question_num)
+        return self._get(text_hash) if text_hash else None
+
+    def for_text_hash(self, text_hash: str) -> Optional[AudioEntry]:
+        """Fichier audio désigné par son nom (hash du texte, toute voix confondue)"""
+        return self._get(text_hash)
+
+    def for_content_hash(self, content_hash: str) -> Optional[AudioEntry]:
+        """Fichier audio désigné par le hash de son contenu (URL immuable)"""
+        return self._get(content_hash, self._by_content)
+
+    def bundle_clip(self, content_hash: str) -> Tuple[Optional[AudioBundle], Optional[BundleClip]]:
+        """Paquet courant et position de l'extrait (None si absent du paquet)
+
+        Le paquet est retourné avec l'extrait : un rechargement concurrent ne
+        peut pas associer un offset à un autre paquet.
+        """
+        bundle = self.bundle
+        if bundle is None:
+            return None, None
+        return bundle, bundle.clips.get(content_hash)
+
+    def forget(self, path) -> bool:
+        """Retire un fichier supprimé du cache (éviction) sans attendre le parcours
+
+        Retourne False si l'index ne désigne pas ce fichier.
+        """
+        target = os.path.abspath(path)
+        text_hash = Path(path).stem
+        with self._lock:
+            entry = self._entries.get(text_hash)
+            if entry is None or entry.path is None or os.path.abspath(entry.path) != target:
+                return False
+            # Copies remplacées d'un bloc : les lecteurs sans verrou restent cohérents
+            entries = dict(self._entries)
+            del entries[text_hash]
+            by_content = dict(self._by_content)
+            if by_content.get(entry.content_hash) is entry:
+                del by_content[entry.content_hash]
+                same = next((e for e in entries.values() if e.content_hash == entry.content_hash), None)
+                if same is not None:
+                    by_content[entry.content_hash] = same
+            self._entries = entries
+            self._by_content = by_content
+        return True
+
+    def entries(self):
+        """Tous les fichiers indexés"""
+        self._maybe_refresh()
+        return list(self._entries.values())
+
+    def any_entry(self) -> Optional[AudioEntry]:
+        """Un fichier quelconque du cache (repli du test audio)"""
+        self._maybe_refresh()
+        return next(iter(self._entries.values()), None)
+
+    def _get(self, key: str, entries: Optional[Dict[str, AudioEntry]] = None) -> Optional[AudioEntry]:
+        self._maybe_refresh()
+        entry = (self._entries if entries is None else entries).get(key)
+        # Compteurs approximatifs sous concurrence : pas de verrou sur le chemin chaud
+        if entry is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return entry
+
+    # ------------------------------------------------------------------
+    # Fraîcheur
+    # ------------------------------------------------------------------
+
+    def _directories(self):
+        yield self.base_dir
+        if self.base_dir.is_dir():
+            for child in sorted(self.base_dir.iterdir()):
+                if child.is_dir():
+                    yield child
+
+    def _rendition_directories(self):
+        if self.renditions_dir is None or not self.renditions_dir.is_dir():
+            return
+        yield self.renditions_dir
+        for child in sorted(self.renditions_dir.iterdir()):
+            if child.is_dir():
+                yield child
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            # Un fichier ajouté, supprimé ou remplacé change le mtime de son dossier
+            if self._snapshot_mtimes() != self._dir_mtimes:
+                self._scan()
+
+    def _snapshot_mtimes(self) -> Dict[str, float]:
+        mtimes = {}
+        for directory in (*self._directories(), *self._rendition_directories()):
+            try:
+                mtimes[str(directory)] = directory.stat().st_mtime
+            except OSError:
+                pass
+        if self.bundle_path is not None:
+            try:
+                stat = self.bundle_path.stat()
+                mtimes[f"bundle:{self.bundle_path}"] = (stat.st_mtime, stat.st_ino)
+            except OSError:
+                pass
+        return mtimes
+
+    def reload(self) -> Dict:
+        """Reconstruit l'index immédiatement ; retourne les statistiques"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._scan()
+        return self.stats()
+
+    def _scan(self):
+        started = time.perf_counter()
+        mtimes = self._snapshot_mtimes()
+        entries: Dict[str, AudioEntry] = {}
+        previous = self._entries
+
+        # Sous-dossiers d'abord, puis le dossier de base (ordre de l'ancienne recherche)
+        directories = [d for d in self._directories() if d != self.base_dir]
+        directories.append(self.base_dir)
+        for directory in directories:
+            try:
+                with os.scandir(directory) as it:
+                    for item in it:
+                        if not item.name.endswith(".wav") or not item.is_file():
+                            continue
+                        text_hash = item.name[:-4]
+                        if text_hash in entries:
+                            continue
+                        stat = item.stat()
+                        old = previous.get(text_hash)
+                        if (
+                            old is not None
+                            and str(old.path) == item.path
+                            and old.size == stat.st_size
+                            and old.mtime == stat.st_mtime
+                        ):
+                            entries[text_hash] = old  # durée et hash déjà calculés
+                        else:
+                            entries[text_hash] = AudioEntry(
+                                Path(item.path), stat.st_size, stat.st_mtime
+                            )
+            except OSError:
+                continue
+
+        bundle = self._load_bundle(mtimes)
+        if bundle is not None:
+            for text_hash, content_hash in bundle.texts.items():
+                if text_hash not in entries:
+                    entries[text_hash] = AudioEntry.from_bundle(
+                        text_hash, content_hash, bundle.clips[content_hash], bundle.mtime
+                    )
+
+        by_content = {entry.content_hash: entry for entry in entries.values()}
+        renditions = self._scan_renditions(by_content)
+
+        self._entries = entries
+        self._by_content = by_content
+        self.bundle = bundle
+        self._dir_mtimes = mtimes
+        self._scans += 1
+        self._last_scan_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"INFO: Index audio : {len(entries)} fichiers, {renditions} variantes "
+            f"({self._last_scan_ms:.1f} ms)"
+        )
+
+    def _load_bundle(self, mtimes: Dict) -> Optional[AudioBundle]:
+        """Paquet courant, reprojeté seulement s'il a changé sur disque"""
+        key = f"bundle:{self.bundle_path}"
+        if key not in mtimes:
+            return None
+        if self.bundle is not None and self._dir_mtimes.get(key) == mtimes[key]:
+            return self.bundle
+        try:
+            # L'ancien mmap reste valide tant qu'une réponse en cours le référence
+            bundle = AudioBundle(self.bundle_path)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Paquet audio ignoré ({self.bundle_path}): {e}")
+            return None
+        print(f"INFO: Paquet audio projeté : {len(bundle.clips)} extraits ({bundle.size / 1024 / 1024:.1f} Mo)")
+        return bundle
+
+    def _scan_renditions(self, by_content: Dict[str, AudioEntry]) -> int:
+        """Rattache ``<renditions_dir>/<codec>/<hash>.*`` aux fichiers sources"""
+        found: Dict[str, Dict[str, tuple]] = {h: {} for h in by_content}
+        count = 0
+        for directory in self._rendition_directories():
+            if directory == self.renditions_dir:
+                continue
+            try:
+                with os.scandir(directory) as it:
+                    for item in it:
+                        content_hash, _, extension = item.name.partition(".")
+                        if content_hash not in found or extension == "tmp" or not item.is_file():
+                            continue
+                        found[content_hash][directory.name] = (Path(item.path), item.stat().st_size)
+                        count += 1
+            except OSError:
+                continue
+        # Affectation d'un bloc : les lecteurs concurrents ne voient jamais d'état partiel
+        for content_hash, renditions in found.items():
+            by_content[content_hash].renditions = renditions
+        return count
+
+    def stats(self) -> Dict:
+        """Statistiques de l'index (fichiers, hits/misses, parcours)"""
+        lookups = self._hits + self._misses
+        return {
+            "files": len(self._entries),
+            "questions_indexed": sum(
+                1 for h in self._question_hashes.values() if h in self._entries
+            ),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": self._hits / lookups if lookups else 0.0,
+            "renditions": sum(len(e.renditions) for e in self._entries.values()),
+            "bundle": self.bundle.stats() if self.bundle is not None else None,
+            "scans": self._scans,
+            "last_scan_ms": self._last_scan_ms,
+            "check_interval": self.check_interval,
+        }
@@ -0,0 +1,270 @@
+"""
+Post-traitement des audios du cache : silences de début/fin et volume
+
+Les fichiers synthétisés commencent et finissent par 0,2 à 1 s de silence,
+qui s'ajoutent à l'attente du patient entre sa réponse et la question
+suivante, et leur volume varie d'un texte à l'autre. Cette étape de build :
+
+- découpe les silences de début et de fin (énergie RMS par trames de
+  10 ms sous un seuil en dBFS, avec une marge conservée autour de la parole
+  et un court fondu aux points de coupe) ;
+- normalise le volume : RMS des seules trames de parole ramené à une cible
+  commune, gain limité pour que la crête reste sous -1 dBFS.
+
+Les originaux sont conservés dans ``static/audio_originals`` (même
+arborescence) et chaque fichier est toujours retraité à partir de son
+original : relancer l'étape ne découpe jamais deux fois. Le manifeste
+``audio_manifest.json`` (dans le cache) enregistre, par fichier, les durées
+avant/après, les silences retirés et le gain appliqué ; un fichier déjà
+traité avec les mêmes paramètres est ignoré.
+
+Utilisation : ``python audio_postprocess_flask.py [--force]`` ou
+``flask --app app_flask postprocess-audio``.
+"""
+
+import hashlib
+import io
+import json
+import sys
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from audio_renditions_flask import _atomic_write, read_pcm16
+
+MANIFEST_NAME = "audio_manifest.json"
+MANIFEST_VERSION = 1
+
+FRAME_MS = 10
+DEFAULT_PARAMS = {
+    # Trame considérée comme de la parole au-dessus de ce niveau RMS
+    "threshold_db": -45.0,
+    # Marge conservée avant la première et après la dernière trame de parole
+    "padding_ms": 40,
+    # Fondu aux points de coupe (évite un clic si la coupe tombe sur du bruit)
+    "fade_ms": 5,
+    # Niveau RMS cible des trames de parole
+    "target_db": -20.0,
+    # Crête maximale après gain
+    "peak_db": -1.0,
+}
+
+
+def _db(value: float) -> float:
+    return 20 * np.log10(max(value, 1e-10) / 32768)
+
+
+def analyze(samples: np.ndarray, rate: int, params: Dict) -> Dict:
+    """Bornes de la parole et gain de normalisation (sans modifier les échantillons)"""
+    frame = max(1, rate * FRAME_MS // 1000)
+    count = len(samples) // frame
+    if not count:
+        return {"start": 0, "end": len(samples), "gain_db": 0.0, "loudness_db": None}
+
+    frames = samples[: count * frame].astype(np.float64).reshape(count, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    threshold = 32768 * 10 ** (params["threshold_db"] / 20)
+    active = np.flatnonzero(rms > threshold)
+    if not len(active):
+        # Aucune parole détectée : fichier laissé tel quel
+        return {"start": 0, "end": len(samples), "gain_db": 0.0, "loudness_db": None}
+
+    padding = rate * params["padding_ms"] // 1000
+    start = max(0, active[0] * frame - padding)
+    end = min(len(samples), (active[-1] + 1) * frame + padding)
+    # Dernière trame incomplète : conservée si la parole va jusqu'au bout
+    if active[-1] == count - 1:
+        end = len(samples)
+
+    loudness = _db(float(np.sqrt(np.mean(rms[active] ** 2))))
+    peak = _db(float(np.abs(samples[start:end]).max()))
+    gain = min(params["target_db"] - loudness, params["peak_db"] - peak)
+    return {"start": int(start), "end": int(end), "gain_db": float(gain), "loudness_db": float(loudness)}
+
+
+def process_samples(samples: np.ndarray, rate: int, params: Dict):
+    """Découpe et normalise ; retourne (échantillons int16, analyse)"""
+    info = analyze(samples, rate, params)
+    out = samples[info["start"] : info["end"]].astype(np.float64)
+    out *= 10 ** (info["gain_db"] / 20)
+
+    fade = min(rate * params["fade_ms"] // 1000, len(out) // 2)
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade, endpoint=False)
+        if info["start"] > 0:
+            out[:fade] *= ramp
+        if info["end"] < len(samples):
+            out[-fade:] *= ramp[::-1]
+    return np.clip(np.rint(out), -32768, 32767).astype("<i2"), info
+
+
+def _wav_bytes(samples: np.ndarray, rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def _content_hash(data: bytes) -> str:
+    # Même hash que AudioIndex (URL immuables, variantes)
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def load_manifest(cache_dir) -> Dict:
+    """Manifeste du post-traitement (vide s'il n'existe pas ou est illisible)"""
+    try:
+        manifest = json.loads((Path(cache_dir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "clips": {}}
+
+
+def process_file(path: Path, relative: str, originals_dir: Path, record: Optional[Dict], params: Dict, force: bool = False) -> Optional[Dict]:
+    """Traite un fichier du cache ; retourne son entrée de manifeste, ou None s'il est à jour"""
+    data = path.read_bytes()
+    current_hash = _content_hash(data)
+    original = originals_dir / relative
+
+    if record is not None and record.get("content_hash") == current_hash:
+        if record.get("params") == params and not force and original.exists():
+            return None
+    elif record is not None or not original.exists():
+        # Fichier nouveau ou régénéré depuis le dernier traitement : c'est l'original
+        original.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(original, data)
+    # Sans entrée de manifeste mais avec un original : le fichier en dérive déjà
+
+    samples, rate = read_pcm16(original)
+    processed, info = process_samples(samples, rate, params)
+    output = _wav_bytes(processed, rate)
+    _atomic_write(path, output)
+
+    return {
+        "original_hash": _content_hash(original.read_bytes()),
+        "content_hash": _content_hash(output),
+        "original_duration": round(len(samples) / rate, 3),
+        "duration": round(len(processed) / rate, 3),
+        "trimmed_start": round(info["start"] / rate, 3),
+        "trimmed_end": round((len(samples) - info["end"]) / rate, 3),
+        "loudness_db": None if info["loudness_db"] is None else round(info["loudness_db"], 2),
+        "gain_db": round(info["gain_db"], 2),
+        "params": params,
+    }
+
+
+def process_cache(cache_dir, originals_dir, params: Optional[Dict] = None, force: bool = False, workers: int = 4) -> Dict:
+    """Traite tous les WAV du cache en parallèle et met à jour le manifeste
+
+    NumPy relâche le GIL pendant les calculs : un pool de threads suffit.
+    """
+    cache_dir = Path(cache_dir)
+    originals_dir = Path(originals_dir)
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    manifest = load_manifest(cache_dir)
+    clips = manifest["clips"]
+
+    files = sorted(p for p in cache_dir.rglob("*.wav") if p.is_file())
+    report = {"files": len(files), "processed": 0, "skipped": 0, "failed": 0}
+
+    def run(path: Path):
+        relative = path.relative_to(cache_dir).as_posix()
+        try:
+            return relative, process_file(path, relative, originals_dir, clips.get(relative), params, force), None
+        except Exception as e:
+            return relative, None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for relative, record, error in pool.map(run, files):
+            if error is not None:
+                print(f"WARNING: Post-traitement de {relative} en échec: {error}")
+                report["failed"] += 1
+            elif record is None:
+                report["skipped"] += 1
+            else:
+                clips[relative] = record
+                report["processed"] += 1
+
+    # Entrées des fichiers supprimés du cache
+    present = {path.relative_to(cache_dir).as_posix() for path in files}
+    for relative in [r for r in clips if r not in present]:
+        del clips[relative]
+
+    _atomic_write(
+        cache_dir / MANIFEST_NAME,
+        json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"),
+    )
+    report["manifest"] = manifest
+    return report
+
+
+def dead_air_by_text_hash(manifest: Dict) -> Dict[str, float]:
+    """Hash du texte (nom du fichier) -> secondes de silence retirées"""
+    return {
+        Path(relative).stem: clip["trimmed_start"] + clip["trimmed_end"]
+        for relative, clip in manifest["clips"].items()
+    }
+
+
+def run_dead_air(manifest: Dict, voice_name: str = "Achernar") -> Dict:
+    """Silence retiré sur un questionnaire complet (questions 0 à 30 et message de fin)"""
+    from questionnaire_logic import spoken_texts
+
+    removed = dead_air_by_text_hash(manifest)
+    texts = {
+        key: text
+        for key, text in spoken_texts().items()
+        if key.startswith("question_") or key == "result_complete"
+    }
+    found = [
+        removed[h]
+        for h in (
+            hashlib.md5(f"{voice_name}_{text}".encode("utf-8")).hexdigest()
+            for text in texts.values()
+        )
+        if h in removed
+    ]
+    return {"clips": len(found), "expected": len(texts), "seconds": sum(found)}
+
+
+def main(argv=None) -> int:
+    """Post-traitement hors application (commande de build du déploiement)"""
+    from config_flask import Config
+
+    force = "--force" in (argv if argv is not None else sys.argv[1:])
+    report = process_cache(Config.AUDIO_CACHE_DIR, Config.AUDIO_ORIGINALS_DIR, force=force)
+    print_report(report)
+    return 1 if report["failed"] else 0
+
+
+def print_report(report: Dict, echo=print, voice_name: str = "Achernar"):
+    clips = report["manifest"]["clips"].values()
+    echo(
+        f"Post-traitement : {report['processed']} traités, {report['skipped']} à jour, "
+        f"{report['failed']} en échec ({report['files']} fichiers)"
+    )
+    if not clips:
+        return
+    original = sum(c["original_duration"] for c in clips)
+    removed = sum(c["trimmed_start"] + c["trimmed_end"] for c in clips)
+    gains = [c["gain_db"] for c in clips]
+    echo(
+        f"  Silence retiré : {removed:.1f}s sur {original:.1f}s "
+        f"({removed / original * 100 if original else 0:.1f} %), gain {min(gains):+.1f} à {max(gains):+.1f} dB"
+    )
+    run = run_dead_air(report["manifest"], voice_name)
+    echo(
+        f"  Par questionnaire complet : {run['seconds']:.1f}s d'attente en moins "
+        f"({run['clips']}/{run['expected']} audios traités)"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
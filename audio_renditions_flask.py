@@ -0,0 +1,215 @@
+"""
+Versions compressées des audios pré-générés (« renditions »)
+
+Les fichiers du cache sont en PCM 16 bits mono 24 kHz (~48 Ko/s). L'étape
+de build produit, pour chaque fichier, des variantes plus légères rangées
+par hash de contenu du WAV source :
+
+- ``ulaw`` : WAV G.711 μ-law 8 bits à 16 kHz (~16 Ko/s, NumPy pur) ;
+- ``flac`` : FLAC sans perte au débit d'origine (dépendance optionnelle
+  ``soundfile``, ignoré si absente).
+
+Arborescence : ``static/audio_renditions/<codec>/<hash>.<ext>``. Un fichier
+source modifié change de hash : les anciennes variantes ne sont plus servies.
+
+Utilisation : ``python audio_renditions_flask.py`` ou
+``flask --app app_flask build-audio-renditions``.
+"""
+
+import os
+import struct
+import sys
+import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+RENDITIONS_DIR = os.path.join("static", "audio_renditions")
+
+# codec -> (extension, type MIME)
+CODECS = {
+    "ulaw": (".wav", "audio/wav"),
+    "flac": (".flac", "audio/flac"),
+}
+
+ULAW_SAMPLE_RATE = 16000
+# G.711 sur 14 bits (comme g711.c et audioop) : biais 33, écrêtage à 8159
+_ULAW_BIAS = 0x21
+_ULAW_CLIP = 8159
+# Segment (exposant) de la magnitude biaisée : position du bit de poids fort de mag >> 5
+_ULAW_SEGMENTS = np.array(
+    [0] + [int(np.log2(i)) for i in range(1, 256)], dtype=np.int32
+)
+
+
+def rendition_path(base_dir, codec: str, content_hash: str) -> Path:
+    """Chemin de la variante ``codec`` d'un fichier source"""
+    return Path(base_dir) / codec / f"{content_hash}{CODECS[codec][0]}"
+
+
+def read_pcm16(path) -> Tuple[np.ndarray, int]:
+    """Lit un WAV PCM 16 bits mono : (échantillons int16, fréquence)"""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"WAV PCM 16 bits mono attendu: {path}")
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    return samples, rate
+
+
+def resample(samples: np.ndarray, rate: int, target_rate: int) -> np.ndarray:
+    """Rééchantillonnage par FFT (filtre passe-bas idéal à la nouvelle Nyquist)"""
+    if rate == target_rate or not len(samples):
+        return samples.astype(np.float64)
+    n_out = int(round(len(samples) * target_rate / rate))
+    spectrum = np.fft.rfft(samples.astype(np.float64))
+    return np.fft.irfft(spectrum[: n_out // 2 + 1], n_out) * (n_out / len(samples))
+
+
+def encode_ulaw(samples: np.ndarray) -> np.ndarray:
+    """Encodage G.711 μ-law vectorisé (PCM 16 bits -> octets)"""
+    x = np.clip(np.round(samples), -32768, 32767).astype(np.int32) >> 2
+    mask = np.where(x < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.minimum(np.abs(x), _ULAW_CLIP) + _ULAW_BIAS, 0x1FFF)
+    segment = _ULAW_SEGMENTS[magnitude >> 5]
+    mantissa = (magnitude >> (segment + 1)) & 0x0F
+    return (((segment << 4) | mantissa) ^ mask).astype(np.uint8)
+
+
+def ulaw_wav_bytes(encoded: np.ndarray, rate: int) -> bytes:
+    """Conteneur WAV μ-law (WAVE_FORMAT_MULAW = 7, chunk fact obligatoire)"""
+    data = encoded.tobytes()
+    fmt = struct.pack("<HHIIHHH", 7, 1, rate, rate, 1, 8, 0)
+    fact = struct.pack("<I", len(encoded))
+    pad = b"\x00" if len(data) % 2 else b""
+    chunks = (
+        b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"fact" + struct.pack("<I", len(fact)) + fact
+        + b"data" + struct.pack("<I", len(data)) + data + pad
+    )
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _encode_flac(samples: np.ndarray, rate: int) -> bytes:
+    import io
+
+    import soundfile
+
+    buffer = io.BytesIO()
+    soundfile.write(buffer, samples, rate, format="FLAC", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def available_codecs() -> Tuple[str, ...]:
+    """Codecs utilisables dans cet environnement (``flac`` exige soundfile)"""
+    try:
+        import soundfile  # noqa: F401
+
+        return ("ulaw", "flac")
+    except ImportError:
+        return ("ulaw",)
+
+
+def build_rendition(source: Path, content_hash: str, codec: str, base_dir=RENDITIONS_DIR, force: bool = False) -> Optional[int]:
+    """Produit une variante ; retourne sa taille, ou None si elle existait déjà"""
+    target = rendition_path(base_dir, codec, content_hash)
+    if target.exists() and not force:
+        return None
+
+    samples, rate = read_pcm16(source)
+    if codec == "ulaw":
+        data = ulaw_wav_bytes(
+            encode_ulaw(resample(samples, rate, ULAW_SAMPLE_RATE)), ULAW_SAMPLE_RATE
+        )
+    elif codec == "flac":
+        data = _encode_flac(samples, rate)
+    else:
+        raise ValueError(f"Codec inconnu: {codec}")
+
+    _atomic_write(target, data)
+    return len(data)
+
+
+def build_all(
+    sources: Iterable[Tuple[Path, str]],
+    codecs: Iterable[str] = None,
+    base_dir=RENDITIONS_DIR,
+    force: bool = False,
+    workers: int = 4,
+) -> Dict:
+    """Construit les variantes de tous les fichiers (idempotent, en parallèle)
+
+    ``sources`` : couples (chemin du WAV, hash de contenu). NumPy relâche le
+    GIL pendant les FFT : un pool de threads suffit.
+    """
+    supported = available_codecs()
+    codecs = [c for c in (codecs or supported) if c in supported]
+    jobs = [(path, content_hash, codec) for path, content_hash in sources for codec in codecs]
+    report = {"codecs": codecs, "built": 0, "skipped": 0, "failed": 0, "source_bytes": 0, "bytes": {c: 0 for c in codecs}}
+
+    def run(job):
+        path, content_hash, codec = job
+        try:
+            size = build_rendition(path, content_hash, codec, base_dir, force)
+            return job, size, None
+        except Exception as e:
+            return job, None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for (path, content_hash, codec), size, error in pool.map(run, jobs):
+            if error is not None:
+                print(f"WARNING: Variante {codec} de {path.name} en échec: {error}")
+                report["failed"] += 1
+                continue
+            if size is None:
+                report["skipped"] += 1
+                size = rendition_path(base_dir, codec, content_hash).stat().st_size
+            else:
+                report["built"] += 1
+            report["bytes"][codec] += size
+
+    report["source_bytes"] = sum(path.stat().st_size for path, _ in set((p, h) for p, h, _ in jobs))
+    return report
+
+
+def main(argv=None) -> int:
+    """Build hors application (commande de build du déploiement)"""
+    from audio_index_flask import AudioIndex
+    from config_flask import Config
+
+    force = "--force" in (argv if argv is not None else sys.argv[1:])
+    index = AudioIndex(Config.AUDIO_CACHE_DIR, check_interval=float("inf"))
+    report = build_all(
+        ((e.path, e.content_hash) for e in index.entries() if e.path),
+        base_dir=Config.AUDIO_RENDITIONS_DIR,
+        force=force,
+    )
+    print_report(report)
+    return 1 if report["failed"] else 0
+
+
+def print_report(report: Dict, echo=print):
+    echo(f"Variantes : {report['built']} créées, {report['skipped']} déjà présentes, {report['failed']} en échec")
+    source = report["source_bytes"]
+    for codec, size in report["bytes"].items():
+        ratio = source / size if size else 0
+        echo(f"  {codec:<5} {size / 1024 / 1024:6.1f} Mo (WAV source {source / 1024 / 1024:.1f} Mo, x{ratio:.1f} plus léger)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Message de fin assemblé à partir de segments audio pré-générés
+
+Le message « Vous avez répondu à N questions sur 30. M questions restent
+sans réponse » dépend du nombre de réponses : plutôt qu'une synthèse par
+session (latence, coût API), il est assemblé à partir de segments fixes
+(``RESULT_SEGMENT_TEXTS``) et de nombres (``NUMBER_TEXTS``, 0 à 30) :
+
+    intro | N | answered | M | missed | outro
+
+Les échantillons PCM sont lus sans copie (``np.frombuffer``), recopiés une
+seule fois dans le tampon du WAV final, avec un court fondu enchaîné à
+chaque jonction. Les 31 résultats possibles sont mémorisés : après la
+première construction, une réponse est un accès dictionnaire.
+"""
+
+import hashlib
+import io
+import struct
+import threading
+import time
+import wave
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from questionnaire_logic import NUMBER_TEXTS, RESULT_SEGMENT_TEXTS
+
+WAV_HEADER_SIZE = 44
+
+
+class ResultAudioStitcher:
+    """Assemblage mémorisé des messages de fin (``app.result_audio``)"""
+
+    def __init__(self, audio_index, crossfade_ms: float = 15.0):
+        self.audio_index = audio_index
+        self.crossfade_ms = crossfade_ms
+
+        # nombre de réponses -> (clé des segments, WAV, ETag)
+        self._memo: Dict[int, Tuple[tuple, bytes, str]] = {}
+        # hash de contenu -> (échantillons int16, fréquence)
+        self._pcm: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._lock = threading.Lock()
+
+        self._stats = {"hits": 0, "builds": 0, "unavailable": 0, "last_build_ms": 0.0}
+
+    def _segments(self, answered: int):
+        """Entrées d'index des 6 segments (None si l'un manque)"""
+        lookup = self.audio_index.lookup
+        entries = (
+            lookup(RESULT_SEGMENT_TEXTS["intro"]),
+            lookup(NUMBER_TEXTS[answered]),
+            lookup(RESULT_SEGMENT_TEXTS["answered"]),
+            lookup(NUMBER_TEXTS[30 - answered]),
+            lookup(RESULT_SEGMENT_TEXTS["missed"]),
+            lookup(RESULT_SEGMENT_TEXTS["outro"]),
+        )
+        return None if any(e is None for e in entries) else entries
+
+    def _load_pcm(self, entry) -> Tuple[np.ndarray, int]:
+        cached = self._pcm.get(entry.content_hash)
+        if cached is not None:
+            return cached
+
+        bundle, clip = self.audio_index.bundle_clip(entry.content_hash)
+        data = bundle.view(clip) if clip is not None else entry.path.read_bytes()
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError(f"Segment {entry.text_hash}: PCM 16 bits mono attendu")
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+        # Vue directe sur les octets lus : pas de copie des échantillons
+        samples = np.frombuffer(frames, dtype="<i2")
+        self._pcm[entry.content_hash] = (samples, rate)
+        return samples, rate
+
+    def build(self, answered: int) -> Optional[Tuple[bytes, str]]:
+        """WAV et ETag du message pour ``answered`` réponses (0 à 29)
+
+        Retourne None si un segment manque ou si les formats diffèrent :
+        l'appelant se rabat alors sur le message générique.
+        """
+        if not 0 <= answered < 30:
+            return None
+        entries = self._segments(answered)
+        if entries is None:
+            self._stats["unavailable"] += 1
+            return None
+
+        # Un segment régénéré change de hash : le résultat mémorisé est ignoré
+        key = tuple(e.content_hash for e in entries)
+        cached = self._memo.get(answered)
+        if cached is not None and cached[0] == key:
+            self._stats["hits"] += 1
+            return cached[1], cached[2]
+
+        with self._lock:
+            cached = self._memo.get(answered)
+            if cached is not None and cached[0] == key:
+                self._stats["hits"] += 1
+                return cached[1], cached[2]
+
+            started = time.perf_counter()
+            try:
+                segments = [self._load_pcm(e) for e in entries]
+            except (OSError, ValueError, wave.Error, EOFError) as e:
+                print(f"WARNING: Assemblage du message de fin impossible: {e}")
+                self._stats["unavailable"] += 1
+                return None
+            rates = {rate for _, rate in segments}
+            if len(rates) != 1:
+                print(f"WARNING: Segments audio de fréquences différentes: {sorted(rates)}")
+                self._stats["unavailable"] += 1
+                return None
+
+            body = self._stitch([samples for samples, _ in segments], rates.pop())
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            self._memo[answered] = (key, body, etag)
+            self._stats["builds"] += 1
+            self._stats["last_build_ms"] = (time.perf_counter() - started) * 1000
+        return body, etag
+
+    def _stitch(self, segments, rate: int) -> bytes:
+        """Concatène les segments dans un seul tampon WAV (fondu à chaque jonction)"""
+        overlap = min(
+            int(rate * self.crossfade_ms / 1000),
+            min(len(s) for s in segments) // 2,
+        )
+        total = sum(len(s) for s in segments) - overlap * (len(segments) - 1)
+
+        # En-tête et échantillons dans un seul tampon, rempli sur place
+        buffer = bytearray(WAV_HEADER_SIZE + total * 2)
+        struct.pack_into(
+            "<4sI4s4sIHHIIHH4sI", buffer, 0,
+            b"RIFF", 36 + total * 2, b"WAVE",
+            b"fmt ", 16, 1, 1, rate, rate * 2, 2, 16,
+            b"data", total * 2,
+        )
+        out = np.frombuffer(buffer, dtype="<i2", offset=WAV_HEADER_SIZE)
+
+        fade_in = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+        fade_out = 1.0 - fade_in
+        position = 0
+        for samples in segments:
+            if position == 0:
+                out[: len(samples)] = samples
+                position = len(samples)
+                continue
+            if overlap:
+                mixed = out[position - overlap : position] * fade_out + samples[:overlap] * fade_in
+                out[position - overlap : position] = np.clip(np.rint(mixed), -32768, 32767)
+            tail = samples[overlap:]
+            out[position : position + len(tail)] = tail
+            position += len(tail)
+        return bytes(buffer)
+
+    def stats(self) -> Dict:
+        return {**self._stats, "memoized": len(self._memo), "segments_loaded": len(self._pcm)}
@@ -0,0 +1,325 @@
+"""
+Commandes CLI de l'application Flask (maintenance, exports, benchmarks)
+Utilisation : flask --app app_flask <commande> --help
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+
+def register_commands(app):
+    """Enregistre les commandes CLI sur l'application"""
+    app.cli.add_command(bench_db)
+    app.cli.add_command(export_sessions)
+    app.cli.add_command(export_matrix)
+    app.cli.add_command(bench_scoring)
+    app.cli.add_command(bench_speech)
+    app.cli.add_command(postprocess_audio)
+    app.cli.add_command(build_audio_renditions)
+    app.cli.add_command(pack_audio_bundle)
+
+
+@click.command("bench-db")
+@click.option("--threads", default=8, show_default=True, help="Threads de requête simulés")
+@click.option("--sessions", default=20, show_default=True, help="Sessions par thread")
+@click.option("--max-delay-ms", default=20, show_default=True, help="Délai max d'un lot write-behind")
+@click.option("--synchronous", default="FULL", show_default=True, help="PRAGMA synchronous (FULL = fsync à chaque COMMIT)")
+@click.option("--dir", "directory", default=None, help="Dossier de la base de test (même disque que la production)")
+def bench_db(threads, sessions, max_delay_ms, synchronous, directory):
+    """Compare commit-par-réponse et write-behind (réponses/seconde)"""
+    from models.database_flask import DatabaseManager
+
+    def run(write_behind: bool) -> float:
+        with tempfile.TemporaryDirectory(dir=directory) as tmp:
+            db = DatabaseManager(
+                str(Path(tmp) / "bench.db"),
+                pool_size=threads,
+                synchronous=synchronous,
+                write_behind=write_behind,
+                write_behind_max_delay_ms=max_delay_ms,
+            )
+            db.migrate()
+            session_ids = [
+                db.create_session(
+                    {"initials": "BN", "birth_date": "01/01/1950", "today_date": "01/01/2025"}
+                )
+                for _ in range(threads * sessions)
+            ]
+
+            def worker(index: int):
+                for session_id in session_ids[index::threads]:
+                    for question_num in range(1, 31):
+                        db.save_response(
+                            session_id, question_num, "Bench", 1 + question_num % 4, "Bench"
+                        )
+                    db.update_session_completion(session_id, wait=True)
+
+            started = time.perf_counter()
+            workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            elapsed = time.perf_counter() - started
+
+            stats = db.get_write_behind_stats()
+            db.close()
+            if stats:
+                click.echo(
+                    f"  lots: {stats['batches']}, taille moyenne: {stats['avg_batch']:.1f}, "
+                    f"attente max: {stats['max_wait_ms']:.1f} ms"
+                )
+            return threads * sessions * 31 / elapsed
+
+    click.echo(f"{threads} threads x {sessions} sessions x 30 réponses (synchronous={synchronous})")
+    direct = run(False)
+    click.echo(f"Commit par appel : {direct:,.0f} écritures/s")
+    grouped = run(True)
+    click.echo(f"Write-behind     : {grouped:,.0f} écritures/s (x{grouped / direct:.1f})")
+
+
+@click.command("export-sessions")
+@click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default="ndjson", show_default=True)
+@click.option("--gzip", "compress", is_flag=True, help="Compresser le flux (gzip)")
+@click.option("--from", "date_from", default=None, help="Date de début incluse (YYYY-MM-DD)")
+@click.option("--to", "date_to", default=None, help="Date de fin incluse (YYYY-MM-DD)")
+@click.option("--completed-only", is_flag=True, help="Uniquement les sessions terminées")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default=None, help="Fichier de sortie (stdout par défaut)")
+@with_appcontext
+def export_sessions(fmt, compress, date_from, date_to, completed_only, output):
+    """Exporte toutes les sessions en flux (NDJSON ou CSV)"""
+    from models.export_flask import export_stream
+
+    try:
+        chunks = export_stream(
+            current_app.db,
+            fmt,
+            compress,
+            status="completed" if completed_only else None,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    target = open(output, "wb") if output else sys.stdout.buffer
+    try:
+        written = 0
+        for chunk in chunks:
+            target.write(chunk)
+            written += len(chunk)
+    finally:
+        if output:
+            target.close()
+    if output:
+        click.echo(f"{written / 1024:.1f} Ko écrits dans {output}", err=True)
+
+
+@click.command("export-matrix")
+@click.argument("output", type=click.Path(dir_okay=False))
+@click.option("--from", "date_from", default=None, help="Date de début incluse (YYYY-MM-DD)")
+@click.option("--to", "date_to", default=None, help="Date de fin incluse (YYYY-MM-DD)")
+@click.option("--completed-only", is_flag=True, help="Uniquement les sessions terminées")
+@with_appcontext
+def export_matrix(output, date_from, date_to, completed_only):
+    """Exporte la matrice de scores : OUTPUT.npy (mmap) + OUTPUT.index.npz"""
+    from models.score_matrix_flask import save_score_matrix
+
+    started = time.perf_counter()
+    try:
+        matrix = current_app.db.build_score_matrix(
+            status="completed" if completed_only else None,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    scores_path, index_path = save_score_matrix(matrix, output)
+    click.echo(
+        f"{len(matrix['session_ids'])} sessions en {time.perf_counter() - started:.2f}s "
+        f"-> {scores_path}, {index_path}"
+    )
+
+
+@click.command("bench-scoring")
+@click.option("--sessions", default=100_000, show_default=True, help="Sessions simulées")
+@click.option("--missing", default=0.05, show_default=True, help="Proportion de réponses manquantes")
+@click.option("--repeat", default=5, show_default=True, help="Nombre de mesures (meilleure retenue)")
+def bench_scoring(sessions, missing, repeat):
+    """Mesure le calcul vectorisé des échelles QLQ-C30 sur une cohorte simulée"""
+    import numpy as np
+
+    from models.score_matrix_flask import MISSING_SCORE
+    from scoring_logic import SCALE_CODES, score_matrix
+
+    rng = np.random.default_rng(0)
+    scores = rng.integers(1, 5, size=(sessions, 30), dtype=np.uint8)
+    scores[:, 28:] = rng.integers(1, 8, size=(sessions, 2), dtype=np.uint8)
+    scores[rng.random(scores.shape) < missing] = MISSING_SCORE
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = score_matrix(scores)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    click.echo(
+        f"{sessions:,} sessions x {len(SCALE_CODES)} échelles : {best * 1000:.1f} ms "
+        f"({sessions / best:,.0f} sessions/s)"
+    )
+    for code in SCALE_CODES:
+        values = results[code]
+        click.echo(f"  {code:<4} moyenne {np.nanmean(values):5.1f}  non calculable {np.isnan(values).mean():.1%}")
+
+
+@click.command("bench-speech")
+@click.option("--requests", "count", default=50, show_default=True, help="Appels speech:recognize par mode")
+@click.option("--threads", default=4, show_default=True, help="Appels simultanés")
+@click.option("--url", default=None, help="API à mesurer (serveur local de test par défaut)")
+@click.option("--latency-ms", default=50, show_default=True, help="Temps de traitement simulé du serveur local")
+@with_appcontext
+def bench_speech(count, threads, url, latency_ms):
+    """Compare une connexion par appel et le client à connexions persistantes"""
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    import requests
+
+    from speech_client_flask import SpeechClient
+
+    class StubHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 : connexion conservée entre deux requêtes, comme l'API
+        protocol_version = "HTTP/1.1"
+        # En-têtes et corps écrits séparément : sans TCP_NODELAY, l'ACK différé
+        # du client retarderait chaque réponse d'une connexion conservée
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency_ms / 1000)
+            body = json.dumps(
+                {"results": [{"alternatives": [{"transcript": "un peu", "confidence": 0.9}]}]}
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = None
+    if url is None:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1/speech:recognize"
+
+    api_key = current_app.speech_client.api_key
+    payload = {
+        "config": {"encoding": "LINEAR16", "sampleRateHertz": 16000, "languageCode": "fr-FR"},
+        "audio": {"content": ""},
+    }
+    params = {"key": api_key} if api_key else None
+
+    def run(call) -> float:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda _: call(), range(count)))
+        return (time.perf_counter() - started) * 1000 / count
+
+    click.echo(f"{count} appels x {threads} threads vers {url}")
+    try:
+        fresh = run(lambda: requests.post(url, params=params, json=payload, timeout=10))
+        click.echo(f"Connexion par appel    : {fresh:.1f} ms/appel")
+        client = SpeechClient(api_key=api_key, api_url=url, pool_size=threads)
+        pooled = run(lambda: client.recognize(payload))
+        stats = client.stats()
+        client.close()
+        click.echo(
+            f"Connexions persistantes : {pooled:.1f} ms/appel (x{fresh / pooled:.1f}), "
+            f"{stats['connections_opened']} connexions pour {stats['calls']} appels, "
+            f"p95 {stats['latency_ms']['p95']:.1f} ms"
+        )
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+@click.command("postprocess-audio")
+@click.option("--threshold-db", default=-45.0, show_default=True, help="Niveau RMS (dBFS) sous lequel une trame est du silence")
+@click.option("--target-db", default=-20.0, show_default=True, help="Niveau RMS cible de la parole (dBFS)")
+@click.option("--force", is_flag=True, help="Retraiter les fichiers à jour")
+@click.option("--workers", default=4, show_default=True, help="Fichiers traités en parallèle")
+@with_appcontext
+def postprocess_audio(threshold_db, target_db, force, workers):
+    """Découpe les silences de début/fin et normalise le volume des audios du cache"""
+    from audio_postprocess_flask import print_report, process_cache
+
+    started = time.perf_counter()
+    report = process_cache(
+        current_app.config["AUDIO_CACHE_DIR"],
+        current_app.config["AUDIO_ORIGINALS_DIR"],
+        params={"threshold_db": threshold_db, "target_db": target_db},
+        force=force,
+        workers=workers,
+    )
+    print_report(report, click.echo, voice_name=current_app.audio_index.voice_name)
+    click.echo(f"Terminé en {time.perf_counter() - started:.1f}s")
+    click.echo("Variantes et paquet à reconstruire : build-audio-renditions, pack-audio-bundle")
+    current_app.audio_index.reload()
+
+
+@click.command("build-audio-renditions")
+@click.option("--codec", "codecs", multiple=True, type=click.Choice(["ulaw", "flac"]), help="Codec à produire (tous les disponibles par défaut)")
+@click.option("--force", is_flag=True, help="Reconstruire les variantes existantes")
+@click.option("--workers", default=4, show_default=True, help="Fichiers encodés en parallèle")
+@with_appcontext
+def build_audio_renditions(codecs, force, workers):
+    """Produit les variantes compressées (μ-law, FLAC) des audios du cache"""
+    from audio_renditions_flask import available_codecs, build_all, print_report
+
+    missing = [c for c in codecs if c not in available_codecs()]
+    if missing:
+        click.echo(f"Codec indisponible (pip install soundfile) : {', '.join(missing)}", err=True)
+
+    index = current_app.audio_index
+    started = time.perf_counter()
+    report = build_all(
+        ((entry.path, entry.content_hash) for entry in index.entries() if entry.path),
+        codecs=codecs or None,
+        base_dir=current_app.config["AUDIO_RENDITIONS_DIR"],
+        force=force,
+        workers=workers,
+    )
+    print_report(report, click.echo)
+    click.echo(f"Terminé en {time.perf_counter() - started:.1f}s")
+    index.reload()
+
+
+@click.command("pack-audio-bundle")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default=None, help="Fichier du paquet (AUDIO_BUNDLE_PATH par défaut)")
+@with_appcontext
+def pack_audio_bundle(output):
+    """Regroupe les audios du cache en un paquet unique dédupliqué"""
+    from audio_bundle_flask import pack_bundle, print_report
+
+    started = time.perf_counter()
+    report = pack_bundle(
+        output or current_app.config["AUDIO_BUNDLE_PATH"],
+        current_app.config["AUDIO_BUNDLE_SOURCES"],
+        voice_name=current_app.audio_index.voice_name,
+    )
+    print_report(report, click.echo)
+    click.echo(f"Terminé en {time.perf_counter() - started:.1f}s")
+    current_app.audio_index.reload()
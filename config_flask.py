@@ -14,8 +14,38 @@ class Config:
     # Base de données SQLite
     DATABASE_PATH = os.path.join('data', 'responses.db')
     
+    # Pool de connexions SQLite (WAL, connexions conservées entre requêtes)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '4'))
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))
+    DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', str(64 * 1024 * 1024)))
+    DB_SYNCHRONOUS = os.environ.get('DB_SYNCHRONOUS', 'NORMAL')
+    
+    # Écriture différée à commit groupé (désactivée par défaut)
+    DB_WRITE_BEHIND = os.environ.get('DB_WRITE_BEHIND', 'False').lower() == 'true'
+    DB_WRITE_BEHIND_MAX_PENDING = int(os.environ.get('DB_WRITE_BEHIND_MAX_PENDING', '1000'))
+    DB_WRITE_BEHIND_MAX_DELAY_MS = int(os.environ.get('DB_WRITE_BEHIND_MAX_DELAY_MS', '20'))
+    
+    # Analyse de cohorte : rafraîchissement groupé des agrégats par jour
+    ANALYTICS_REFRESH_SECONDS = float(os.environ.get('ANALYTICS_REFRESH_SECONDS', '30'))
+    ANALYTICS_REBUILD_SECONDS = float(os.environ.get('ANALYTICS_REBUILD_SECONDS', '3600'))
+    
+    # URL de l'API TTS (vide : API Google par défaut ; sinon proxy ou serveur local)
+    TTS_API_URL = os.environ.get('TTS_API_URL')
+    # Budget du cache des audios synthétisés à la demande (audios du questionnaire épinglés)
+    AUDIO_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_MB', '200')) * 1024 * 1024
+
     # Cache audio
     AUDIO_CACHE_DIR = os.path.join('static', 'audio_cache')
+    # Intervalle minimal entre deux vérifications des dossiers du cache audio
+    AUDIO_INDEX_CHECK_SECONDS = float(os.environ.get('AUDIO_INDEX_CHECK_SECONDS', '5'))
+    # Originaux des audios avant découpe des silences : python audio_postprocess_flask.py
+    AUDIO_ORIGINALS_DIR = os.path.join('static', 'audio_originals')
+    # Variantes compressées des audios (μ-law, FLAC) : python audio_renditions_flask.py
+    AUDIO_RENDITIONS_DIR = os.path.join('static', 'audio_renditions')
+    # Paquet audio unique (disque persistant) : python audio_bundle_flask.py
+    AUDIO_BUNDLE_PATH = os.environ.get('AUDIO_BUNDLE_PATH', os.path.join('data', 'audio_bundle.bin'))
+    # Dossiers regroupés dans le paquet (le premier l'emporte pour un même texte)
+    AUDIO_BUNDLE_SOURCES = [AUDIO_CACHE_DIR, '.audio_cache']
     
     # Configuration audio
     AUDIO_ENABLED = os.environ.get('AUDIO_ENABLED', 'True').lower() == 'true'
@@ -31,6 +61,26 @@ class Config:
     SPEECH_LANGUAGE = 'fr-FR'
     SPEECH_TIMEOUT = 10  # secondes
     
+    # Client Speech-to-Text (connexions persistantes, une session par processus)
+    # URL vide : API Google ; sinon proxy ou serveur local de test
+    STT_API_URL = os.environ.get('STT_API_URL')
+    STT_POOL_SIZE = int(os.environ.get('STT_POOL_SIZE', '10'))
+    STT_CONNECT_TIMEOUT = float(os.environ.get('STT_CONNECT_TIMEOUT', '3.05'))
+    STT_READ_TIMEOUT = float(os.environ.get('STT_READ_TIMEOUT', str(SPEECH_TIMEOUT)))
+    STT_RETRIES = int(os.environ.get('STT_RETRIES', '2'))
+    # Hypothèses demandées par transcription (interprétées toutes, N-best)
+    STT_MAX_ALTERNATIVES = int(os.environ.get('STT_MAX_ALTERNATIVES', '5'))
+    # Détection d'activité vocale des extraits LINEAR16 : niveau de parole
+    # (dBFS), durée minimale de parole, marge conservée autour de la parole
+    VAD_THRESHOLD_DB = float(os.environ.get('VAD_THRESHOLD_DB', '-45'))
+    VAD_MIN_SPEECH_MS = int(os.environ.get('VAD_MIN_SPEECH_MS', '100'))
+    VAD_PADDING_MS = int(os.environ.get('VAD_PADDING_MS', '150'))
+    # Transcriptions asynchrones : appels amont simultanés, tâches en attente
+    # au-delà desquelles les extraits sont refusés (429), durée de conservation
+    TRANSCRIPTION_WORKERS = int(os.environ.get('TRANSCRIPTION_WORKERS', '8'))
+    TRANSCRIPTION_MAX_PENDING = int(os.environ.get('TRANSCRIPTION_MAX_PENDING', '32'))
+    TRANSCRIPTION_JOB_TTL_SECONDS = float(os.environ.get('TRANSCRIPTION_JOB_TTL_SECONDS', '600'))
+    
     # Configuration session
     PERMANENT_SESSION_LIFETIME = 3600  # 1 heure
     
@@ -0,0 +1,290 @@
+"""
+Agrégats de cohorte pour l'analyse clinique (moyennes, percentiles, distributions)
+
+Les agrégats sont tenus par jour de création des sessions (« bucket ») :
+histogrammes des réponses par item et scores d'échelles QLQ-C30. Un
+rafraîchissement groupé (au plus toutes les ``refresh_interval`` secondes)
+ne recalcule que les jours ayant reçu de nouvelles réponses ; les réponses
+JSON déjà sérialisées sont servies depuis la mémoire avec un ETag.
+"""
+
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from scoring_logic import SCALE_CODES, SCALES, SUMMARY_CODE, SUMMARY_LABEL, score_matrix
+from .score_matrix_flask import N_ITEMS
+
+MAX_SCORE = 7
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+DISTRIBUTION_BINS = np.linspace(0, 100, 11)
+# Étendue des réponses par item : 1-4, sauf santé globale (Q29, Q30) en 1-7
+ITEM_MAX = {n: 7 if n in (29, 30) else 4 for n in range(1, N_ITEMS + 1)}
+
+
+class _Bucket:
+    """Agrégats d'un jour de création de sessions"""
+
+    __slots__ = ("sessions", "item_counts", "scales", "version")
+
+    def __init__(self, scores: np.ndarray, version: int):
+        answered = (scores >= 1) & (scores <= MAX_SCORE)
+        self.sessions = int(answered.any(axis=1).sum())
+
+        # Histogramme (item, score) en un seul bincount
+        columns = np.broadcast_to(np.arange(N_ITEMS), scores.shape)[answered]
+        flat = columns * (MAX_SCORE + 1) + scores[answered]
+        self.item_counts = np.bincount(
+            flat, minlength=N_ITEMS * (MAX_SCORE + 1)
+        ).reshape(N_ITEMS, MAX_SCORE + 1)
+
+        self.scales = {
+            code: values[~np.isnan(values)].astype(np.float32)
+            for code, values in score_matrix(scores).items()
+        }
+        self.version = version
+
+    def same_as(self, other: "_Bucket") -> bool:
+        return (
+            self.sessions == other.sessions
+            and np.array_equal(self.item_counts, other.item_counts)
+            and all(np.array_equal(v, other.scales[code]) for code, v in self.scales.items())
+        )
+
+
+class CohortAnalytics:
+    """Cache des agrégats de cohorte d'un processus (``app.analytics``)"""
+
+    def __init__(
+        self,
+        db,
+        refresh_interval: float = 30.0,
+        rebuild_interval: float = 3600.0,
+        max_cached_responses: int = 128,
+    ):
+        self.db = db
+        self.refresh_interval = refresh_interval
+        # Reconstruction complète périodique : prend en compte les suppressions
+        self.rebuild_interval = rebuild_interval
+        self.max_cached_responses = max_cached_responses
+
+        self._buckets: Dict[str, _Bucket] = {}
+        self._watermark: Optional[str] = None
+        self._epoch = 0
+        self._version = 0
+        self._built_at: Optional[float] = None
+        self._checked_at = 0.0
+
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._responses: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+
+        self._stats = {
+            "rebuilds": 0,
+            "refreshes": 0,
+            "buckets_recomputed": 0,
+            "response_hits": 0,
+            "response_misses": 0,
+            "last_refresh_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Rafraîchissement groupé
+    # ------------------------------------------------------------------
+
+    def refresh(self, force: bool = False):
+        """Met les buckets à jour si l'intervalle de rafraîchissement est écoulé
+
+        Un seul thread rafraîchit ; les autres servent les agrégats courants
+        (ils n'attendent que lors de la toute première construction).
+        """
+        now = time.monotonic()
+        if not force and self._built_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            now = time.monotonic()
+            if self._built_at is None or force or now - self._built_at >= self.rebuild_interval:
+                self._rebuild()
+            elif now - self._checked_at >= self.refresh_interval:
+                self._refresh_active_days()
+            self._checked_at = time.monotonic()
+            self._stats["last_refresh_ms"] = (self._checked_at - now) * 1000
+        finally:
+            self._refresh_lock.release()
+
+    def _rebuild(self):
+        # Filigrane lu avant la construction : rien ne peut être manqué
+        _, watermark = self.db.get_active_days(None)
+        matrix = self.db.build_score_matrix()
+        buckets = self._split_by_day(matrix)
+
+        with self._lock:
+            self._epoch += 1
+            self._buckets = buckets
+            self._watermark = watermark
+            self._built_at = time.monotonic()
+            self._responses.clear()
+            self._stats["rebuilds"] += 1
+            self._stats["buckets_recomputed"] += len(buckets)
+        print(f"INFO: Analyse de cohorte reconstruite ({len(buckets)} jours)")
+
+    def _refresh_active_days(self):
+        days, watermark = self.db.get_active_days(self._watermark)
+        updated = {}
+        for day in days:
+            matrix = self.db.build_score_matrix(date_from=day, date_to=day)
+            updated.update(self._split_by_day(matrix))
+
+        with self._lock:
+            # Le filigrane inclusif relit la dernière seconde : un jour inchangé
+            # garde sa version (et les réponses sérialisées qui en dépendent)
+            for day, bucket in updated.items():
+                previous = self._buckets.get(day)
+                if previous is not None and bucket.same_as(previous):
+                    bucket.version = previous.version
+            self._buckets.update(updated)
+            self._watermark = watermark
+            self._stats["refreshes"] += 1
+            self._stats["buckets_recomputed"] += len(updated)
+
+    def _split_by_day(self, matrix: Dict[str, np.ndarray]) -> Dict[str, _Bucket]:
+        """Découpe une matrice triée par date de création en buckets journaliers"""
+        days = matrix["created_at"].astype("datetime64[D]")
+        if not len(days):
+            return {}
+        keys, starts = np.unique(days, return_index=True)
+        bounds = list(starts[1:]) + [len(days)]
+        buckets = {}
+        for key, start, end in zip(keys, starts, bounds):
+            self._version += 1
+            buckets[str(key)] = _Bucket(matrix["scores"][start:end], self._version)
+        return buckets
+
+    # ------------------------------------------------------------------
+    # Réponses sérialisées
+    # ------------------------------------------------------------------
+
+    def cohort(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[bytes, str]:
+        """Corps JSON et ETag des agrégats de la période (bornes incluses)
+
+        Lève ValueError si une date n'est pas au format YYYY-MM-DD.
+        """
+        for value in (date_from, date_to):
+            if value:
+                try:
+                    datetime.date.fromisoformat(value)
+                except ValueError:
+                    raise ValueError(f"Date invalide (attendu YYYY-MM-DD): {value}")
+
+        self.refresh()
+
+        with self._lock:
+            selected = [
+                bucket
+                for day, bucket in self._buckets.items()
+                if (not date_from or day >= date_from) and (not date_to or day <= date_to)
+            ]
+            stamp = (
+                self._epoch,
+                len(selected),
+                max((b.version for b in selected), default=0),
+            )
+            key = (date_from, date_to)
+            cached = self._responses.get(key)
+            if cached and cached[0] == stamp:
+                self._responses.move_to_end(key)
+                self._stats["response_hits"] += 1
+                return cached[1], cached[2]
+            self._stats["response_misses"] += 1
+
+        body = json.dumps(
+            self._summarize(selected, date_from, date_to),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        # ETag dérivé du contenu : identique d'un worker à l'autre
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+        with self._lock:
+            self._responses[key] = (stamp, body, etag)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_cached_responses:
+                self._responses.popitem(last=False)
+        return body, etag
+
+    @staticmethod
+    def _summarize(buckets, date_from, date_to) -> Dict:
+        item_counts = sum(
+            (b.item_counts for b in buckets), np.zeros((N_ITEMS, MAX_SCORE + 1), dtype=np.int64)
+        )
+
+        scales = {}
+        for code in SCALE_CODES:
+            values = (
+                np.concatenate([b.scales[code] for b in buckets])
+                if buckets
+                else np.empty(0, dtype=np.float32)
+            )
+            label = SUMMARY_LABEL if code == SUMMARY_CODE else SCALES[code][0]
+            entry = {"label": label, "n": int(values.size)}
+            if values.size:
+                values = values.astype(np.float64)
+                entry.update(
+                    {
+                        "mean": round(float(values.mean()), 1),
+                        "sd": round(float(values.std(ddof=1)), 1) if values.size > 1 else None,
+                        "min": round(float(values.min()), 1),
+                        "max": round(float(values.max()), 1),
+                        "percentiles": {
+                            f"p{p}": round(float(v), 1)
+                            for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+                        },
+                        "distribution": np.histogram(values, bins=DISTRIBUTION_BINS)[0].tolist(),
+                    }
+                )
+            scales[code] = entry
+
+        items = {}
+        for num in range(1, N_ITEMS + 1):
+            counts = item_counts[num - 1, 1 : ITEM_MAX[num] + 1]
+            n = int(counts.sum())
+            items[f"q{num}"] = {
+                "n": n,
+                "counts": counts.tolist(),
+                "mean": (
+                    round(float((counts * np.arange(1, counts.size + 1)).sum() / n), 2)
+                    if n
+                    else None
+                ),
+            }
+
+        return {
+            "from": date_from,
+            "to": date_to,
+            "days": len(buckets),
+            "sessions": sum(b.sessions for b in buckets),
+            "distribution_bins": DISTRIBUTION_BINS.tolist(),
+            "scales": scales,
+            "items": items,
+        }
+
+    def stats(self) -> Dict:
+        """Statistiques du cache (buckets, rafraîchissements, réponses servies)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "buckets": len(self._buckets),
+                    "cached_responses": len(self._responses),
+                    "watermark": self._watermark,
+                }
+            )
+        return stats
@@ -2,79 +2,299 @@
 Gestionnaire de base de données SQLite pour le questionnaire EORTC QLQ-C30
 """
 
+import atexit
+import base64
+import json
 import sqlite3
+import time
 import uuid
 import datetime
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from .pool_flask import ConnectionPool
+from .write_behind_flask import WriteBehindFullError, WriteBehindQueue
 
-class DatabaseManager:
-    """Gestionnaire de base de données SQLite"""
-
-    def __init__(self, db_path: str = "data/responses.db"):
-        """Initialise le gestionnaire de base de données"""
-        self.db_path = db_path
-        self.init_database()
-
-    def init_database(self):
-        """Initialise la base de données avec les tables nécessaires"""
-        # Créer le dossier data s'il n'existe pas
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
 
-            # Table des sessions
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id TEXT PRIMARY KEY,
-                    initials TEXT NOT NULL,
-                    birth_date TEXT NOT NULL,
-                    today_date TEXT NOT NULL,
-                    mode TEXT NOT NULL,
-                    audio_enabled BOOLEAN NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP NULL
-                )
+# Migrations de schéma versionnées (PRAGMA user_version).
+# Chaque entrée : (version, description, liste d'instructions SQL).
+# Ne jamais modifier une migration déjà déployée : ajouter une nouvelle version.
+SCHEMA_MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (
+        1,
+        "Schéma initial : sessions, réponses et index",
+        [
             """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                initials TEXT NOT NULL,
+                birth_date TEXT NOT NULL,
+                today_date TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                audio_enabled BOOLEAN NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP NULL
             )
-
-            # Table des réponses
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS responses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    question_num INTEGER NOT NULL,
-                    question_text TEXT NOT NULL,
-                    score INTEGER NOT NULL,
-                    response_text TEXT NOT NULL,
-                    transcript TEXT,
-                    response_type TEXT NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (session_id) REFERENCES sessions(id)
-                )
+            """,
             """
+            CREATE TABLE IF NOT EXISTS responses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                question_num INTEGER NOT NULL,
+                question_text TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                response_text TEXT NOT NULL,
+                transcript TEXT,
+                response_type TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (session_id) REFERENCES sessions(id)
             )
-
-            # Index pour améliorer les performances
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_session_id ON responses(session_id)"
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_session_id ON responses(session_id)",
+            "CREATE INDEX IF NOT EXISTS idx_question_num ON responses(question_num)",
+        ],
+    ),
+    (
+        2,
+        "Contrainte UNIQUE(session_id, question_num) pour l'upsert des réponses",
+        [
+            # Conserver uniquement la réponse la plus récente de chaque question
+            """
+            DELETE FROM responses
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM responses GROUP BY session_id, question_num
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_question_num ON responses(question_num)"
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_responses_session_question
+            ON responses(session_id, question_num)
+            """,
+            # Couverts par le préfixe de l'index unique / jamais utilisés seuls
+            "DROP INDEX IF EXISTS idx_session_id",
+            "DROP INDEX IF EXISTS idx_question_num",
+        ],
+    ),
+    (
+        3,
+        "Table session_stats maintenue à chaque écriture de réponse",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS session_stats (
+                session_id TEXT PRIMARY KEY,
+                answered INTEGER NOT NULL DEFAULT 0,
+                score_sum INTEGER NOT NULL DEFAULT 0,
+                last_question INTEGER NULL,
+                last_activity TIMESTAMP NULL,
+                FOREIGN KEY (session_id) REFERENCES sessions(id)
+            ) WITHOUT ROWID
+            """,
+            # Reconstituer les compteurs des sessions existantes (hors question 0)
+            """
+            INSERT OR IGNORE INTO session_stats
+                (session_id, answered, score_sum, last_question, last_activity)
+            SELECT s.id,
+                   COUNT(r.id),
+                   COALESCE(SUM(r.score), 0),
+                   (SELECT r2.question_num FROM responses r2
+                    WHERE r2.session_id = s.id AND r2.question_num != 0
+                    ORDER BY r2.timestamp DESC, r2.id DESC LIMIT 1),
+                   MAX(r.timestamp)
+            FROM sessions s
+            LEFT JOIN responses r ON r.session_id = s.id AND r.question_num != 0
+            GROUP BY s.id
+            """,
+        ],
+    ),
+    (
+        4,
+        "Index de pagination par curseur (created_at, id) des sessions",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created_at, id)",
+            # Index partiels : le filtre terminé / en cours reste en O(taille de page)
+            """
+            CREATE INDEX IF NOT EXISTS idx_sessions_completed
+            ON sessions(created_at, id) WHERE completed_at IS NOT NULL
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_sessions_in_progress
+            ON sessions(created_at, id) WHERE completed_at IS NULL
+            """,
+        ],
+    ),
+    (
+        5,
+        "Index d'activité récente (invalidation du cache d'analyse de cohorte)",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_session_stats_activity ON session_stats(last_activity)",
+        ],
+    ),
+    (
+        6,
+        "Table transcription_jobs (transcriptions asynchrones, partagées entre workers)",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS transcription_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                result TEXT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP NULL
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_transcription_jobs_created ON transcription_jobs(created_at)",
+        ],
+    ),
+    (
+        7,
+        "Statut HTTP du résultat des transcriptions asynchrones",
+        [
+            "ALTER TABLE transcription_jobs ADD COLUMN http_status INTEGER NULL",
+        ],
+    ),
+]
+
+SESSION_STATUSES = ("completed", "in_progress")
+
+
+class DatabaseManager:
+    """Gestionnaire de base de données SQLite
+
+    Une seule instance par processus (``app.db``) : le schéma est migré une
+    fois au démarrage via ``migrate()``, jamais dans le chemin des requêtes.
+    """
+
+    # Nouvelles tentatives de BEGIN IMMEDIATE quand le busy timeout est épuisé
+    BUSY_RETRIES = 3
+    # Attente maximale d'un COMMIT différé quand l'appelant exige la durabilité
+    WRITE_WAIT_TIMEOUT = 10.0
+
+    def __init__(
+        self,
+        db_path: str = "data/responses.db",
+        pool_size: int = 4,
+        busy_timeout_ms: int = 5000,
+        mmap_size: int = 64 * 1024 * 1024,
+        synchronous: str = "NORMAL",
+        write_behind: bool = False,
+        write_behind_max_pending: int = 1000,
+        write_behind_max_delay_ms: int = 20,
+    ):
+        """Initialise le gestionnaire de base de données (sans toucher au schéma)"""
+        self.db_path = db_path
+        self.pool = ConnectionPool(
+            db_path,
+            size=pool_size,
+            busy_timeout_ms=busy_timeout_ms,
+            mmap_size=mmap_size,
+            synchronous=synchronous,
+        )
+
+        # Mode write-behind optionnel : commits groupés par un thread dédié
+        self.write_behind: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self.write_behind = WriteBehindQueue(
+                self._transaction,
+                max_pending=write_behind_max_pending,
+                max_delay=write_behind_max_delay_ms / 1000,
             )
+            # Vider la file quand Gunicorn recycle le worker (--max-requests)
+            atexit.register(self.close)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Connexion du pool en mode autocommit (lectures)"""
+        with self.pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Transaction d'écriture : verrou pris d'emblée, COMMIT ou ROLLBACK"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for attempt in range(self.BUSY_RETRIES + 1):
+                try:
+                    cursor.execute("BEGIN IMMEDIATE")
+                    break
+                except sqlite3.OperationalError as e:
+                    message = str(e).lower()
+                    if attempt == self.BUSY_RETRIES or (
+                        "locked" not in message and "busy" not in message
+                    ):
+                        raise
+                    self.pool.record_busy_retry()
+                    time.sleep(0.05 * (2**attempt))
+            try:
+                yield cursor
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def get_pool_stats(self) -> Dict:
+        """Statistiques du pool de connexions (checkouts, attentes, busy)"""
+        return self.pool.stats()
+
+    def get_write_behind_stats(self) -> Optional[Dict]:
+        """Statistiques de la file write-behind (None si désactivée)"""
+        return self.write_behind.stats() if self.write_behind else None
+
+    def close(self):
+        """Vide les écritures en attente puis ferme les connexions du pool"""
+        if self.write_behind is not None:
+            if not self.write_behind.close():
+                print("WARNING: Écritures différées non vidées à l'arrêt")
+        self.pool.close()
+
+    def migrate(self) -> int:
+        """Applique les migrations manquantes et retourne la version du schéma
+
+        Idempotent et sûr entre workers Gunicorn : la version est relue sous
+        verrou d'écriture (BEGIN IMMEDIATE) avant d'appliquer chaque étape.
+        """
+        # Créer le dossier data s'il n'existe pas
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
-            conn.commit()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            current = cursor.execute("PRAGMA user_version").fetchone()[0]
+            latest = SCHEMA_MIGRATIONS[-1][0]
+            if current >= latest:
+                return current
+
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                current = cursor.execute("PRAGMA user_version").fetchone()[0]
+                for version, description, statements in SCHEMA_MIGRATIONS:
+                    if version <= current:
+                        continue
+                    print(f"INFO: Migration schéma v{version} : {description}")
+                    for statement in statements:
+                        cursor.execute(statement)
+                    # PRAGMA n'accepte pas de paramètre lié
+                    cursor.execute(f"PRAGMA user_version = {int(version)}")
+                    current = version
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            return current
+
+    def init_database(self):
+        """Compatibilité : équivalent de ``migrate()``"""
+        return self.migrate()
+
+    def get_schema_version(self) -> int:
+        """Retourne la version courante du schéma"""
+        with self._connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
 
     def create_session(self, personal_info: Dict) -> str:
         """Crée une nouvelle session"""
         session_id = str(uuid.uuid4())
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._transaction() as cursor:
             cursor.execute(
                 """
                 INSERT INTO sessions (id, initials, birth_date, today_date, mode, audio_enabled)
@@ -89,14 +309,15 @@ class DatabaseManager:
                     personal_info.get("audio_enabled", True),
                 ),
             )
-            conn.commit()
+            cursor.execute(
+                "INSERT INTO session_stats (session_id) VALUES (?)", (session_id,)
+            )
 
         return session_id
 
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Récupère une session par son ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM sessions WHERE id = ?", (session_id,))
             row = cursor.fetchone()
@@ -114,48 +335,93 @@ class DatabaseManager:
         response_text: str,
         transcript: str = None,
         response_type: str = "manual",
+        wait: bool = False,
     ) -> bool:
-        """Sauvegarde une réponse"""
+        """Sauvegarde une réponse
+
+        En mode write-behind, la réponse est validée par lot en arrière-plan ;
+        ``wait=True`` attend son COMMIT avant de rendre la main.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # ✅ SUPPRIMER l'ancienne réponse si elle existe (éviter les doublons)
-                cursor.execute(
-                    """
-                    DELETE FROM responses 
-                    WHERE session_id = ? AND question_num = ?
-                    """,
-                    (session_id, question_num),
-                )
-                
-                # Insérer la nouvelle réponse
-                cursor.execute(
-                    """
-                    INSERT INTO responses (session_id, question_num, question_text, 
-                                        score, response_text, transcript, response_type)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        session_id,
-                        question_num,
-                        question_text,
-                        score,
-                        response_text,
-                        transcript,
-                        response_type,
-                    ),
-                )
-                conn.commit()
-            return True
+            return self._write(
+                lambda cursor: self._write_response(
+                    cursor,
+                    session_id,
+                    question_num,
+                    question_text,
+                    score,
+                    response_text,
+                    transcript,
+                    response_type,
+                ),
+                wait=wait,
+            )
         except Exception as e:
             print(f"Erreur sauvegarde réponse: {e}")
             return False
 
+    @staticmethod
+    def _write_response(
+        cursor: sqlite3.Cursor,
+        session_id: str,
+        question_num: int,
+        question_text: str,
+        score: int,
+        response_text: str,
+        transcript: Optional[str],
+        response_type: str,
+    ):
+        previous = cursor.execute(
+            "SELECT score FROM responses WHERE session_id = ? AND question_num = ?",
+            (session_id, question_num),
+        ).fetchone()
+
+        # ✅ UPSERT : une seule écriture, remplace l'éventuelle réponse précédente
+        cursor.execute(
+            """
+            INSERT INTO responses (session_id, question_num, question_text,
+                                score, response_text, transcript, response_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (session_id, question_num) DO UPDATE SET
+                question_text = excluded.question_text,
+                score = excluded.score,
+                response_text = excluded.response_text,
+                transcript = excluded.transcript,
+                response_type = excluded.response_type,
+                timestamp = CURRENT_TIMESTAMP
+            """,
+            (
+                session_id,
+                question_num,
+                question_text,
+                score,
+                response_text,
+                transcript,
+                response_type,
+            ),
+        )
+
+        # Statistiques incrémentales dans la même transaction (question 0 exclue)
+        if question_num != 0:
+            added = 0 if previous else 1
+            delta = score - previous[0] if previous else score
+            cursor.execute(
+                """
+                INSERT INTO session_stats
+                    (session_id, answered, score_sum, last_question, last_activity)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    answered = answered + excluded.answered,
+                    score_sum = score_sum + excluded.score_sum,
+                    last_question = excluded.last_question,
+                    last_activity = excluded.last_activity
+                """,
+                (session_id, added, delta, question_num),
+            )
+
     def get_responses(self, session_id: str) -> List[Dict]:
         """Récupère toutes les réponses d'une session"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -168,28 +434,59 @@ class DatabaseManager:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
 
-    def update_session_completion(self, session_id: str):
-        """Marque une session comme terminée"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+    def update_session_completion(self, session_id: str, wait: bool = False) -> bool:
+        """Marque une session comme terminée
+
+        ``wait=True`` garantit la durabilité de la session et de toutes les
+        réponses soumises auparavant (file FIFO en mode write-behind).
+        """
+        return self._write(
+            lambda cursor: cursor.execute(
                 """
                 UPDATE sessions 
                 SET completed_at = CURRENT_TIMESTAMP 
                 WHERE id = ?
             """,
                 (session_id,),
-            )
-            conn.commit()
+            ),
+            wait=wait,
+        )
+
+    def _write(self, apply, wait: bool = False) -> bool:
+        """Exécute ``apply(cursor)`` : en file write-behind si active, sinon directement"""
+        if self.write_behind is not None:
+            try:
+                ticket = self.write_behind.submit(apply)
+            except WriteBehindFullError as e:
+                # File saturée : écriture synchrone plutôt que perdre la réponse
+                print(f"WARNING: {e}, écriture synchrone")
+            else:
+                return ticket.wait(self.WRITE_WAIT_TIMEOUT) if wait else True
+
+        with self._transaction() as cursor:
+            apply(cursor)
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend la durabilité de toutes les écritures différées en cours"""
+        if self.write_behind is None:
+            return True
+        return self.write_behind.flush(
+            self.WRITE_WAIT_TIMEOUT if timeout is None else timeout
+        )
 
     def get_session_statistics(self, session_id: str) -> Dict:
-        """Calcule les statistiques d'une session"""
-        responses = self.get_responses(session_id)
+        """Statistiques d'une session (lecture d'une seule ligne de session_stats)"""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT answered, score_sum FROM session_stats WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
 
-        # ✅ FILTRER pour exclure la question 0
-        responses = [r for r in responses if r.get("question_num", 0) != 0]
+        answered = row["answered"] if row else 0
 
-        if not responses:
+        # ✅ La question 0 n'est jamais comptée dans session_stats
+        if not answered:
             return {
                 "total_questions": 30,
                 "answered": 0,
@@ -198,25 +495,20 @@ class DatabaseManager:
                 "average_score": 0.0,
             }
 
-        valid_responses = [r for r in responses if r.get("score") is not None]
-        scores = [
-            r["score"]
-            for r in valid_responses
-            if isinstance(r.get("score"), (int, float))
-        ]
-
         stats = {
             "total_questions": 30,
-            "answered": len(valid_responses),
-            "missed": 30 - len(valid_responses),
-            "completion_rate": (len(valid_responses) / 30) * 100,
-            "average_score": sum(scores) / len(scores) if scores else 0.0,
+            "answered": answered,
+            "missed": 30 - answered,
+            "completion_rate": (answered / 30) * 100,
+            "average_score": row["score_sum"] / answered,
         }
 
         return stats
 
     def export_session_data(self, session_id: str) -> Dict:
         """Exporte toutes les données d'une session"""
+        from scoring_logic import score_session
+
         session = self.get_session(session_id)
         responses = self.get_responses(session_id)
         statistics = self.get_session_statistics(session_id)
@@ -225,6 +517,7 @@ class DatabaseManager:
             "session": session,
             "responses": responses,
             "statistics": statistics,
+            "scales": score_session(responses),
             "metadata": {
                 "questionnaire": "EORTC QLQ-C30",
                 "version": "3.0",
@@ -235,43 +528,361 @@ class DatabaseManager:
     def delete_session(self, session_id: str) -> bool:
         """Supprime une session et ses réponses"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._transaction() as cursor:
                 cursor.execute(
                     "DELETE FROM responses WHERE session_id = ?", (session_id,)
                 )
+                cursor.execute(
+                    "DELETE FROM session_stats WHERE session_id = ?", (session_id,)
+                )
                 cursor.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
-                conn.commit()
             return True
         except Exception as e:
             print(f"Erreur suppression session: {e}")
             return False
 
+    # Nombre de réponses et dernière réponse des listes de sessions : mêmes
+    # valeurs que COUNT(r.id) / MAX(r.timestamp) sur toutes les réponses
+    # (question 0 comprise), lues dans session_stats plus la seule ligne de la
+    # question 0 (index unique) au lieu d'agréger toutes les réponses.
+    # ``answered`` : questions 1 à 30 seulement (affichage « N/30 »)
+    SESSION_SUMMARY_COLUMNS = """
+                       COALESCE(st.answered, 0) as answered,
+                       COALESCE(st.answered, 0) + (q0.id IS NOT NULL) as response_count,
+                       CASE
+                           WHEN st.last_activity IS NULL OR q0.timestamp > st.last_activity
+                           THEN COALESCE(q0.timestamp, st.last_activity)
+                           ELSE st.last_activity
+                       END as last_response"""
+
     def get_all_sessions(self) -> List[Dict]:
-        """Récupère toutes les sessions (pour administration)"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """Récupère toutes les sessions (préférer ``list_sessions`` paginé)"""
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """
-                SELECT s.*, 
-                       COUNT(r.id) as response_count,
-                       MAX(r.timestamp) as last_response
+                f"""
+                SELECT s.*, {self.SESSION_SUMMARY_COLUMNS}
                 FROM sessions s
-                LEFT JOIN responses r ON s.id = r.session_id
-                GROUP BY s.id
+                LEFT JOIN session_stats st ON st.session_id = s.id
+                LEFT JOIN responses q0 ON q0.session_id = s.id AND q0.question_num = 0
                 ORDER BY s.created_at DESC
             """
             )
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
 
+    @staticmethod
+    def _session_filters(
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Tuple[List[str], List]:
+        """Clauses WHERE (alias ``s``) pour le statut et la période (dates ISO incluses)
+
+        Lève ValueError si le statut ou une date est invalide.
+        """
+        clauses, params = [], []
+        if status:
+            if status not in SESSION_STATUSES:
+                raise ValueError(f"Statut invalide: {status}")
+            clauses.append(
+                "s.completed_at IS NOT NULL"
+                if status == "completed"
+                else "s.completed_at IS NULL"
+            )
+        if date_from:
+            start = datetime.date.fromisoformat(date_from)
+            clauses.append("s.created_at >= ?")
+            params.append(start.isoformat())
+        if date_to:
+            # Borne haute exclusive : lendemain de la date demandée
+            end = datetime.date.fromisoformat(date_to) + datetime.timedelta(days=1)
+            clauses.append("s.created_at < ?")
+            params.append(end.isoformat())
+        return clauses, params
+
+    @staticmethod
+    def encode_cursor(created_at: str, session_id: str) -> str:
+        """Curseur opaque de pagination à partir de la dernière ligne d'une page"""
+        raw = json.dumps([created_at, session_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Décode un curseur ; lève ValueError s'il est invalide"""
+        try:
+            created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor))
+        except Exception:
+            raise ValueError("Curseur de pagination invalide")
+        return str(created_at), str(session_id)
+
+    def list_sessions(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Dict:
+        """Page de sessions (plus récentes d'abord) avec pagination par curseur
+
+        Le coût est proportionnel à la taille de page quel que soit l'historique :
+        parcours de l'index (created_at, id) puis lecture de session_stats par clé.
+        """
+        limit = max(1, min(int(limit), 500))
+        clauses, params = self._session_filters(status, date_from, date_to)
+        if cursor:
+            clauses.append("(s.created_at, s.id) < (?, ?)")
+            params.extend(self.decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT s.*, {self.SESSION_SUMMARY_COLUMNS}
+                FROM sessions s
+                LEFT JOIN session_stats st ON st.session_id = s.id
+                LEFT JOIN responses q0 ON q0.session_id = s.id AND q0.question_num = 0
+                {where}
+                ORDER BY s.created_at DESC, s.id DESC
+                LIMIT ?
+            """,
+                (*params, limit + 1),
+            ).fetchall()
+
+        sessions = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = sessions[-1]
+            next_cursor = self.encode_cursor(last["created_at"], last["id"])
+
+        return {"sessions": sessions, "next_cursor": next_cursor, "limit": limit}
+
+    # Colonnes exportées (les réponses sont regroupées par session)
+    EXPORT_SESSION_COLUMNS = (
+        "id",
+        "initials",
+        "birth_date",
+        "today_date",
+        "mode",
+        "audio_enabled",
+        "created_at",
+        "completed_at",
+    )
+    EXPORT_RESPONSE_COLUMNS = (
+        "question_num",
+        "score",
+        "response_text",
+        "transcript",
+        "response_type",
+        "timestamp",
+    )
+
+    def iter_session_exports(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict]:
+        """Itère sur les sessions et leurs réponses depuis un seul curseur ordonné
+
+        Chaque élément vaut ``{"session": {...}, "responses": [...]}`` ; la mémoire
+        reste constante quel que soit le nombre de sessions exportées. Les filtres
+        sont validés immédiatement (ValueError), avant toute lecture.
+        """
+        clauses, params = self._session_filters(status, date_from, date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        session_cols = ", ".join(f"s.{c}" for c in self.EXPORT_SESSION_COLUMNS)
+        response_cols = ", ".join(f"r.{c}" for c in self.EXPORT_RESPONSE_COLUMNS)
+        query = f"""
+            SELECT {session_cols}, {response_cols}
+            FROM sessions s
+            LEFT JOIN responses r ON r.session_id = s.id
+            {where}
+            ORDER BY s.created_at, s.id, r.question_num
+        """
+        return self._iter_grouped_exports(query, params, batch_size)
+
+    def _iter_grouped_exports(self, query: str, params: List, batch_size: int):
+        n_session = len(self.EXPORT_SESSION_COLUMNS)
+        with self._connection() as conn:
+            cursor = conn.execute(query, params)
+            cursor.row_factory = None  # tuples : moins d'allocations que sqlite3.Row
+            current = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    if current is None or current["session"]["id"] != row[0]:
+                        if current is not None:
+                            yield current
+                        current = {
+                            "session": dict(zip(self.EXPORT_SESSION_COLUMNS, row)),
+                            "responses": [],
+                        }
+                    if row[n_session] is not None:
+                        current["responses"].append(
+                            dict(zip(self.EXPORT_RESPONSE_COLUMNS, row[n_session:]))
+                        )
+            if current is not None:
+                yield current
+
+    def build_score_matrix(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        batch_size: int = 5000,
+    ) -> Dict:
+        """Matrice dense sessions × 30 items (voir ``models.score_matrix_flask``)
+
+        Un seul instantané de lecture : comptage pour préallouer, puis une ligne
+        par session dont les réponses sont empaquetées par SQLite (deux
+        caractères par réponse : numéro de question, score) et décodées par
+        lots avec NumPy, sans objet Python par réponse.
+        """
+        import numpy as np
+
+        from .score_matrix_flask import empty_score_matrix
+
+        clauses, params = self._session_filters(status, date_from, date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connection() as conn:
+            conn.execute("BEGIN")  # instantané de lecture cohérent (WAL)
+            try:
+                count = conn.execute(
+                    f"SELECT COUNT(*) FROM sessions s {where}", params
+                ).fetchone()[0]
+                matrix = empty_score_matrix(count)
+
+                cursor = conn.execute(
+                    f"""
+                    SELECT s.id, s.created_at, s.completed_at,
+                           (SELECT group_concat(char(r.question_num, r.score), '')
+                            FROM responses r
+                            WHERE r.session_id = s.id
+                              AND r.question_num BETWEEN 1 AND 30
+                              AND r.score BETWEEN 1 AND 7)
+                    FROM sessions s
+                    {where}
+                    ORDER BY s.created_at, s.id
+                """,
+                    params,
+                )
+                cursor.row_factory = None
+                offset = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    end = offset + len(rows)
+                    session_ids, created, completed, packed = zip(*rows)
+                    matrix["session_ids"][offset:end] = session_ids
+                    matrix["created_at"][offset:end] = created
+                    matrix["completed_at"][offset:end] = [c or "NaT" for c in completed]
+
+                    packed = [p or "" for p in packed]
+                    counts = np.fromiter(map(len, packed), np.intp, len(packed)) // 2
+                    pairs = np.frombuffer(
+                        "".join(packed).encode("latin-1"), dtype=np.uint8
+                    ).reshape(-1, 2)
+                    rows_idx = np.repeat(np.arange(offset, end), counts)
+                    matrix["scores"][rows_idx, pairs[:, 0].astype(np.intp) - 1] = pairs[:, 1]
+                    offset = end
+            finally:
+                conn.execute("COMMIT")
+
+        return matrix
+
+    def get_active_days(self, since: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """Jours de création des sessions ayant reçu des réponses depuis ``since``
+
+        Retourne ``(jours, filigrane)`` : le filigrane (dernière activité vue)
+        sert de ``since`` à l'appel suivant. Bornes incluses : la dernière
+        seconde est relue, jamais manquée. Parcours de l'index d'activité.
+        """
+        with self._connection() as conn:
+            if since is None:
+                row = conn.execute("SELECT MAX(last_activity) FROM session_stats").fetchone()
+                return [], row[0]
+            rows = conn.execute(
+                """
+                SELECT date(s.created_at) AS day, MAX(st.last_activity)
+                FROM session_stats st
+                JOIN sessions s ON s.id = st.session_id
+                WHERE st.last_activity >= ?
+                GROUP BY day
+            """,
+                (since,),
+            ).fetchall()
+        watermark = max([row[1] for row in rows], default=since)
+        return sorted(row[0] for row in rows), watermark
+
+    def count_sessions(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> int:
+        """Compte les sessions enregistrées (filtres optionnels)"""
+        clauses, params = self._session_filters(status, date_from, date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connection() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM sessions s {where}", params
+            ).fetchone()[0]
+
+    def create_transcription_job(self, job_id: str):
+        """Enregistre une transcription asynchrone en attente"""
+        with self._transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO transcription_jobs (id) VALUES (?)", (job_id,)
+            )
+
+    def finish_transcription_job(
+        self, job_id: str, status: str, result: Dict, http_status: Optional[int] = None
+    ):
+        """Enregistre le résultat (JSON) et le statut HTTP d'une transcription terminée"""
+        with self._transaction() as cursor:
+            cursor.execute(
+                """
+                UPDATE transcription_jobs
+                SET status = ?, result = ?, http_status = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (status, json.dumps(result, ensure_ascii=False), http_status, job_id),
+            )
+
+    def get_transcription_job(self, job_id: str) -> Optional[Dict]:
+        """État d'une transcription (None si inconnue ou purgée)"""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT id, status, result, http_status, created_at, finished_at FROM transcription_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def cleanup_transcription_jobs(self, max_age_seconds: float = 600) -> int:
+        """Supprime les transcriptions plus anciennes que ``max_age_seconds``"""
+        with self._transaction() as cursor:
+            cursor.execute(
+                "DELETE FROM transcription_jobs WHERE created_at < datetime('now', ?)",
+                (f"-{int(max_age_seconds)} seconds",),
+            )
+            return cursor.rowcount
+
     def cleanup_old_sessions(self, days: int = 30) -> int:
         """Nettoie les sessions anciennes"""
         cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days)
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._transaction() as cursor:
             cursor.execute(
                 """
                 DELETE FROM responses 
@@ -283,6 +894,17 @@ class DatabaseManager:
                 (cutoff_date,),
             )
 
+            cursor.execute(
+                """
+                DELETE FROM session_stats 
+                WHERE session_id IN (
+                    SELECT id FROM sessions 
+                    WHERE created_at < ?
+                )
+            """,
+                (cutoff_date,),
+            )
+
             cursor.execute(
                 """
                 DELETE FROM sessions 
@@ -291,5 +913,4 @@ class DatabaseManager:
                 (cutoff_date,),
             )
 
-            conn.commit()
             return cursor.rowcount
@@ -0,0 +1,121 @@
+"""
+Sérialisation en flux des exports de sessions (NDJSON / CSV, gzip optionnel)
+
+Les fonctions prennent l'itérateur de ``DatabaseManager.iter_session_exports``
+et produisent des blocs d'octets : utilisables tels quels dans une réponse
+Flask en streaming ou écrits dans un fichier par la CLI. Chaque session est
+accompagnée de ses scores d'échelles QLQ-C30 (``scoring_logic``), calculés
+par lots.
+"""
+
+import csv
+import io
+import json
+import zlib
+from itertools import islice
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
+
+from scoring_logic import SCALE_CODES, score_matrix
+from .score_matrix_flask import MISSING_SCORE, N_ITEMS
+
+# format -> (type MIME, extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ".ndjson"),
+    "csv": ("text/csv", ".csv"),
+}
+
+QUESTION_NUMBERS = range(1, 31)
+
+
+def _group(chunks: Iterable[str], min_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Regroupe de petites chaînes en blocs d'environ ``min_size`` octets"""
+    buffer, size = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= min_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def with_scales(records: Iterable[Dict], batch_size: int = 1000) -> Iterator[Dict]:
+    """Ajoute ``record["scales"]`` ({code: score 0-100 ou None}) par lots vectorisés"""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        matrix = np.full((len(batch), N_ITEMS), MISSING_SCORE, dtype=np.uint8)
+        for row, record in enumerate(batch):
+            for response in record["responses"]:
+                question_num, score = response["question_num"], response["score"]
+                if 1 <= question_num <= N_ITEMS and score is not None and 1 <= score <= 7:
+                    matrix[row, question_num - 1] = score
+        results = {code: np.round(values, 1) for code, values in score_matrix(matrix).items()}
+        for row, record in enumerate(batch):
+            record["scales"] = {
+                code: None if np.isnan(results[code][row]) else float(results[code][row])
+                for code in SCALE_CODES
+            }
+            yield record
+
+
+def iter_ndjson(records: Iterable[Dict]) -> Iterator[bytes]:
+    """Une ligne JSON par session, réponses incluses"""
+    dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
+    return _group(dumps(record) + "\n" for record in records)
+
+
+def iter_csv(records: Iterable[Dict], session_columns: Iterable[str]) -> Iterator[bytes]:
+    """Une ligne CSV par session : colonnes de session, score q1..q30 puis échelles"""
+    session_columns = list(session_columns)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def lines():
+        writer.writerow(
+            session_columns + [f"q{n}" for n in QUESTION_NUMBERS] + list(SCALE_CODES)
+        )
+        for record in records:
+            scores = {r["question_num"]: r["score"] for r in record["responses"]}
+            session = record["session"]
+            writer.writerow(
+                [session.get(c) for c in session_columns]
+                + [scores.get(n, "") for n in QUESTION_NUMBERS]
+                + [
+                    "" if record["scales"][code] is None else record["scales"][code]
+                    for code in SCALE_CODES
+                ]
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    return _group(lines())
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compresse un flux d'octets à la volée (format gzip)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(db, fmt: str = "ndjson", compress: bool = False, **filters) -> Iterator[bytes]:
+    """Flux d'export complet ; ValueError si le format ou les filtres sont invalides"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export invalide: {fmt}")
+
+    records = with_scales(db.iter_session_exports(**filters))
+    if fmt == "csv":
+        chunks = iter_csv(records, db.EXPORT_SESSION_COLUMNS)
+    else:
+        chunks = iter_ndjson(records)
+    return iter_gzip(chunks) if compress else chunks
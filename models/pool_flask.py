@@ -0,0 +1,165 @@
+"""
+Pool de connexions SQLite thread-safe pour le questionnaire EORTC QLQ-C30
+
+Les connexions restent ouvertes entre les requêtes (une par thread actif au
+maximum) et sont configurées une seule fois : journal WAL, synchronous (NORMAL par défaut),
+I/O mappées en mémoire et busy timeout.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class PoolTimeoutError(Exception):
+    """Aucune connexion disponible dans le délai imparti"""
+
+
+class ConnectionPool:
+    """Pool borné de connexions SQLite longue durée"""
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = 4,
+        checkout_timeout: float = 10.0,
+        busy_timeout_ms: int = 5000,
+        mmap_size: int = 64 * 1024 * 1024,
+        synchronous: str = "NORMAL",
+    ):
+        self.db_path = db_path
+        # Une base :memory: n'existe que dans sa connexion : une seule connexion partagée
+        self.size = 1 if db_path == ":memory:" else max(1, size)
+        self.checkout_timeout = checkout_timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.mmap_size = mmap_size
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Mode synchronous invalide: {synchronous}")
+        self.synchronous = synchronous.upper()
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        # Statistiques pour dimensionner le pool
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._busy_retries = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre et configure une nouvelle connexion"""
+        # isolation_level=None : transactions explicites (BEGIN IMMEDIATE / COMMIT)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if self.db_path != ":memory:":
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Emprunte une connexion au pool et la restitue à la sortie"""
+        conn = self._checkout()
+        try:
+            yield conn
+        except BaseException:
+            # Ne jamais rendre au pool une connexion au milieu d'une transaction
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._checkin(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        if self._closed:
+            raise PoolTimeoutError("Pool de connexions fermé")
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                started = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Aucune connexion SQLite libre après {self.checkout_timeout}s"
+                    )
+                waited = time.perf_counter() - started
+                with self._lock:
+                    self._waits += 1
+                    self._wait_time_total += waited
+                    self._wait_time_max = max(self._wait_time_max, waited)
+
+        with self._lock:
+            self._checkouts += 1
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    def record_busy_retry(self):
+        """Comptabilise une nouvelle tentative après « database is locked »"""
+        with self._lock:
+            self._busy_retries += 1
+
+    def stats(self) -> Dict:
+        """Retourne les statistiques d'utilisation du pool"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_total_ms": self._wait_time_total * 1000,
+                "wait_time_max_ms": self._wait_time_max * 1000,
+                "wait_time_avg_ms": (
+                    self._wait_time_total / self._waits * 1000 if self._waits else 0.0
+                ),
+                "timeouts": self._timeouts,
+                "busy_retries": self._busy_retries,
+            }
+
+    def close(self):
+        """Ferme toutes les connexions inactives (les autres à leur restitution)"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,67 @@
+"""
+Matrice dense des scores (sessions × 30 items QLQ-C30) pour l'analyse
+
+Une ligne ``uint8`` par session, une colonne par item (Q1 en colonne 0),
+``MISSING_SCORE`` pour une réponse absente ; tableaux parallèles pour
+l'identifiant de session et les dates de création / fin.
+
+Sur disque : ``<nom>.npy`` (matrice, chargeable avec ``mmap_mode='r'``) et
+``<nom>.index.npz`` (identifiants et dates).
+"""
+
+import io
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+
+N_ITEMS = 30
+MISSING_SCORE = 255
+SESSION_ID_DTYPE = "<U36"
+
+
+def empty_score_matrix(n_sessions: int) -> Dict[str, np.ndarray]:
+    """Alloue une matrice vide (toutes les réponses manquantes)"""
+    return {
+        "scores": np.full((n_sessions, N_ITEMS), MISSING_SCORE, dtype=np.uint8),
+        "session_ids": np.empty(n_sessions, dtype=SESSION_ID_DTYPE),
+        "created_at": np.full(n_sessions, np.datetime64("NaT"), dtype="datetime64[s]"),
+        "completed_at": np.full(n_sessions, np.datetime64("NaT"), dtype="datetime64[s]"),
+    }
+
+
+def _paths(path: Union[str, Path]):
+    base = Path(path)
+    if base.suffix == ".npy":
+        base = base.with_suffix("")
+    return base.with_suffix(".npy"), base.with_suffix(".index.npz")
+
+
+def save_score_matrix(matrix: Dict[str, np.ndarray], path: Union[str, Path]):
+    """Écrit la matrice (.npy mappable) et son index (.index.npz)"""
+    scores_path, index_path = _paths(path)
+    scores_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(scores_path, np.ascontiguousarray(matrix["scores"]))
+    np.savez(
+        index_path,
+        session_ids=matrix["session_ids"],
+        created_at=matrix["created_at"],
+        completed_at=matrix["completed_at"],
+    )
+    return scores_path, index_path
+
+
+def load_score_matrix(path: Union[str, Path], mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Recharge une matrice ; avec ``mmap`` les scores ne sont lus qu'à l'accès"""
+    scores_path, index_path = _paths(path)
+    matrix = {"scores": np.load(scores_path, mmap_mode="r" if mmap else None)}
+    with np.load(index_path) as index:
+        matrix.update({key: index[key] for key in index.files})
+    return matrix
+
+
+def score_matrix_npz_bytes(matrix: Dict[str, np.ndarray]) -> bytes:
+    """Archive .npz compressée unique (téléchargement HTTP)"""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **matrix)
+    return buffer.getvalue()
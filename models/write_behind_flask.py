@@ -0,0 +1,224 @@
+"""
+File d'écriture différée (write-behind) à commit groupé
+
+Un thread d'écriture unique regroupe les écritures soumises par les threads
+de requête et les valide par lots : un seul COMMIT (donc un seul fsync) pour
+plusieurs réponses de patients arrivées au même moment.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class WriteBehindFullError(Exception):
+    """La file d'attente des écritures est pleine"""
+
+
+class WriteTicket:
+    """Reçu d'une écriture différée : permet d'attendre sa durabilité"""
+
+    __slots__ = ("_event", "error")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def _resolve(self, error: Optional[BaseException] = None):
+        self.error = error
+        self._event.set()
+
+    @property
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attend le COMMIT ; True si l'écriture est durable et sans erreur"""
+        return self._event.wait(timeout) and self.error is None
+
+
+class _PendingWrite:
+    __slots__ = ("apply", "ticket", "enqueued_at")
+
+    def __init__(self, apply: Optional[Callable], ticket: WriteTicket):
+        # apply=None : simple barrière utilisée par flush()
+        self.apply = apply
+        self.ticket = ticket
+        self.enqueued_at = time.perf_counter()
+
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """File bornée d'écritures validées par lots dans un thread dédié
+
+    ``transaction_factory`` retourne un context manager qui fournit un curseur
+    dans une transaction (``DatabaseManager._transaction``) ; chaque écriture
+    est une fonction ``apply(cursor)``.
+    """
+
+    def __init__(
+        self,
+        transaction_factory: Callable,
+        max_pending: int = 1000,
+        max_delay: float = 0.02,
+        max_batch: int = 256,
+        enqueue_timeout: float = 1.0,
+    ):
+        self._transaction = transaction_factory
+        self.max_delay = max_delay
+        self.max_batch = max(1, max_batch)
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._submitted = 0
+        self._committed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._batches = 0
+        self._largest_batch = 0
+        self._max_wait = 0.0
+
+        self._thread = threading.Thread(
+            target=self._run, name="sqlite-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, apply: Callable) -> WriteTicket:
+        """Met une écriture en file ; lève WriteBehindFullError si saturée"""
+        return self._put(_PendingWrite(apply, WriteTicket()))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend que toutes les écritures soumises avant l'appel soient validées"""
+        if self._closed:
+            return self._queue.unfinished_tasks == 0
+        # File FIFO et écrivain unique : la barrière passe après tout ce qui précède
+        barrier = self._put(_PendingWrite(None, WriteTicket()))
+        return barrier.wait(timeout)
+
+    def _put(self, item: _PendingWrite) -> WriteTicket:
+        if self._closed:
+            raise WriteBehindFullError("File d'écriture fermée")
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise WriteBehindFullError(
+                f"{self._queue.maxsize} écritures déjà en attente"
+            )
+        if item.apply is not None:
+            with self._lock:
+                self._submitted += 1
+        return item.ticket
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            deadline = time.perf_counter() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    nxt = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            self._commit(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _commit(self, batch: List[_PendingWrite]):
+        writes = [w for w in batch if w.apply is not None]
+        error = None
+        if writes:
+            try:
+                with self._transaction() as cursor:
+                    for write in writes:
+                        write.apply(cursor)
+            except Exception as e:
+                error = e
+
+            if error is not None:
+                # Isoler l'écriture fautive : rejouer une par une
+                print(f"WARNING: Lot d'écritures en échec ({error}), rejeu unitaire")
+                for write in writes:
+                    try:
+                        with self._transaction() as cursor:
+                            write.apply(cursor)
+                        write.ticket._resolve()
+                        self._count(committed=1)
+                    except Exception as e:
+                        print(f"Erreur écriture différée: {e}")
+                        write.ticket._resolve(e)
+                        self._count(failed=1)
+            else:
+                for write in writes:
+                    write.ticket._resolve()
+                self._count(committed=len(writes))
+
+        now = time.perf_counter()
+        with self._lock:
+            if writes:
+                self._batches += 1
+                self._largest_batch = max(self._largest_batch, len(writes))
+            self._max_wait = max(
+                self._max_wait, max(now - w.enqueued_at for w in batch)
+            )
+        # Les barrières ne sont libérées qu'après le COMMIT du lot
+        for write in batch:
+            if write.apply is None:
+                write.ticket._resolve()
+
+    def _count(self, committed: int = 0, failed: int = 0):
+        with self._lock:
+            self._committed += committed
+            self._failed += failed
+
+    def stats(self) -> Dict:
+        """Statistiques de la file (profondeur, lots, attente maximale)"""
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "max_pending": self._queue.maxsize,
+                "submitted": self._submitted,
+                "committed": self._committed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "batches": self._batches,
+                "largest_batch": self._largest_batch,
+                "avg_batch": self._committed / self._batches if self._batches else 0.0,
+                "max_wait_ms": self._max_wait * 1000,
+            }
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """Vide la file puis arrête le thread ; True si tout a été écrit"""
+        if self._closed:
+            return not self._thread.is_alive()
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return False
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
@@ -0,0 +1,175 @@
+"""
+Pré-génération des audios de l'application (questions, résultats, test audio)
+
+Liste tous les textes que l'application peut lire (``spoken_texts``), ignore
+ceux déjà présents dans le cache (même hash MD5 que ``AudioHandlerSimple``)
+et synthétise les autres en parallèle :
+
+- pool de threads borné (``--workers``), une session HTTP par thread ;
+- limitation de débit partagée (``--rate`` requêtes/seconde) ;
+- nouvel essai avec attente exponentielle sur erreur réseau, 429 ou 5xx ;
+- écriture atomique : une interruption ne laisse jamais de fichier tronqué,
+  et relancer le script reprend là où il s'était arrêté.
+
+Utilisation :
+    GOOGLE_CLOUD_API_KEY=... python pregenerate_audios.py
+    python pregenerate_audios.py --api-url http://127.0.0.1:8080/tts --cache-dir /tmp/cache
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict
+
+import requests
+
+from audio_handler_simple_flask import AudioHandlerSimple, SynthesisError
+from questionnaire_logic import spoken_texts
+
+
+class RateLimiter:
+    """Espacement minimal entre deux requêtes, partagé par tous les threads"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Pregenerator:
+    """Synthèse concurrente des textes manquants dans le cache"""
+
+    def __init__(
+        self,
+        handler: AudioHandlerSimple,
+        workers: int = 8,
+        rate: float = 4.0,
+        retries: int = 4,
+        backoff: float = 1.0,
+    ):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # Connexion HTTP réutilisée d'un texte à l'autre dans chaque thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _synthesize(self, text: str, force: bool) -> int:
+        """Synthétise un texte ; retourne le nombre de tentatives"""
+        for attempt in range(1, self.retries + 2):
+            self.limiter.wait()
+            try:
+                self.handler.synthesize_to_cache(text, force=force, session=self._session())
+                return attempt
+            except SynthesisError as e:
+                if not e.retryable or attempt > self.retries:
+                    raise
+                # Attente exponentielle avec gigue (ou Retry-After du serveur)
+                delay = e.retry_after or self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                print(f"WARNING: {e} - nouvel essai dans {delay:.1f}s ({attempt}/{self.retries})")
+                time.sleep(delay)
+
+    def run(self, texts: Dict[str, str], force: bool = False, dry_run: bool = False) -> Dict:
+        started = time.perf_counter()
+        pending = {
+            key: text
+            for key, text in texts.items()
+            if force or not self.handler._get_cache_path(text).exists()
+        }
+        report = {
+            "texts": len(texts),
+            "cached": len(texts) - len(pending),
+            "synthesized": 0,
+            "failed": [],
+            "retries": 0,
+        }
+        print(f"INFO: {len(texts)} textes, {report['cached']} déjà en cache, {len(pending)} à synthétiser")
+        if dry_run:
+            for key in pending:
+                print(f"  {key}")
+            return report
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self._synthesize, text, force): key
+                for key, text in pending.items()
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                try:
+                    attempts = future.result()
+                    report["synthesized"] += 1
+                    report["retries"] += attempts - 1
+                    print(f"INFO: [{done}/{len(pending)}] {key}")
+                except Exception as e:
+                    report["failed"].append(key)
+                    print(f"WARNING: [{done}/{len(pending)}] {key} en échec: {e}")
+
+        report["elapsed"] = time.perf_counter() - started
+        return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pré-génère les audios de l'application")
+    parser.add_argument("--workers", type=int, default=8, help="Synthèses simultanées (défaut 8)")
+    parser.add_argument("--rate", type=float, default=4.0, help="Requêtes par seconde (défaut 4, 0 = illimité)")
+    parser.add_argument("--retries", type=int, default=4, help="Nouveaux essais par texte (défaut 4)")
+    parser.add_argument("--api-url", default=os.environ.get("TTS_API_URL"), help="URL de l'API TTS (serveur local de test)")
+    parser.add_argument("--cache-dir", default=None, help="Dossier du cache (défaut : celui de AudioHandlerSimple)")
+    parser.add_argument("--cloud-tts", action="store_true", help="Cloud Text-to-Speech au lieu de Gemini TTS")
+    parser.add_argument("--flash", action="store_true", help="Modèle Gemini Flash au lieu de Pro")
+    parser.add_argument("--force", action="store_true", help="Régénérer même les textes en cache")
+    parser.add_argument("--dry-run", action="store_true", help="Lister les textes manquants sans synthèse")
+    args = parser.parse_args(argv)
+
+    handler = AudioHandlerSimple(
+        use_gemini_tts=not args.cloud_tts,
+        use_pro_model=not args.flash,
+        api_url=args.api_url,
+        cache_dir=args.cache_dir,
+    )
+    if not handler.api_key and not args.api_url and not args.dry_run:
+        print("ERREUR: GOOGLE_CLOUD_API_KEY requise (ou --api-url vers un serveur local)")
+        return 2
+
+    report = Pregenerator(
+        handler, workers=args.workers, rate=args.rate, retries=args.retries
+    ).run(spoken_texts(), force=args.force, dry_run=args.dry_run)
+
+    if not args.dry_run:
+        print(
+            f"INFO: {report['synthesized']} synthétisés, {report['cached']} déjà en cache, "
+            f"{len(report['failed'])} en échec, {report['retries']} nouveaux essais "
+            f"en {report['elapsed']:.1f}s"
+        )
+        if report["synthesized"]:
+            print(
+                "INFO: Recharger l'index (POST /api/audio_index/reload) ou redémarrer ; "
+                "puis python audio_renditions_flask.py et python audio_bundle_flask.py"
+            )
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,230 +3,368 @@ Logique métier du questionnaire EORTC QLQ-C30 avec Question 0
 """
 
 import datetime
+import hashlib
+import json
 import re
-from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+
+def _question_definitions() -> Dict:
+    """Définit toutes les questions du questionnaire incluant la Question 0"""
+    return {
+        # Question 0 : Tests audio et microphone
+        0: {
+            "text": "Question 0 - Tests préalables",
+            "scale": "test",
+            "options": ["Test audio réussi", "Microphone validé"],
+            "is_test_question": True,
+        },
+        # Questions 1-5 : Capacités physiques générales
+        1: {
+            "text": "Avez-vous des difficultés à faire certains efforts physiques pénibles comme porter un sac à provisions chargé ou une valise?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        2: {
+            "text": "Avez-vous des difficultés à faire une longue promenade?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        3: {
+            "text": "Avez-vous des difficultés à faire un petit tour dehors?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        4: {
+            "text": "Êtes-vous obligé de rester au lit ou dans un fauteuil pendant la journée?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        5: {
+            "text": "Avez-vous besoin d'aide pour manger, vous habiller, faire votre toilette ou aller aux toilettes?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        # Questions 6-28 : Au cours de la semaine passée
+        6: {
+            "text": "Au cours de la semaine passée : Avez-vous été gêné pour faire votre travail ou vos activités de tous les jours?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        7: {
+            "text": "Au cours de la semaine passée : Avez-vous été gêné dans vos activités de loisirs?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        8: {
+            "text": "Au cours de la semaine passée : Avez-vous eu le souffle court?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        9: {
+            "text": "Au cours de la semaine passée : Avez-vous ressenti de la douleur?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        10: {
+            "text": "Au cours de la semaine passée : Avez-vous eu besoin de repos?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        11: {
+            "text": "Au cours de la semaine passée : Avez-vous eu des difficultés pour dormir?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        12: {
+            "text": "Au cours de la semaine passée : Vous êtes-vous senti faible?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        13: {
+            "text": "Au cours de la semaine passée : Avez-vous manqué d'appétit?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        14: {
+            "text": "Au cours de la semaine passée : Avez-vous eu des nausées?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        15: {
+            "text": "Au cours de la semaine passée : Avez-vous vomi?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        16: {
+            "text": "Au cours de la semaine passée : Avez-vous été constipé?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        17: {
+            "text": "Au cours de la semaine passée : Avez-vous eu de la diarrhée?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        18: {
+            "text": "Au cours de la semaine passée : Étiez-vous fatigué?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        19: {
+            "text": "Au cours de la semaine passée : Des douleurs ont-elles perturbé vos activités quotidiennes?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        20: {
+            "text": "Au cours de la semaine passée : Avez-vous eu des difficultés à vous concentrer sur certaines choses?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        21: {
+            "text": "Au cours de la semaine passée : Vous êtes-vous senti tendu?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        22: {
+            "text": "Au cours de la semaine passée : Vous êtes-vous fait du souci?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        23: {
+            "text": "Au cours de la semaine passée : Vous êtes-vous senti irritable?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        24: {
+            "text": "Au cours de la semaine passée : Vous êtes-vous senti déprimé?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        25: {
+            "text": "Au cours de la semaine passée : Avez-vous eu des difficultés pour vous souvenir de certaines choses?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        26: {
+            "text": "Au cours de la semaine passée : Votre état physique ou votre traitement médical vous ont-ils gêné dans votre vie familiale?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        27: {
+            "text": "Au cours de la semaine passée : Votre état physique ou votre traitement médical vous ont-ils gêné dans vos activités sociales?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        28: {
+            "text": "Au cours de la semaine passée : Votre état physique ou votre traitement médical vous ont-ils causé des problèmes financiers?",
+            "scale": "1-4",
+            "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
+        },
+        # Questions 29-30 : Évaluation globale (échelle 1-7)
+        29: {
+            "text": """Comment évalueriez-vous votre état de santé au cours de la semaine passée?
+                Sur une échelle de 1 à 7, où 1 signifie "très mauvais" et 7 "excellent".""",
+            "scale": "1-7",
+            "options": [
+                "Un",
+                "Deux",
+                "Trois",
+                "Quatre",
+                "Cinq",
+                "Six",
+                "Sept",
+            ],
+        },
+        30: {
+            "text": """Comment évalueriez-vous l'ensemble de votre qualité de vie au cours de la semaine passée?
+                Sur une échelle de 1 à 7, où 1 signifie "très mauvaise" et 7 "excellente".""",
+            "scale": "1-7",
+            "options": [
+                "Un",
+                "Deux",
+                "Trois",
+                "Quatre",
+                "Cinq",
+                "Six",
+                "Sept",
+            ],
+        },
+    }
+
+
+# Lire les options pour Q0 (test), Q1 (première fois échelle 1-4)
+# et Q29 (changement d'échelle vers 1-7)
+READ_OPTIONS_QUESTIONS = frozenset({0, 1, 29})
+
+# Bornes des scores valides par type d'échelle
+SCALE_BOUNDS = {"1-4": (1, 4), "1-7": (1, 7)}
+
+
+def _speech_text(question_num: int, text: str, options: Tuple[str, ...]) -> str:
+    """Génère le texte à lire vocalement pour une question"""
+    # Question 0 spéciale - VERSION COURTE pour éviter timeout
+    if question_num == 0:
+        return """Question zéro. Tests audio et microphone. 
+            Si vous entendez ce message, l'audio fonctionne correctement. 
+            Cochez la case, puis testez le microphone en parlant clairement."""
+
+    speech_text = f"Question {question_num}. {text}"
+
+    # Ajouter les options si nécessaire
+    if question_num in READ_OPTIONS_QUESTIONS:
+        options_text = f"Répondez par {options[0]}, {', '.join(options[1:-1])}, ou {options[-1]}"
+        speech_text += f" {options_text}"
+
+    return speech_text
+
+
+@dataclass(frozen=True, slots=True)
+class Question:
+    """Question immuable du catalogue (texte de synthèse précalculé)"""
+
+    number: int
+    text: str
+    scale: str
+    options: Tuple[str, ...]
+    speech_text: str
+    is_test_question: bool = False
+
+    def to_dict(self) -> Dict:
+        """Représentation JSON (format historique de /api/get_question)"""
+        data = {
+            "text": self.text,
+            "scale": self.scale,
+            "options": list(self.options),
+            "speech_text": self.speech_text,
+        }
+        if self.is_test_question:
+            data["is_test_question"] = True
+        return data
+
+
+def _build_catalog() -> Mapping[int, Question]:
+    catalog = {}
+    for number, definition in _question_definitions().items():
+        options = tuple(definition["options"])
+        catalog[number] = Question(
+            number=number,
+            text=definition["text"],
+            scale=definition["scale"],
+            options=options,
+            speech_text=_speech_text(number, definition["text"], options),
+            is_test_question=definition.get("is_test_question", False),
+        )
+    return MappingProxyType(catalog)
+
+
+def _serialize_question(question: Question) -> Tuple[bytes, str]:
+    """Corps JSON de /api/get_question et son ETag fort (hash du contenu)"""
+    body = json.dumps(
+        {"success": True, "question": question.to_dict(), "question_num": question.number},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+
+# Construits une seule fois à l'import, partagés en lecture par tous les threads
+QUESTION_CATALOG: Mapping[int, Question] = _build_catalog()
+QUESTION_PAYLOADS: Mapping[int, Tuple[bytes, str]] = MappingProxyType(
+    {number: _serialize_question(q) for number, q in QUESTION_CATALOG.items()}
+)
+
+# Textes lus hors questions (page de résultat, test audio). L'indentation et les
+# espaces de fin proviennent des anciennes chaînes multilignes : ils font partie
+# du hash MD5 des audios pré-générés, ne pas les reformater.
+RESULT_AUDIO_TEXTS: Mapping[str, str] = MappingProxyType(
+    {
+        # Questionnaire complet (30/30)
+        "complete": (
+            "Félicitations, vous avez terminé le questionnaire. \n"
+            "        Vous avez répondu à 30 questions sur 30. \n"
+            "        Toutes les questions ont été répondues.\n"
+            "        Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire."
+        ),
+        # Questionnaire incomplet : message générique (« 29 questions ») pour tous les cas
+        "incomplete": (
+            "Félicitations, vous avez terminé le questionnaire. \n"
+            "        Vous avez répondu à 29 questions sur 30. \n"
+            "        1 questions restent sans réponse.\n"
+            "        Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire."
+        ),
+    }
+)
+
+
+def result_audio_text(answered: int) -> str:
+    """Message de fin exact pour un nombre de réponses (même gabarit que les
+    messages pré-générés : 29 réponses donne le message « incomplet »)"""
+    if answered >= 30:
+        return RESULT_AUDIO_TEXTS["complete"]
+    return (
+        "Félicitations, vous avez terminé le questionnaire. \n"
+        f"        Vous avez répondu à {answered} questions sur 30. \n"
+        f"        {30 - answered} questions restent sans réponse.\n"
+        "        Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire."
+    )
+
+
+# Segments du message de fin pour l'assemblage audio (audio_stitch_flask) :
+# intro, <réponses>, answered, <sans réponse>, missed, outro
+RESULT_SEGMENT_TEXTS: Mapping[str, str] = MappingProxyType(
+    {
+        "intro": "Félicitations, vous avez terminé le questionnaire. Vous avez répondu à",
+        "answered": "questions sur 30.",
+        "missed": "questions restent sans réponse.",
+        "outro": "Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire.",
+    }
+)
+NUMBER_TEXTS: Mapping[int, str] = MappingProxyType({n: str(n) for n in range(31)})
+
+
+TEST_AUDIO_TEXT = (
+    "Ceci est un test audio. Si vous entendez ce message, l'audio fonctionne correctement."
+)
+
+
+def spoken_texts() -> Dict[str, str]:
+    """Tous les textes que l'application peut lire (clé descriptive -> texte)
+
+    Source unique pour la pré-génération des audios (pregenerate_audios.py).
+    """
+    texts = {f"question_{n}": q.speech_text for n, q in QUESTION_CATALOG.items()}
+    texts.update({f"result_{kind}": text for kind, text in RESULT_AUDIO_TEXTS.items()})
+    texts.update({f"segment_{key}": text for key, text in RESULT_SEGMENT_TEXTS.items()})
+    texts.update({f"number_{n}": text for n, text in NUMBER_TEXTS.items()})
+    texts["test_audio"] = TEST_AUDIO_TEXT
+    return texts
 
 
 class EORTCQuestionnaire:
     """Classe gérant la logique du questionnaire EORTC QLQ-C30"""
 
     def __init__(self):
-        self.questions = self._setup_questions()
+        self.questions = QUESTION_CATALOG
 
-    def _setup_questions(self) -> Dict:
-        """Définit toutes les questions du questionnaire incluant la Question 0"""
-        return {
-            # Question 0 : Tests audio et microphone
-            0: {
-                "text": "Question 0 - Tests préalables",
-                "scale": "test",
-                "options": ["Test audio réussi", "Microphone validé"],
-                "is_test_question": True,
-            },
-            # Questions 1-5 : Capacités physiques générales
-            1: {
-                "text": "Avez-vous des difficultés à faire certains efforts physiques pénibles comme porter un sac à provisions chargé ou une valise?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            2: {
-                "text": "Avez-vous des difficultés à faire une longue promenade?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            3: {
-                "text": "Avez-vous des difficultés à faire un petit tour dehors?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            4: {
-                "text": "Êtes-vous obligé de rester au lit ou dans un fauteuil pendant la journée?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            5: {
-                "text": "Avez-vous besoin d'aide pour manger, vous habiller, faire votre toilette ou aller aux toilettes?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            # Questions 6-28 : Au cours de la semaine passée
-            6: {
-                "text": "Au cours de la semaine passée : Avez-vous été gêné pour faire votre travail ou vos activités de tous les jours?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            7: {
-                "text": "Au cours de la semaine passée : Avez-vous été gêné dans vos activités de loisirs?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            8: {
-                "text": "Au cours de la semaine passée : Avez-vous eu le souffle court?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            9: {
-                "text": "Au cours de la semaine passée : Avez-vous ressenti de la douleur?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            10: {
-                "text": "Au cours de la semaine passée : Avez-vous eu besoin de repos?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            11: {
-                "text": "Au cours de la semaine passée : Avez-vous eu des difficultés pour dormir?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            12: {
-                "text": "Au cours de la semaine passée : Vous êtes-vous senti faible?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            13: {
-                "text": "Au cours de la semaine passée : Avez-vous manqué d'appétit?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            14: {
-                "text": "Au cours de la semaine passée : Avez-vous eu des nausées?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            15: {
-                "text": "Au cours de la semaine passée : Avez-vous vomi?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            16: {
-                "text": "Au cours de la semaine passée : Avez-vous été constipé?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            17: {
-                "text": "Au cours de la semaine passée : Avez-vous eu de la diarrhée?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            18: {
-                "text": "Au cours de la semaine passée : Étiez-vous fatigué?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            19: {
-                "text": "Au cours de la semaine passée : Des douleurs ont-elles perturbé vos activités quotidiennes?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            20: {
-                "text": "Au cours de la semaine passée : Avez-vous eu des difficultés à vous concentrer sur certaines choses?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            21: {
-                "text": "Au cours de la semaine passée : Vous êtes-vous senti tendu?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            22: {
-                "text": "Au cours de la semaine passée : Vous êtes-vous fait du souci?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            23: {
-                "text": "Au cours de la semaine passée : Vous êtes-vous senti irritable?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            24: {
-                "text": "Au cours de la semaine passée : Vous êtes-vous senti déprimé?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            25: {
-                "text": "Au cours de la semaine passée : Avez-vous eu des difficultés pour vous souvenir de certaines choses?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            26: {
-                "text": "Au cours de la semaine passée : Votre état physique ou votre traitement médical vous ont-ils gêné dans votre vie familiale?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            27: {
-                "text": "Au cours de la semaine passée : Votre état physique ou votre traitement médical vous ont-ils gêné dans vos activités sociales?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            28: {
-                "text": "Au cours de la semaine passée : Votre état physique ou votre traitement médical vous ont-ils causé des problèmes financiers?",
-                "scale": "1-4",
-                "options": ["Pas du tout", "Un peu", "Plutôt", "Beaucoup"],
-            },
-            # Questions 29-30 : Évaluation globale (échelle 1-7)
-            29: {
-                "text": """Comment évalueriez-vous votre état de santé au cours de la semaine passée?
-                Sur une échelle de 1 à 7, où 1 signifie "très mauvais" et 7 "excellent".""",
-                "scale": "1-7",
-                "options": [
-                    "Un",
-                    "Deux",
-                    "Trois",
-                    "Quatre",
-                    "Cinq",
-                    "Six",
-                    "Sept",
-                ],
-            },
-            30: {
-                "text": """Comment évalueriez-vous l'ensemble de votre qualité de vie au cours de la semaine passée?
-                Sur une échelle de 1 à 7, où 1 signifie "très mauvaise" et 7 "excellente".""",
-                "scale": "1-7",
-                "options": [
-                    "Un",
-                    "Deux",
-                    "Trois",
-                    "Quatre",
-                    "Cinq",
-                    "Six",
-                    "Sept",
-                ],
-            },
-        }
-
-    def get_question(self, question_num: int) -> Optional[Dict]:
+    def get_question(self, question_num: int) -> Optional[Question]:
         """Retourne les détails d'une question"""
         return self.questions.get(question_num)
 
+    def get_question_payload(self, question_num: int) -> Optional[Tuple[bytes, str]]:
+        """Retourne le JSON pré-sérialisé d'une question et son ETag"""
+        return QUESTION_PAYLOADS.get(question_num)
+
     def should_read_options(self, question_num: int) -> bool:
         """Détermine si on doit lire les options pour cette question"""
-        # Lire les options pour Q0 (test), Q1 (première fois échelle 1-4)
-        # et Q29 (changement d'échelle vers 1-7)
-        return question_num in [0, 1, 29]
+        return question_num in READ_OPTIONS_QUESTIONS
 
     def get_speech_text(self, question_num: int) -> str:
-        """Génère le texte à lire vocalement pour une question"""
+        """Retourne le texte à lire vocalement pour une question"""
         question = self.get_question(question_num)
-        if not question:
-            return ""
-
-        # Question 0 spéciale - VERSION COURTE pour éviter timeout
-        if question_num == 0:
-            return """Question zéro. Tests audio et microphone. 
-            Si vous entendez ce message, l'audio fonctionne correctement. 
-            Cochez la case, puis testez le microphone en parlant clairement."""
-
-        speech_text = f"Question {question_num}. {question['text']}"
-
-        # Ajouter les options si nécessaire
-        if self.should_read_options(question_num):
-            options = question["options"]
-            options_text = f"Répondez par {options[0]}, {', '.join(options[1:-1])}, ou {options[-1]}"
-            speech_text += f" {options_text}"
-
-        return speech_text
+        return question.speech_text if question else ""
 
     def validate_response(self, question_num: int, score: int) -> bool:
         """Valide qu'une réponse est dans la bonne plage"""
@@ -234,12 +372,11 @@ class EORTCQuestionnaire:
         if not question:
             return False
 
-        if question["scale"] == "test":
+        if question.scale == "test":
             return True  # Question 0 toujours valide
-        elif question["scale"] == "1-4":
-            return 1 <= score <= 4
-        elif question["scale"] == "1-7":
-            return 1 <= score <= 7
+        if question.scale in SCALE_BOUNDS:
+            low, high = SCALE_BOUNDS[question.scale]
+            return low <= score <= high
         return False
 
     def parse_date(self, text: str) -> Optional[str]:
@@ -312,6 +449,15 @@ class EORTCQuestionnaire:
             if scores:
                 stats["average_score"] = sum(scores) / len(scores)
 
+        # Scores officiels des échelles (manuel de cotation EORTC)
+        from scoring_logic import score_session
+
+        stats["scales"] = score_session(
+            {"question_num": int(num), "score": r.get("score")}
+            for num, r in responses.items()
+            if str(num).isdigit()
+        )
+
         return stats
 
     def export_to_dict(self, personal_info: Dict, responses: Dict) -> Dict:
@@ -4,12 +4,22 @@ Gestion AJAX : sessions, questions, reconnaissance vocale, audio
 Version corrigée avec système de hash MD5 pour les audios
 """
 
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    current_app,
+    redirect,
+    send_file,
+    stream_with_context,
+    url_for,
+)
 import datetime
 import os
 import hashlib
+import json
 from pathlib import Path
-import requests
 
 api_bp = Blueprint("api", __name__)
 
@@ -27,9 +37,7 @@ def start_session():
                 return jsonify({"error": f"Champ requis manquant: {field}"}), 400
 
         # Créer la session en base
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
 
         session_id = db.create_session(
             {
@@ -57,9 +65,7 @@ def start_session():
 def validate_session(session_id):
     """Valider qu'une session existe"""
     try:
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
         session = db.get_session(session_id)
 
         if not session:
@@ -96,17 +102,17 @@ def get_question(question_num):
         if not (0 <= question_num <= 30):
             return jsonify({"error": "Numéro de question invalide"}), 400
 
-        question = current_app.questionnaire.get_question(question_num)
-        if not question:
+        # JSON sérialisé une fois à l'import (catalogue immuable)
+        payload = current_app.questionnaire.get_question_payload(question_num)
+        if not payload:
             return jsonify({"error": "Question introuvable"}), 404
 
-        # Ajouter le texte de synthèse vocale
-        speech_text = current_app.questionnaire.get_speech_text(question_num)
-        question["speech_text"] = speech_text
-
-        return jsonify(
-            {"success": True, "question": question, "question_num": question_num}
-        )
+        body, etag = payload
+        response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        # Revalidation systématique : 304 sans corps si le client a déjà la question
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
 
     except Exception as e:
         return jsonify({"error": f"Erreur récupération question: {str(e)}"}), 500
@@ -127,6 +133,10 @@ def process_voice():
         session_id = data["session_id"]
         question_num = int(data["question_num"])
         transcript = data["transcript"]
+        # Hypothèses N-best de la reconnaissance du navigateur (optionnelles)
+        alternatives = [
+            alt for alt in data.get("alternatives") or [] if isinstance(alt, dict) and alt.get("transcript")
+        ] or [{"transcript": transcript}]
 
         # Vérifier que le transcript n'est pas vide
         if not transcript or transcript.strip() == "":
@@ -139,9 +149,7 @@ def process_voice():
             )
 
         # Vérifier que la session existe
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
         session = db.get_session(session_id)
         if not session:
             return jsonify({"error": "Session invalide"}), 400
@@ -151,65 +159,74 @@ def process_voice():
         if not question:
             return jsonify({"error": "Question introuvable"}), 404
 
-        # Interpréter la réponse vocale
-        score = current_app.voice_handler.interpret_response(
-            transcript, question["scale"]
-        )
+        body, status = _score_voice_answer(current_app, session_id, question, alternatives)
+        return jsonify(body), status
 
-        if not score:
-            return jsonify(
-                {
-                    "valid": False,
-                    "error": "Réponse non reconnue",
-                    "transcript": transcript,
-                    "suggestions": question["options"],
-                }
-            )
+    except Exception as e:
+        return jsonify({"error": f"Erreur traitement vocal: {str(e)}"}), 500
 
-        # Valider la réponse
-        if not current_app.questionnaire.validate_response(question_num, score):
-            return jsonify(
-                {
-                    "valid": False,
-                    "error": "Score invalide",
-                    "transcript": transcript,
-                    "score": score,
-                }
-            )
 
-        # Sauvegarder en base de données
-        from models.database_flask import DatabaseManager
+def _score_voice_answer(
+    app, session_id: str, question, alternatives, min_confidence: float = 0.0, accept=None
+) -> tuple:
+    """Interprète, valide et enregistre une réponse vocale : (corps JSON, statut)
 
-        db = DatabaseManager()
+    ``alternatives`` : hypothèses ``{"transcript", "confidence"}`` de la
+    reconnaissance dans leur ordre d'origine, toutes interprétées
+    (``interpret_alternatives``, filtre ``accept``). Sous ``min_confidence``
+    cumulée, la réponse est ignorée comme un silence (``fallback``). Session
+    déjà vérifiée par l'appelant. Sans contexte de requête : appelée aussi
+    depuis le pool de transcription.
+    """
+    match = app.voice_handler.interpret_alternatives(alternatives, question.scale, accept)
+    if match is None:
+        return {
+            "valid": False,
+            "error": "Réponse non reconnue",
+            "transcript": alternatives[0]["transcript"],
+            "suggestions": list(question.options),
+        }, 200
+
+    score, transcript = match["score"], match["transcript"]
+    if match["confidence"] < min_confidence:
+        print(f"⚠️ Réponse de faible confiance ignorée: {match['confidence']:.2f}")
+        return {"valid": False, "fallback": True, "transcript": transcript}, 200
+
+    # Valider la réponse
+    if not app.questionnaire.validate_response(question.number, score):
+        return {
+            "valid": False,
+            "error": "Score invalide",
+            "transcript": transcript,
+            "score": score,
+        }, 200
+
+    # Sauvegarder en base de données (même gestionnaire que la vérification)
+    success = app.db.save_response(
+        session_id=session_id,
+        question_num=question.number,
+        question_text=question.text,
+        score=score,
+        response_text=f"Vocal: {transcript}",
+        transcript=transcript,
+        response_type="voice",
+    )
 
-        success = db.save_response(
-            session_id=session_id,
-            question_num=question_num,
-            question_text=question["text"],
-            score=score,
-            response_text=f"Vocal: {transcript}",
-            transcript=transcript,
-            response_type="voice",
-        )
+    if not success:
+        return {"error": "Erreur sauvegarde"}, 500
 
-        if not success:
-            return jsonify({"error": "Erreur sauvegarde"}), 500
+    # Déterminer la question suivante
+    next_question = question.number + 1 if question.number < 30 else None
 
-        # Déterminer la question suivante
-        next_question = question_num + 1 if question_num < 30 else None
-
-        return jsonify(
-            {
-                "valid": True,
-                "score": score,
-                "response_text": question["options"][score - 1],
-                "next_question": next_question,
-                "is_complete": next_question is None,
-            }
-        )
-
-    except Exception as e:
-        return jsonify({"error": f"Erreur traitement vocal: {str(e)}"}), 500
+    return {
+        "valid": True,
+        "score": score,
+        "transcript": transcript,
+        "confidence": round(match["confidence"], 3),
+        "response_text": question.options[score - 1],
+        "next_question": next_question,
+        "is_complete": next_question is None,
+    }, 200
 
 
 @api_bp.route("/save_manual_response", methods=["POST"])
@@ -238,16 +255,14 @@ def save_manual_response():
             return jsonify({"error": "Score invalide"}), 400
 
         # Sauvegarder en base de données
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
 
         success = db.save_response(
             session_id=session_id,
             question_num=question_num,
-            question_text=question["text"],
+            question_text=question.text,
             score=score,
-            response_text=f"Manuel: {question['options'][score-1]}",
+            response_text=f"Manuel: {question.options[score - 1]}",
             response_type="manual",
         )
 
@@ -261,7 +276,7 @@ def save_manual_response():
             {
                 "success": True,
                 "score": score,
-                "response_text": question["options"][score - 1],
+                "response_text": question.options[score - 1],
                 "next_question": next_question,
                 "is_complete": next_question is None,
             }
@@ -271,58 +286,284 @@ def save_manual_response():
         return jsonify({"error": f"Erreur sauvegarde manuelle: {str(e)}"}), 500
 
 
-def _get_audio_cache_path(text: str) -> Path:
+def _get_audio_entry(text: str):
     """
-    Calculer le chemin du fichier audio avec la même logique que audio_handler
-    Utilise le hash MD5 pour retrouver le fichier
+    Fichier audio d'un texte (même hash MD5 que audio_handler)
+    Recherche dans l'index en mémoire : aucun accès disque
+    """
+    return _with_on_demand(current_app.audio_index.lookup(text), text)
+
+
+def _with_on_demand(entry, text: str):
+    """Résultat d'une recherche dans l'index, complété par la synthèse à la demande
+
+    Si l'audio manque et qu'une API TTS est configurée, le texte est
+    synthétisé (une seule requête amont par texte, même sous concurrence)
+    puis ajouté à l'index. Retourne None si l'audio reste indisponible.
     """
-    # Utiliser la même logique que dans AudioHandlerSimple._get_cache_path()
-    voice_name = "Achernar"
-    cache_key = f"{voice_name}_{text}"
-    text_hash = hashlib.md5(cache_key.encode("utf-8")).hexdigest()
+    handler = current_app.audio_handler
+    if handler is None:
+        return entry
+    if entry is not None and entry.path is not None and handler.may_evict(entry.path):
+        if not entry.path.exists():
+            # Évincé par un autre worker avant le prochain parcours de l'index
+            current_app.audio_index.forget(entry.path)
+            entry = None
+        else:
+            handler.record_hit(entry.path)
+    if entry is not None:
+        return entry
+
+    from audio_handler_simple_flask import SynthesisError
+
+    try:
+        path = handler.get_or_synthesize(text)
+    except SynthesisError as e:
+        print(f"WARNING: Synthèse à la demande impossible: {e}")
+        return None
+
+    # Nom du fichier = hash du texte pour la voix du gestionnaire
+    audio_index = current_app.audio_index
+    entry = audio_index.for_text_hash(path.stem)
+    if entry is None:
+        audio_index.reload()
+        entry = audio_index.for_text_hash(path.stem)
+    return entry
 
-    # Chercher dans tous les sous-dossiers de cache
-    cache_base = Path("static/audio_cache")
 
-    # Chercher le fichier dans tous les sous-dossiers
-    for cache_dir in cache_base.glob("*"):
-        if cache_dir.is_dir():
-            audio_file = cache_dir / f"{text_hash}.wav"
-            if audio_file.exists():
-                return audio_file
+# Un an : l'URL change avec le contenu, le navigateur ne revalide jamais
+AUDIO_MAX_AGE = 365 * 24 * 3600
 
-    # Fallback : chercher directement dans le dossier de base
-    audio_file = cache_base / f"{text_hash}.wav"
-    if audio_file.exists():
-        return audio_file
 
-    return None
+def _audio_redirect(entry):
+    """Redirige vers l'URL immuable (adressée par contenu) d'un fichier audio"""
+    response = redirect(url_for("api.audio_file", content_hash=entry.content_hash), 302)
+    # La redirection elle-même suit le contenu courant : toujours revalidée
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+# Variantes servies : WAV source, μ-law 16 kHz (conteneur WAV) et FLAC
+AUDIO_CODECS = {"wav": "audio/wav", "ulaw": "audio/wav", "flac": "audio/flac"}
+
+
+def _negotiate_codec(entry):
+    """Choisit la variante : ``?codec=`` explicite, sinon en-têtes de la requête
+
+    ``Save-Data: on`` sélectionne μ-law, un ``Accept`` préférant
+    ``audio/flac`` sélectionne FLAC. Repli sur le WAV si la variante
+    n'a pas été construite. Retourne (codec, négocié par en-têtes).
+    """
+    requested = request.args.get("codec")
+    if requested:
+        return (requested if requested in entry.renditions else "wav"), False
+
+    if request.headers.get("Save-Data", "").lower() == "on" and "ulaw" in entry.renditions:
+        return "ulaw", True
+    accept = request.accept_mimetypes
+    if "flac" in entry.renditions and accept.quality("audio/flac") > accept.quality("audio/wav"):
+        return "flac", True
+    return "wav", True
+
+
+@api_bp.route("/audio/<content_hash>.wav")
+def audio_file(content_hash):
+    """Servir un fichier audio par le hash de son contenu
+
+    Cache-Control immutable, ETag fort (le hash), If-None-Match (304) et
+    requêtes Range (206) pour la lecture progressive et le déplacement.
+    Variante compressée via ``?codec=ulaw|flac`` ou négociation (Accept, Save-Data).
+    """
+    audio_index = current_app.audio_index
+    entry = audio_index.for_content_hash(content_hash)
+    if entry is None:
+        return jsonify({"error": "Audio introuvable"}), 404
+
+    codec, negotiated = _negotiate_codec(entry)
+    etag = entry.content_hash if codec == "wav" else f"{entry.content_hash}-{codec}"
+
+    bundle, clip = audio_index.bundle_clip(entry.content_hash) if codec == "wav" else (None, None)
+    if clip is not None:
+        response = _send_bundle_clip(bundle, clip, etag, entry.mtime)
+    elif codec == "wav" and entry.path is None:
+        # Paquet remplacé entre la recherche et l'envoi
+        return jsonify({"error": "Audio introuvable"}), 404
+    else:
+        path = entry.renditions[codec][0] if codec != "wav" else entry.path
+        try:
+            # Chemin relatif à l'index (répertoire courant), pas à la racine de l'application
+            response = send_file(
+                os.path.abspath(path),
+                mimetype=AUDIO_CODECS[codec],
+                as_attachment=False,
+                conditional=True,
+                etag=etag,
+                last_modified=entry.mtime,
+                max_age=AUDIO_MAX_AGE,
+            )
+        except FileNotFoundError:
+            # Fichier évincé depuis le dernier parcours : absent, pas une erreur 500
+            if codec == "wav":
+                audio_index.forget(path)
+            return jsonify({"error": "Audio introuvable"}), 404
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    if negotiated:
+        # Même URL, contenu dépendant des en-têtes : les caches doivent les distinguer
+        response.vary.update(("Accept", "Save-Data"))
+    return response
+
+
+def _send_bundle_clip(bundle, clip, etag, last_modified):
+    """Réponse pour un extrait du paquet audio (If-None-Match, Range)
+
+    Avec ``wsgi.file_wrapper`` (gunicorn), un descripteur positionné sur
+    l'extrait permet l'envoi par ``sendfile`` (zéro copie) ; sinon, les
+    octets sont lus directement dans le mmap du paquet.
+    """
+    from werkzeug.datastructures import ContentRange
+    from werkzeug.http import is_resource_modified
+
+    from audio_bundle_flask import CHUNK_SIZE
+
+    last_modified = datetime.datetime.fromtimestamp(int(last_modified), datetime.timezone.utc)
+    response = Response(mimetype="audio/wav", direct_passthrough=True)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.max_age = AUDIO_MAX_AGE
+    response.accept_ranges = "bytes"
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response.status_code = 304
+        return response
+
+    start, length = 0, clip.size
+    if_range = request.if_range
+    range_allowed = if_range.date is None and if_range.etag in (None, etag)
+    if request.range is not None and range_allowed:
+        bounds = request.range.range_for_length(clip.size)
+        if bounds is None:
+            response.status_code = 416
+            response.content_range = ContentRange("bytes", None, None, clip.size)
+            return response
+        start, length = bounds[0], bounds[1] - bounds[0]
+        response.status_code = 206
+        response.content_range = ContentRange("bytes", bounds[0], bounds[1], clip.size)
+
+    response.content_length = length
+    if request.method == "HEAD":
+        return response
+
+    file_wrapper = request.environ.get("wsgi.file_wrapper")
+    clip_file = bundle.open_clip(clip, start) if file_wrapper else None
+    if clip_file is not None:
+        # Content-Length borne l'envoi : gunicorn ne dépasse pas l'extrait
+        response.response = file_wrapper(clip_file, CHUNK_SIZE)
+    else:
+        response.response = bundle.iter_clip(clip, start, length)
+    return response
+
+
+def _audio_manifest_entry(question_num: int):
+    """URL, hash de contenu et durée du fichier audio d'une question (None si absent)"""
+    entry = current_app.audio_index.for_question(question_num)
+    if entry is None:
+        return None
+
+    return {
+        "hash": entry.content_hash,
+        "duration": entry.duration,
+        "size": entry.size,
+        # URL adressée par contenu : mise en cache immuable côté navigateur
+        "url": url_for("api.audio_file", content_hash=entry.content_hash),
+        # Variantes compressées disponibles : le client choisit selon son réseau
+        "renditions": {
+            codec: {
+                "url": url_for("api.audio_file", content_hash=entry.content_hash, codec=codec),
+                "size": size,
+            }
+            for codec, (_, size) in entry.renditions.items()
+        },
+    }
+
+
+@api_bp.route("/session/<session_id>/bootstrap")
+def session_bootstrap(session_id):
+    """Tout ce qu'il faut pour dérouler le questionnaire en une seule requête
+
+    Vérification de la session, catalogue des questions (Q0-Q30), manifeste
+    audio (URL, hash, durée) et réponses déjà enregistrées pour la reprise.
+    ETag + If-None-Match (304) : un rechargement de page ne retransfère rien.
+    """
+    try:
+        db = current_app.db
+        session_data = db.get_session(session_id)
+        if not session_data:
+            return jsonify({"valid": False, "error": "Session introuvable"}), 404
+
+        questionnaire = current_app.questionnaire
+        responses = [
+            {
+                "question_num": r["question_num"],
+                "score": r["score"],
+                "response_text": r["response_text"],
+            }
+            for r in db.get_responses(session_id)
+        ]
+        answered = {r["question_num"] for r in responses}
+
+        body = json.dumps(
+            {
+                "success": True,
+                "valid": True,
+                "session": session_data,
+                "questions": {
+                    number: question.to_dict()
+                    for number, question in questionnaire.questions.items()
+                },
+                "audio": {
+                    number: _audio_manifest_entry(number)
+                    for number in questionnaire.questions
+                },
+                "responses": responses,
+                "next_question": next(
+                    (n for n in range(1, 31) if n not in answered), None
+                ),
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur initialisation session: {str(e)}"}), 500
+
+    response = Response(body, mimetype="application/json")
+    response.set_etag(hashlib.sha256(body).hexdigest()[:32])
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
 
 
 @api_bp.route("/get_audio/<int:question_num>")
 def get_audio(question_num):
     """Servir fichier audio préenregistré pour une question (incluant Q0)"""
     try:
-        # Générer le texte de la question (même logique que lors de la pré-génération)
-        from questionnaire_logic import EORTCQuestionnaire
-
-        questionnaire = EORTCQuestionnaire()
-
         # ✅ MODIFICATION : Accepter la question 0
         if not (0 <= question_num <= 30):
             return jsonify({"error": "Numéro de question invalide"}), 400
 
-        speech_text = questionnaire.get_speech_text(question_num)
-
         print(f"DEBUG: Question {question_num}")
-        print(f"DEBUG: Texte: {speech_text[:80]}...")
 
-        # Utiliser le hash MD5 pour trouver le fichier
-        audio_path = _get_audio_cache_path(speech_text)
+        # Index audio : question -> fichier (hash MD5 du texte précalculé),
+        # sinon synthèse à la demande si une API TTS est configurée
+        entry = _with_on_demand(
+            current_app.audio_index.for_question(question_num),
+            current_app.questionnaire.get_speech_text(question_num),
+        )
 
-        if audio_path and audio_path.exists():
-            print(f"DEBUG: Fichier trouvé: {audio_path.name}")
-            return send_file(str(audio_path), mimetype="audio/wav", as_attachment=False)
+        if entry:
+            print(f"DEBUG: Fichier trouvé: {entry.text_hash}.wav")
+            return _audio_redirect(entry)
         else:
             print(f"DEBUG: Aucun fichier audio trouvé pour la question {question_num}")
             return (
@@ -346,32 +587,20 @@ def get_audio(question_num):
 def test_audio():
     """Servir un fichier audio de test"""
     try:
-        cache_dir = Path("static/audio_cache")
-
-        print(f"DEBUG: Recherche test audio dans {cache_dir}")
-
         # Chercher le fichier de test avec le hash
-        test_text = "Ceci est un test audio. Si vous entendez ce message, l'audio fonctionne correctement."
-        test_audio_path = _get_audio_cache_path(test_text)
+        from questionnaire_logic import TEST_AUDIO_TEXT
 
-        if test_audio_path and test_audio_path.exists():
-            print(f"DEBUG: Fichier test trouvé: {test_audio_path.name}")
-            return send_file(
-                str(test_audio_path), mimetype="audio/wav", as_attachment=False
-            )
+        test_entry = _get_audio_entry(TEST_AUDIO_TEXT)
+
+        if test_entry:
+            print(f"DEBUG: Fichier test trouvé: {test_entry.text_hash}.wav")
+            return _audio_redirect(test_entry)
 
-        # Fallback : chercher n'importe quel fichier .wav
-        if cache_dir.exists():
-            for subdir in cache_dir.glob("*"):
-                if subdir.is_dir():
-                    wav_files = list(subdir.glob("*.wav"))
-                    if wav_files:
-                        print(
-                            f"DEBUG: Utilisation du premier fichier trouvé: {wav_files[0].name}"
-                        )
-                        return send_file(
-                            str(wav_files[0]), mimetype="audio/wav", as_attachment=False
-                        )
+        # Fallback : n'importe quel fichier .wav de l'index
+        entry = current_app.audio_index.any_entry()
+        if entry:
+            print(f"DEBUG: Utilisation du premier fichier trouvé: {entry.text_hash}.wav")
+            return _audio_redirect(entry)
 
         return jsonify({"error": "Aucun fichier audio de test trouvé"}), 404
 
@@ -383,18 +612,28 @@ def test_audio():
         return jsonify({"error": f"Erreur test audio: {str(e)}"}), 500
 
 
+@api_bp.route("/audio_index/reload", methods=["POST"])
+def reload_audio_index():
+    """Reconstruire l'index audio (après ajout de fichiers pré-générés)"""
+    try:
+        stats = current_app.audio_index.reload()
+        return jsonify({"success": True, "audio_index": stats})
+    except Exception as e:
+        return jsonify({"error": f"Erreur rechargement index audio: {str(e)}"}), 500
+
+
 @api_bp.route("/get_session_data/<session_id>")
 def get_session_data(session_id):
     """Récupérer les données d'une session"""
     try:
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
 
         session_data = db.get_session(session_id)
         if not session_data:
             return jsonify({"error": "Session introuvable"}), 404
 
+        from scoring_logic import score_session
+
         responses = db.get_responses(session_id)
         statistics = db.get_session_statistics(session_id)
 
@@ -404,6 +643,7 @@ def get_session_data(session_id):
                 "session": session_data,
                 "responses": responses,
                 "statistics": statistics,
+                "scales": score_session(responses),
             }
         )
 
@@ -415,11 +655,11 @@ def get_session_data(session_id):
 def complete_session(session_id):
     """Marquer une session comme terminée"""
     try:
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
 
-        db.update_session_completion(session_id)
+        # Attendre la durabilité (fin de session + réponses encore en file)
+        if not db.update_session_completion(session_id, wait=True):
+            return jsonify({"error": "Erreur finalisation session: écriture non confirmée"}), 500
 
         return jsonify({"success": True, "message": "Session marquée comme terminée"})
 
@@ -431,9 +671,7 @@ def complete_session(session_id):
 def export_session(session_id):
     """Exporter les données d'une session"""
     try:
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
 
         export_data = db.export_session_data(session_id)
 
@@ -443,6 +681,114 @@ def export_session(session_id):
         return jsonify({"error": f"Erreur export: {str(e)}"}), 500
 
 
+@api_bp.route("/export_sessions")
+def export_sessions():
+    """Exporter toutes les sessions en flux (mémoire constante)
+
+    Paramètres : format (ndjson|csv|npz), gzip (1), from, to (YYYY-MM-DD), completed_only (1)
+    Le format npz est la matrice dense sessions × 30 items (uint8, 255 = manquant),
+    avec un tableau ``scale_<code>`` (float32, NaN = non calculable) par échelle.
+    """
+    from models.export_flask import EXPORT_FORMATS, export_stream
+
+    fmt = request.args.get("format", "ndjson")
+    compress = request.args.get("gzip", "0").lower() in ("1", "true")
+    completed_only = request.args.get("completed_only", "0").lower() in ("1", "true")
+
+    if fmt == "npz":
+        from models.score_matrix_flask import score_matrix_npz_bytes
+        from scoring_logic import score_matrix
+
+        try:
+            matrix = current_app.db.build_score_matrix(
+                status="completed" if completed_only else None,
+                date_from=request.args.get("from") or None,
+                date_to=request.args.get("to") or None,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        for code, values in score_matrix(matrix["scores"]).items():
+            matrix[f"scale_{code}"] = values.astype("float32")
+
+        filename = f"eortc_scores_{datetime.date.today().isoformat()}.npz"
+        return Response(
+            score_matrix_npz_bytes(matrix),
+            mimetype="application/octet-stream",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    try:
+        chunks = export_stream(
+            current_app.db,
+            fmt,
+            compress,
+            status="completed" if completed_only else None,
+            date_from=request.args.get("from") or None,
+            date_to=request.args.get("to") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"eortc_sessions_{datetime.date.today().isoformat()}{extension}"
+    if compress:
+        mimetype, filename = "application/gzip", filename + ".gz"
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@api_bp.route("/admin/sessions")
+def admin_sessions():
+    """Lister les sessions par pages (curseur ``next_cursor``)
+
+    Paramètres : limit, cursor, status (completed|in_progress), from, to (YYYY-MM-DD)
+    """
+    try:
+        page = current_app.db.list_sessions(
+            limit=request.args.get("limit", 50, type=int),
+            cursor=request.args.get("cursor"),
+            status=request.args.get("status") or None,
+            date_from=request.args.get("from") or None,
+            date_to=request.args.get("to") or None,
+        )
+        return jsonify({"success": True, **page})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur liste des sessions: {str(e)}"}), 500
+
+
+@api_bp.route("/analytics/cohort")
+def analytics_cohort():
+    """Agrégats de la cohorte : scores d'échelles (moyenne, percentiles,
+    distribution) et histogrammes par item
+
+    Paramètres : from, to (YYYY-MM-DD, date de création des sessions).
+    Réponse servie depuis le cache mémoire, ETag + If-None-Match (304).
+    """
+    try:
+        body, etag = current_app.analytics.cohort(
+            date_from=request.args.get("from") or None,
+            date_to=request.args.get("to") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur analyse de cohorte: {str(e)}"}), 500
+
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    # Le client revalide toujours : 304 sans corps si rien n'a changé
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+
 @api_bp.route("/health")
 def health():
     """Endpoint de santé pour monitoring"""
@@ -503,44 +849,32 @@ def diagnostic():
                         }
                     )
 
-    # Test de correspondance question → audio
-    from questionnaire_logic import EORTCQuestionnaire
-    import hashlib
-
-    questionnaire = EORTCQuestionnaire()
+    # Test de correspondance question → audio (via l'index)
+    audio_index = current_app.audio_index
     audio_mapping = []
 
     for q_num in range(1, min(6, 31)):  # Tester les 5 premières questions
-        speech_text = questionnaire.get_speech_text(q_num)
-        voice_name = "Achernar"
-        cache_key = f"{voice_name}_{speech_text}"
-        expected_hash = hashlib.md5(cache_key.encode("utf-8")).hexdigest()
-
-        # Chercher le fichier
-        found = False
-        if audio_cache.exists():
-            for subdir in audio_cache.glob("*"):
-                if subdir.is_dir():
-                    audio_file = subdir / f"{expected_hash}.wav"
-                    if audio_file.exists():
-                        found = True
-                        audio_mapping.append(
-                            {
-                                "question": q_num,
-                                "hash": expected_hash,
-                                "found": True,
-                                "size": audio_file.stat().st_size,
-                            }
-                        )
-                        break
-
-        if not found:
+        speech_text = current_app.questionnaire.get_speech_text(q_num)
+        expected_hash = audio_index.text_hash(speech_text)
+        entry = audio_index.lookup(speech_text)
+
+        if entry:
+            audio_mapping.append(
+                {
+                    "question": q_num,
+                    "hash": expected_hash,
+                    "found": True,
+                    "size": entry.size,
+                }
+            )
+        else:
             audio_mapping.append(
                 {"question": q_num, "hash": expected_hash, "found": False}
             )
 
     # Base de données
-    db_path = Path("data/responses.db")
+    db = current_app.db
+    db_path = Path(db.db_path)
     db_status = {
         "exists": db_path.exists(),
         "size": db_path.stat().st_size if db_path.exists() else 0,
@@ -548,15 +882,13 @@ def diagnostic():
 
     if db_path.exists():
         try:
-            import sqlite3
-
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM sessions")
-                sessions_count = cursor.fetchone()[0]
-                db_status["sessions"] = sessions_count
+            db_status["schema_version"] = db.get_schema_version()
+            db_status["sessions"] = db.count_sessions()
         except Exception as e:
             db_status["error"] = str(e)
+    db_status["pool"] = db.get_pool_stats()
+    db_status["write_behind"] = db.get_write_behind_stats()
+    db_status["analytics"] = current_app.analytics.stats()
 
     return jsonify(
         {
@@ -568,6 +900,21 @@ def diagnostic():
                 "total_size_mb": total_audio_size / (1024 * 1024),
             },
             "audio_mapping_test": audio_mapping,
+            "audio_index": audio_index.stats(),
+            "result_audio": current_app.result_audio.stats(),
+            # Synthèse à la demande : taux de hit, évictions, latence amont
+            "audio_synthesis": (
+                current_app.audio_handler.get_cache_info()
+                if current_app.audio_handler is not None
+                else None
+            ),
+            "speech_client": current_app.speech_client.stats(),
+            # Détection d'activité vocale : extraits écartés, octets retirés
+            "voice_activity": current_app.voice_activity.stats(),
+            # Interprétations N-best (réponses reconnues grâce à une autre hypothèse)
+            "voice_interpretation": current_app.voice_handler.stats,
+            # Transcriptions asynchrones : profondeur de file, attente, refus
+            "transcriptions": current_app.transcriptions.stats(),
             "database": db_status,
             "timestamp": datetime.datetime.now().isoformat(),
         }
@@ -580,32 +927,21 @@ def get_result_audio(result_type):
     try:
         print(f"DEBUG: Demande audio résultat - type: {result_type}")
 
-        # Définir les textes selon le type de résultat
-        # ✅ IMPORTANT : Ces textes doivent être EXACTEMENT identiques à ceux de pregenerate_audios.py
-        if result_type == "complete":
-            # Message pour questionnaire complet (30/30)
-            audio_text = """Félicitations, vous avez terminé le questionnaire. 
-        Vous avez répondu à 30 questions sur 30. 
-        Toutes les questions ont été répondues.
-        Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire."""
-        elif result_type == "incomplete":
-            # Message pour questionnaire incomplet
-            # Note: Ce texte est générique, l'audio réel peut avoir des variations
-            audio_text = """Félicitations, vous avez terminé le questionnaire. 
-        Vous avez répondu à 29 questions sur 30. 
-        1 questions restent sans réponse.
-        Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire."""
-        else:
+        # Textes partagés avec pregenerate_audios.py (même hash MD5)
+        from questionnaire_logic import RESULT_AUDIO_TEXTS
+
+        audio_text = RESULT_AUDIO_TEXTS.get(result_type)
+        if audio_text is None:
             return jsonify({"error": "Type de résultat invalide"}), 400
 
         print(f"DEBUG: Texte audio: {audio_text[:50]}...")
 
         # Utiliser le hash MD5 pour trouver le fichier
-        audio_path = _get_audio_cache_path(audio_text)
+        audio_entry = _get_audio_entry(audio_text)
 
-        if audio_path and audio_path.exists():
-            print(f"DEBUG: Fichier audio trouvé: {audio_path.name}")
-            return send_file(str(audio_path), mimetype="audio/wav", as_attachment=False)
+        if audio_entry:
+            print(f"DEBUG: Fichier audio trouvé: {audio_entry.text_hash}.wav")
+            return _audio_redirect(audio_entry)
         else:
             print(f"DEBUG: Aucun fichier audio trouvé pour type: {result_type}")
             return (
@@ -626,39 +962,45 @@ def get_result_audio(result_type):
         return jsonify({"error": f"Erreur audio: {str(e)}"}), 500
 
 
+def _stitched_audio_response(body: bytes, etag: str):
+    """Message de fin assemblé, servi depuis la mémoire (ETag + If-None-Match)"""
+    response = Response(body, mimetype="audio/wav")
+    response.set_etag(etag)
+    # URL propre à la session : revalidée, mais un 304 évite le transfert
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
+
+
 @api_bp.route("/get_result_audio_dynamic/<session_id>")
 def get_result_audio_dynamic(session_id):
     """Servir l'audio préenregistré basé sur les statistiques réelles de la session"""
     try:
-        from models.database_flask import DatabaseManager
-
-        db = DatabaseManager()
+        db = current_app.db
         stats = db.get_session_statistics(session_id)
 
         print(f"DEBUG: Stats session {session_id}: {stats}")
 
-        # Choisir le message selon le nombre de questions répondues
-        # ✅ IMPORTANT : Ces textes doivent être EXACTEMENT identiques à ceux de pregenerate_audios.py
-        if stats["answered"] == 30:
-            # Message complet
-            audio_text = """Félicitations, vous avez terminé le questionnaire. 
-        Vous avez répondu à 30 questions sur 30. 
-        Toutes les questions ont été répondues.
-        Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire."""
-        else:
-            # Message incomplet (utiliser le message générique pré-enregistré)
-            # Note: L'audio pré-généré dit "29 questions" mais sera utilisé pour tous les cas incomplets
-            audio_text = """Félicitations, vous avez terminé le questionnaire. 
-        Vous avez répondu à 29 questions sur 30. 
-        1 questions restent sans réponse.
-        Vous pouvez maintenant télécharger vos résultats ou recommencer un nouveau questionnaire."""
-
-        # Trouver l'audio correspondant
-        audio_path = _get_audio_cache_path(audio_text)
-
-        if audio_path and audio_path.exists():
-            print(f"DEBUG: Fichier audio trouvé: {audio_path.name}")
-            return send_file(str(audio_path), mimetype="audio/wav", as_attachment=False)
+        # Message exact selon le nombre de réponses, par ordre de préférence :
+        # audio pré-généré, assemblage de segments (mémorisé), synthèse à la
+        # demande (API TTS), puis message générique pré-généré
+        from questionnaire_logic import RESULT_AUDIO_TEXTS, result_audio_text
+
+        audio_text = result_audio_text(stats["answered"])
+        audio_entry = current_app.audio_index.lookup(audio_text)
+
+        if audio_entry is None:
+            stitched = current_app.result_audio.build(stats["answered"])
+            if stitched is not None:
+                return _stitched_audio_response(*stitched)
+
+        if audio_entry is None and current_app.audio_handler is not None:
+            audio_entry = _get_audio_entry(audio_text)
+        if audio_entry is None:
+            audio_entry = _get_audio_entry(RESULT_AUDIO_TEXTS["incomplete"])
+
+        if audio_entry:
+            print(f"DEBUG: Fichier audio trouvé: {audio_entry.text_hash}.wav")
+            return _audio_redirect(audio_entry)
         else:
             print(f"DEBUG: Aucun fichier audio trouvé")
             return jsonify({"error": "Audio non trouvé", "fallback": "use_tts"}), 404
@@ -673,6 +1015,19 @@ def transcribe_chunk():
     """
     Transcrit un chunk audio (pour Firefox/Safari)
     Utilise Google Cloud Speech-to-Text (gratuit 60min/mois, léger, pas de dépendances système)
+
+    Demande ``STT_MAX_ALTERNATIVES`` hypothèses ; la réponse les contient
+    (``alternatives``) pour ``/api/process_voice``. Le navigateur utilise
+    ``/api/transcribe_and_score``, qui les interprète directement.
+
+    ``?async=1`` : l'appel amont est confié au pool de transcription et la
+    réponse (202) contient l'identifiant de tâche à interroger sur
+    ``/api/transcription_jobs/<id>`` ; 429 si la file est pleine.
+
+    Extraits LINEAR16 (WAV PCM 16 bits mono, ou PCM brut avec les champs
+    ``encoding=LINEAR16`` et ``sample_rate_hertz``) : un extrait sans parole
+    est écarté sans appel amont (réponse immédiate, même en mode
+    asynchrone) et les silences de début et de fin sont retirés.
     """
     print("🔍 DEBUG: transcribe_chunk appelé - Version mise à jour")
     try:
@@ -689,47 +1044,238 @@ def transcribe_chunk():
             print("❌ DEBUG: Pas de fichier audio")
             return jsonify({"error": "No audio"}), 400
 
-        # ✅ Utiliser Google Cloud Speech-to-Text (même API que TTS)
-        import base64
-
         # Lire le contenu audio
         audio_content = audio_file.read()
         print(f"🔍 DEBUG: Taille audio: {len(audio_content)} bytes")
 
+        try:
+            audio_content, audio_format = _detect_speech(audio_content)
+        except ValueError as e:
+            return jsonify({"error": f"Format audio non pris en charge: {e}"}), 400
+        if audio_content is None:
+            return jsonify({"success": True, "transcript": "", "fallback": True, "silent": True})
+
+        speech_client = current_app.speech_client
+        max_alternatives = current_app.config["STT_MAX_ALTERNATIVES"]
+        if request.args.get("async") == "1":
+            return _submit_transcription(
+                lambda: _recognize_chunk(speech_client, audio_content, audio_format, max_alternatives)
+            )
+
+        return jsonify(_recognize_chunk(speech_client, audio_content, audio_format, max_alternatives))
+
+    except Exception as e:
+        print(f"❌ Erreur transcription: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return jsonify(
+            {
+                "success": True,
+                "transcript": "",  # Transcription vide pour éviter réponse automatique
+                "fallback": True,
+            }
+        )
+
+
+@api_bp.route("/transcribe_and_score", methods=["POST"])
+def transcribe_and_score():
+    """
+    Transcrit un extrait audio et enregistre la réponse en une seule requête
+
+    Remplace l'enchaînement transcribe_chunk puis process_voice : un aller-
+    retour client-serveur et une vérification de session en moins par
+    réponse. Champs du formulaire : ``audio``, ``session_id``,
+    ``question_num``. Réponse : celle de process_voice, ou
+    ``{"valid": false, "fallback": true}`` si aucune parole exploitable n'a
+    été reconnue (le client continue d'écouter). ``?async=1`` et extraits
+    LINEAR16 comme transcribe_chunk.
+    """
+    try:
+        if request.content_length and request.content_length > 10 * 1024 * 1024:
+            return jsonify({"error": "Chunk too large"}), 413
+        audio_file = request.files.get("audio")
+        if not audio_file:
+            return jsonify({"error": "No audio"}), 400
+
+        session_id = request.form.get("session_id")
+        try:
+            question_num = int(request.form.get("question_num", ""))
+        except ValueError:
+            return jsonify({"error": "Champ requis manquant: question_num"}), 400
+
+        # Session et question vérifiées avant l'appel amont (facturé)
+        if not session_id or not current_app.db.get_session(session_id):
+            return jsonify({"error": "Session invalide"}), 400
+        question = current_app.questionnaire.get_question(question_num)
+        if not question:
+            return jsonify({"error": "Question introuvable"}), 404
+
+        try:
+            audio_content, audio_format = _detect_speech(audio_file.read())
+        except ValueError as e:
+            return jsonify({"error": f"Format audio non pris en charge: {e}"}), 400
+        if audio_content is None:
+            return jsonify({"valid": False, "fallback": True, "transcript": "", "silent": True})
+        app = current_app._get_current_object()
+
+        def run():
+            return _transcribe_and_score(app, audio_content, session_id, question, audio_format)
+
+        if request.args.get("async") == "1":
+            # (corps, statut) : une erreur reste une erreur en mode asynchrone
+            return _submit_transcription(run)
+
+        body, status = run()
+        return jsonify(body), status
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur traitement vocal: {str(e)}"}), 500
+
+
+# Seuil de confiance sous lequel une transcription est ignorée (silence)
+MIN_SPEECH_CONFIDENCE = 0.3
+
+# Filtres de l'enregistreur navigateur (speech_recognition_flask.js) : une
+# phrase ou une commande de navigation n'est pas une réponse
+_NAVIGATION_WORDS = ("question", "suivant", "précédent", "retour", "passer", "ignorer")
+
+
+def _is_answer_candidate(transcript: str) -> bool:
+    text = transcript.lower().strip()
+    if len(text) > 20 or any(word in text for word in _NAVIGATION_WORDS):
+        return False
+    # Un seul caractère : seulement un chiffre (« 7 »)
+    return len(text) >= 2 or text.isdigit()
+
+
+def _detect_speech(audio_content: bytes) -> tuple:
+    """(audio à transcrire, format) ; audio None si l'extrait PCM est silencieux
+
+    Format None : extrait compressé, envoyé tel quel en WEBM_OPUS.
+    """
+    vad = current_app.voice_activity.process(
+        audio_content,
+        request.form.get("encoding"),
+        request.form.get("sample_rate_hertz", type=int),
+    )
+    if vad is None:
+        return audio_content, None
+    if not vad["speech"]:
+        print(f"DEBUG: Extrait PCM sans parole ignoré ({len(audio_content)} octets)")
+        return None, None
+    print(f"DEBUG: Extrait PCM réduit à la parole: {len(audio_content)} -> {len(vad['content'])} octets")
+    return vad["content"], {"encoding": "LINEAR16", "sampleRateHertz": vad["sample_rate"]}
+
+
+def _transcribe_and_score(app, audio_content: bytes, session_id: str, question, audio_format=None) -> tuple:
+    """Transcription N-best puis interprétation de chaque alternative : (corps JSON, statut)"""
+    alternatives = _speech_alternatives(
+        app.speech_client, audio_content, app.config["STT_MAX_ALTERNATIVES"], audio_format
+    )
+    alternatives = [{**alt, "transcript": alt["transcript"].strip()} for alt in alternatives]
+    if not any(_is_answer_candidate(alt["transcript"]) for alt in alternatives):
+        return {
+            "valid": False,
+            "fallback": True,
+            "transcript": alternatives[0]["transcript"] if alternatives else "",
+        }, 200
+    # La confiance cumulée des hypothèses concordantes remplace le seuil sur
+    # la seule première hypothèse. Les hypothèses écartées (navigation,
+    # phrase) restent dans la liste : leur rang et leur poids sont conservés
+    return _score_voice_answer(
+        app,
+        session_id,
+        question,
+        alternatives,
+        min_confidence=MIN_SPEECH_CONFIDENCE,
+        accept=_is_answer_candidate,
+    )
+
+
+def _submit_transcription(fn):
+    """Confie ``fn`` au pool de transcription : 202 et URL de suivi, 429 si saturé"""
+    from transcription_jobs_flask import TranscriptionQueueFullError
+
+    try:
+        job_id = current_app.transcriptions.submit(fn)
+    except TranscriptionQueueFullError as e:
+        print(f"WARNING: Extrait refusé: {e}")
+        response = jsonify({"error": "Trop de transcriptions en cours", "retry_after": 1})
+        response.headers["Retry-After"] = "1"
+        return response, 429
+    return (
+        jsonify(
+            {
+                "success": True,
+                "job_id": job_id,
+                "status": "pending",
+                "poll_url": url_for("api.transcription_job", job_id=job_id),
+            }
+        ),
+        202,
+    )
+
+
+def _recognize_chunk(speech_client, audio_content: bytes, audio_format=None, max_alternatives: int = 1) -> dict:
+    """Transcription d'un extrait : corps JSON de la réponse
+
+    ``transcript`` est la première hypothèse (seuil de confiance appliqué à
+    elle seule) ; ``alternatives`` contient toutes les hypothèses, à
+    transmettre telles quelles à ``/api/process_voice`` pour l'interprétation
+    N-best. Sans contexte de requête : appelée aussi depuis le pool de
+    transcription.
+    """
+    alternatives = _speech_alternatives(
+        speech_client, audio_content, max_alternatives, audio_format=audio_format
+    )
+    if not alternatives:
+        # ✅ FALLBACK : Transcription vide pour éviter réponse automatique
+        return {"success": True, "transcript": "", "fallback": True}
+
+    # ✅ FILTRE : Ignorer les transcriptions de faible confiance
+    confidence = alternatives[0]["confidence"]
+    if confidence < MIN_SPEECH_CONFIDENCE:
+        print(f"⚠️ Transcription de faible confiance ignorée: {confidence}")
+        return {"success": True, "transcript": "", "fallback": True}
+    return {
+        "success": True,
+        "transcript": alternatives[0]["transcript"],
+        "alternatives": alternatives,
+    }
+
+
+def _speech_alternatives(speech_client, audio_content: bytes, max_alternatives: int = 1, audio_format=None) -> list:
+    """Alternatives ``{"transcript", "confidence"}`` du premier résultat, par
+    ordre de vraisemblance (``max_alternatives`` hypothèses au plus) ; liste
+    vide si rien d'exploitable (pas de clé, erreur API, silence)
+
+    ``audio_format`` : ``encoding`` et ``sampleRateHertz`` (PCM après
+    détection d'activité vocale) ; WEBM_OPUS 48 kHz par défaut.
+    """
+    import base64
+
+    try:
         # Encoder en base64 pour l'API
         audio_base64 = base64.b64encode(audio_content).decode("utf-8")
         print(f"🔍 DEBUG: Audio encodé en base64: {len(audio_base64)} caractères")
 
-        # Récupérer la clé API (même que pour TTS)
-        api_key = current_app.config.get("GOOGLE_CLOUD_API_KEY") or os.environ.get(
-            "GOOGLE_CLOUD_API_KEY"
-        )
-        print(f"🔍 DEBUG: Clé API présente: {api_key is not None}")
-        print(
-            f"🔍 DEBUG: Clé API (premiers caractères): {api_key[:10] if api_key else 'None'}..."
-        )
-        print(f"🔍 DEBUG: Taille clé API: {len(api_key) if api_key else 0}")
+        print(f"🔍 DEBUG: Clé API présente: {speech_client.api_key is not None}")
 
-        if not api_key:
+        if not speech_client.enabled:
             print("❌ DEBUG: Clé API Google Cloud manquante")
             # ✅ FALLBACK : Retourner une transcription vide pour tous les navigateurs
             print("🌐 Tous navigateurs : Mode fallback - transcription vide")
-            return jsonify(
-                {
-                    "success": True,
-                    "transcript": "",  # Transcription vide pour éviter réponse automatique
-                    "fallback": True,
-                }
-            )
+            return []
 
         # Appel API Google Cloud Speech-to-Text
-        url = f"https://speech.googleapis.com/v1/speech:recognize?key={api_key}"
-        print(f"🔍 DEBUG: URL API: {url[:50]}...")
+        print(f"🔍 DEBUG: URL API: {speech_client.api_url}")
 
         payload = {
             "config": {
                 "encoding": "WEBM_OPUS",
                 "sampleRateHertz": 48000,
+                **(audio_format or {}),
                 "audioChannelCount": 1,  # ✅ CORRECTION : Mono pour Firefox
                 "languageCode": "fr-FR",
                 "model": "latest_long",  # ✅ CORRECTION : Modèle plus récent
@@ -737,13 +1283,16 @@ def transcribe_chunk():
                 "enableWordTimeOffsets": False,
                 "enableWordConfidence": True,  # ✅ Ajouter confiance
                 "useEnhanced": True,  # ✅ Utiliser modèle amélioré
+                # Hypothèses N-best : interprétées toutes par transcribe_and_score
+                "maxAlternatives": max_alternatives,
             },
             "audio": {"content": audio_base64},
         }
         print(f"🔍 DEBUG: Payload config: {payload['config']}")
 
         print("🔍 DEBUG: Envoi requête vers Google Cloud API...")
-        response = requests.post(url, json=payload, timeout=10)
+        # Connexion keep-alive du pool : pas de DNS/TCP/TLS à chaque extrait
+        response = speech_client.recognize(payload)
         print(f"🔍 DEBUG: Réponse reçue - Status: {response.status_code}")
 
         # ✅ VÉRIFIER le statut de la réponse
@@ -753,38 +1302,27 @@ def transcribe_chunk():
 
             # ✅ FALLBACK : Pour toutes les erreurs API, retourner transcription vide
             print("🌐 Tous navigateurs : Erreur API - Mode fallback activé")
-            return jsonify(
-                {
-                    "success": True,
-                    "transcript": "",  # Transcription vide pour éviter réponse automatique
-                    "fallback": True,
-                }
-            )
+            return []
 
         result = response.json()
         print(f"🔍 DEBUG: Réponse Google Cloud complète: {result}")
 
         # ✅ VÉRIFIER la structure de la réponse
-        transcript = ""
         if "results" in result and len(result["results"]) > 0:
-            transcript = result["results"][0]["alternatives"][0]["transcript"]
-            confidence = result["results"][0]["alternatives"][0].get("confidence", 0)
+            alternatives = result["results"][0]["alternatives"]
+            transcript = alternatives[0]["transcript"]
+            # Google ne renseigne la confiance que sur la première alternative
+            confidence = alternatives[0].get("confidence", 0)
             print(
-                f"📝 Transcription Google Cloud: {transcript} (confiance: {confidence})"
+                f"📝 Transcription Google Cloud: {transcript} (confiance: {confidence}, "
+                f"{len(alternatives)} hypothèses)"
             )
 
-            # ✅ FILTRE : Ignorer les transcriptions de faible confiance
-            if confidence < 0.3:
-                print(f"⚠️ Transcription de faible confiance ignorée: {confidence}")
-                return jsonify(
-                    {
-                        "success": True,
-                        "transcript": "",
-                        "fallback": True,
-                    }
-                )
-
-            return jsonify({"success": True, "transcript": transcript})
+            return [
+                {"transcript": alt["transcript"], "confidence": alt.get("confidence", 0)}
+                for alt in alternatives
+                if alt.get("transcript")
+            ]
         else:
             print(f"⚠️ DEBUG: Aucun résultat dans la réponse: {result}")
             print(f"⚠️ DEBUG: Structure de la réponse: {list(result.keys())}")
@@ -799,13 +1337,7 @@ def transcribe_chunk():
 
             # ✅ FALLBACK : Si pas de résultat, retourner une transcription vide
             print("🌐 Tous navigateurs : Pas de résultat - Mode fallback activé")
-            return jsonify(
-                {
-                    "success": True,
-                    "transcript": "",  # Transcription vide pour éviter réponse automatique
-                    "fallback": True,
-                }
-            )
+            return []
 
     except Exception as e:
         print(f"❌ Erreur transcription: {e}")
@@ -815,10 +1347,31 @@ def transcribe_chunk():
 
         # ✅ FALLBACK ROBUSTE : Retourner une réponse vide au lieu d'erreur 500
         print("🛡️ Protection : Retour fallback au lieu d'erreur 500")
-        return jsonify(
-            {
-                "success": True,
-                "transcript": "",  # Transcription vide pour éviter réponse automatique
-                "fallback": True,
-            }
-        )
+        return []
+
+
+@api_bp.route("/transcription_jobs/<job_id>")
+def transcription_job(job_id):
+    """État d'une transcription asynchrone (résultat inclus une fois terminée)
+
+    ``status`` : ``pending``, ``done``, ``error`` (le traitement a répondu
+    une erreur, ``http_status`` est celui qu'aurait eu le mode synchrone)
+    ou ``failed`` (exception).
+    """
+    try:
+        job = current_app.db.get_transcription_job(job_id)
+        if job is None:
+            return jsonify({"error": "Transcription introuvable"}), 404
+
+        body = {"job_id": job_id}
+        if job["status"] != "pending":
+            body.update(job["result"] or {})
+            if job["status"] != "done":
+                body["http_status"] = job["http_status"]
+        body["status"] = job["status"]
+        response = jsonify(body)
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -3,7 +3,7 @@ Routes principales pour l'application Flask
 Pages : accueil (initiales), questionnaire (Q0-Q30), résultat
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for
+from flask import Blueprint, render_template, request, redirect, url_for, current_app
 import datetime
 
 main_bp = Blueprint("main", __name__)
@@ -24,9 +24,7 @@ def questionnaire():
         return redirect(url_for("main.accueil"))
 
     # Valider que la session existe réellement en base
-    from models.database_flask import DatabaseManager
-
-    db = DatabaseManager()
+    db = current_app.db
     session_data = db.get_session(session_id)
 
     print(f"DEBUG: Validation session {session_id}")
@@ -49,13 +47,29 @@ def resultat(session_id):
 
 @main_bp.route("/admin")
 def admin():
-    """Page d'administration (optionnelle)"""
-    from models.database_flask import DatabaseManager
-
-    db = DatabaseManager()
-    sessions = db.get_all_sessions()
-
-    return render_template("admin.html", sessions=sessions)
+    """Page d'administration (optionnelle) : sessions paginées par curseur"""
+    filters = {
+        "status": request.args.get("status") or None,
+        "date_from": request.args.get("from") or None,
+        "date_to": request.args.get("to") or None,
+    }
+
+    db = current_app.db
+    try:
+        page = db.list_sessions(
+            limit=request.args.get("limit", 50, type=int),
+            cursor=request.args.get("cursor"),
+            **filters,
+        )
+    except ValueError as e:
+        return render_template(
+            "admin_flask.html",
+            page={"sessions": [], "next_cursor": None},
+            filters=filters,
+            error=str(e),
+        ), 400
+
+    return render_template("admin_flask.html", page=page, filters=filters)
 
 
 @main_bp.errorhandler(404)
@@ -0,0 +1,124 @@
+"""
+Calcul des scores officiels EORTC QLQ-C30 (version 3.0)
+
+Applique le manuel de cotation EORTC : score brut = moyenne des items de
+l'échelle, transformation linéaire sur 0-100, et règle des items manquants
+(échelle calculée si au moins la moitié de ses items est renseignée).
+
+Le calcul est vectorisé : ``score_matrix`` note en un appel une matrice
+sessions × 30 items (``uint8``, ``MISSING_SCORE`` = réponse absente), telle
+que produite par ``DatabaseManager.build_score_matrix``.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from models.score_matrix_flask import MISSING_SCORE, N_ITEMS
+
+FUNCTIONAL = "functional"
+SYMPTOM = "symptom"
+GLOBAL = "global"
+
+# code -> (libellé, items, type, étendue des réponses)
+SCALES = {
+    "QL2": ("Santé globale / qualité de vie", (29, 30), GLOBAL, 6),
+    "PF2": ("Fonctionnement physique", (1, 2, 3, 4, 5), FUNCTIONAL, 3),
+    "RF2": ("Fonctionnement de rôle", (6, 7), FUNCTIONAL, 3),
+    "EF": ("Fonctionnement émotionnel", (21, 22, 23, 24), FUNCTIONAL, 3),
+    "CF": ("Fonctionnement cognitif", (20, 25), FUNCTIONAL, 3),
+    "SF": ("Fonctionnement social", (26, 27), FUNCTIONAL, 3),
+    "FA": ("Fatigue", (10, 12, 18), SYMPTOM, 3),
+    "NV": ("Nausées et vomissements", (14, 15), SYMPTOM, 3),
+    "PA": ("Douleur", (9, 19), SYMPTOM, 3),
+    "DY": ("Dyspnée", (8,), SYMPTOM, 3),
+    "SL": ("Insomnie", (11,), SYMPTOM, 3),
+    "AP": ("Perte d'appétit", (13,), SYMPTOM, 3),
+    "CO": ("Constipation", (16,), SYMPTOM, 3),
+    "DI": ("Diarrhée", (17,), SYMPTOM, 3),
+    "FI": ("Difficultés financières", (28,), SYMPTOM, 3),
+}
+
+# Score résumé : moyenne de 13 échelles (hors QL2 et FI), symptômes inversés
+SUMMARY_SCALES = ("PF2", "RF2", "SF", "EF", "CF", "FA", "PA", "DY", "SL", "AP", "CO", "DI", "NV")
+SUMMARY_CODE = "SUM"
+SUMMARY_LABEL = "Score résumé QLQ-C30"
+
+SCALE_CODES = tuple(SCALES) + (SUMMARY_CODE,)
+
+
+def score_matrix(scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Scores 0-100 de toutes les échelles pour une matrice sessions × 30
+
+    Retourne ``{code: float64[n_sessions]}`` ; NaN si l'échelle n'est pas
+    calculable (moins de la moitié de ses items renseignés).
+    """
+    scores = np.asarray(scores)
+    if scores.ndim != 2 or scores.shape[1] != N_ITEMS:
+        raise ValueError(f"Matrice de scores invalide: {scores.shape}")
+
+    results = {}
+    for code, (_, items, kind, item_range) in SCALES.items():
+        block = scores[:, [item - 1 for item in items]]
+        answered = (block >= 1) & (block <= item_range + 1)
+        count = answered.sum(axis=1)
+        total = np.where(answered, block, 0).sum(axis=1, dtype=np.float64)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raw = total / count
+        # Règle du manuel : au moins la moitié des items de l'échelle
+        raw[count * 2 < len(items)] = np.nan
+
+        if kind == FUNCTIONAL:
+            results[code] = (1.0 - (raw - 1.0) / item_range) * 100.0
+        else:
+            results[code] = (raw - 1.0) / item_range * 100.0
+
+    summary = np.stack(
+        [
+            results[code] if SCALES[code][2] == FUNCTIONAL else 100.0 - results[code]
+            for code in SUMMARY_SCALES
+        ]
+    )
+    # Score résumé uniquement si les 13 échelles sont disponibles
+    results[SUMMARY_CODE] = summary.mean(axis=0)
+    return results
+
+
+def responses_to_row(responses: Iterable[Dict]) -> np.ndarray:
+    """Ligne de matrice (1 × 30) à partir des réponses d'une session"""
+    row = np.full((1, N_ITEMS), MISSING_SCORE, dtype=np.uint8)
+    for response in responses:
+        question_num, score = response.get("question_num"), response.get("score")
+        if 1 <= (question_num or 0) <= N_ITEMS and isinstance(score, int) and 1 <= score <= 7:
+            row[0, question_num - 1] = score
+    return row
+
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 1)
+
+
+def score_session(responses: Iterable[Dict]) -> List[Dict]:
+    """Scores d'une session, prêts pour le JSON (``score`` à None si non calculable)"""
+    results = score_matrix(responses_to_row(responses))
+    scales = [
+        {
+            "code": code,
+            "label": label,
+            "type": kind,
+            "items": list(items),
+            "score": _rounded(results[code][0]),
+        }
+        for code, (label, items, kind, _) in SCALES.items()
+    ]
+    scales.append(
+        {
+            "code": SUMMARY_CODE,
+            "label": SUMMARY_LABEL,
+            "type": "summary",
+            "items": [],
+            "score": _rounded(results[SUMMARY_CODE][0]),
+        }
+    )
+    return scales
@@ -0,0 +1,168 @@
+"""
+Client HTTP de l'API Speech-to-Text (connexions persistantes)
+
+``/api/transcribe_chunk`` reçoit un extrait toutes les 3 secondes pendant
+l'enregistrement. Avec ``requests.post`` à chaque appel, chaque extrait
+payait une résolution DNS, une connexion TCP et une négociation TLS vers
+speech.googleapis.com. Le client est créé une fois par processus
+(``app.speech_client``) :
+
+- ``requests.Session`` avec un pool de connexions keep-alive
+  (``pool_size`` connexions par hôte, partagées par les threads) ;
+- délais séparés de connexion et de lecture ;
+- nouvel essai avec attente aléatoire (gigue) uniquement quand la requête
+  n'a pas été traitée : connexion impossible (refus, DNS, délai de
+  connexion), 429, 502, 503, 504. Une connexion coupée après l'envoi de la
+  requête ou une réponse lente (délai de lecture dépassé) ne sont pas
+  relancées : la transcription a pu être faite et facturée, et l'extrait
+  suivant arrive ;
+- latence de chaque appel et nombre de connexions ouvertes conservés
+  (``stats()``, exposé par ``/api/diagnostic``).
+
+``STT_API_URL`` remplace l'URL Google (proxy, ou serveur local de test).
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+DEFAULT_API_URL = "https://speech.googleapis.com/v1/speech:recognize"
+
+# Réponses pour lesquelles la requête n'a pas été traitée par l'API
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _not_sent(error: requests.ConnectionError) -> bool:
+    """Échec survenu avant l'envoi de la requête (connexion jamais établie)
+
+    ``ConnectTimeout``, ou ``NewConnectionError`` (refus, résolution DNS)
+    enveloppé dans ``MaxRetryError``. Une ``ProtocolError`` (connexion
+    réinitialisée ou fermée pendant l'échange) peut survenir après l'envoi
+    du corps : elle n'est pas relancée.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    # NewConnectionError hérite de ConnectTimeoutError
+    return isinstance(reason, MaxRetryError) and isinstance(reason.reason, ConnectTimeoutError)
+
+
+class SpeechClient:
+    """Client Speech-to-Text partagé par les threads du processus"""
+
+    def __init__(
+        self,
+        api_key: str = None,
+        api_url: str = None,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+    ):
+        self.api_key = api_key
+        self.api_url = api_url or DEFAULT_API_URL
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+
+        # Les nouveaux essais sont gérés ici (statuts, gigue) : pas par urllib3
+        self._adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=0
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self._latencies = deque(maxlen=200)
+        self._stats = {"calls": 0, "retries": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Clé API configurée, ou URL non Google (proxy, serveur de test)"""
+        return bool(self.api_key) or self.api_url != DEFAULT_API_URL
+
+    def recognize(self, payload: Dict) -> requests.Response:
+        """Appel ``speech:recognize`` ; retourne la dernière réponse reçue
+
+        Lève ``requests.RequestException`` si aucune réponse n'a pu être
+        obtenue (connexion impossible après les nouveaux essais, délai de
+        lecture dépassé).
+        """
+        params = {"key": self.api_key} if self.api_key else None
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.session.post(
+                    self.api_url, params=params, json=payload, timeout=self.timeout
+                )
+            except requests.ConnectionError as e:
+                # Relancé seulement si la requête n'est jamais partie (pas de double facturation)
+                self._record(started, failed=True)
+                if attempt == self.retries or not _not_sent(e):
+                    raise
+                self._sleep(attempt, None)
+                continue
+            except requests.RequestException:
+                self._record(started, failed=True)
+                raise
+
+            self._record(started, failed=response.status_code != 200)
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                return response
+            self._sleep(attempt, response.headers.get("Retry-After"))
+
+    def _sleep(self, attempt: int, retry_after: Optional[str]):
+        with self._lock:
+            self._stats["retries"] += 1
+        delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+        if retry_after and retry_after.isdigit():
+            # Borné : l'utilisateur attend sa transcription
+            delay = min(float(retry_after), self.timeout[1])
+        time.sleep(delay)
+
+    def _record(self, started: float, failed: bool):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._latencies.append(elapsed)
+            self._stats["calls"] += 1
+            if failed:
+                self._stats["errors"] += 1
+
+    def _connections_opened(self) -> int:
+        """Connexions TCP ouvertes depuis le démarrage (toutes réutilisées sinon)"""
+        pools = self._adapter.poolmanager.pools
+        total = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+        return total
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+        return {
+            **stats,
+            "api_url": self.api_url,
+            "pool_size": self.pool_size,
+            "connections_opened": self._connections_opened(),
+            "latency_ms": {
+                "count": len(latencies),
+                "p50": latencies[len(latencies) // 2] * 1000 if latencies else None,
+                "p95": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None,
+                "max": latencies[-1] * 1000 if latencies else None,
+            },
+        }
+
+    def close(self):
+        self.session.close()
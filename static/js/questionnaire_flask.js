@@ -20,6 +20,14 @@ class QuestionnaireManager {
         this.isTransitioning = false;
         // ✅ NOUVEAU : Vitesse de lecture (chargée depuis localStorage ou défaut)
         this.playbackSpeed = parseFloat(localStorage.getItem('playback_speed')) || 1.2;
+        // ✅ NOUVEAU : Données de la session chargées en une seule requête (bootstrap)
+        this.bootstrap = null;
+        this.bootstrapPromise = Promise.resolve(null);
+        this.requestedQuestion = null;
+        // ✅ NOUVEAU : URLs blob des audios déjà téléchargés (question -> Promise<url>)
+        this.audioUrls = new Map();
+        // ✅ NOUVEAU : Variante audio préférée (flac, ulaw ou wav), choisie une fois
+        this.audioCodec = this.preferredAudioCodec();
 
         this.init();
     }
@@ -49,8 +57,12 @@ class QuestionnaireManager {
         const questionParam = new URLSearchParams(window.location.search).get('question');
         if (questionParam) {
             this.currentQuestion = parseInt(questionParam);
+            this.requestedQuestion = this.currentQuestion;
         }
 
+        // ✅ NOUVEAU : Session, catalogue, manifeste audio et réponses en une requête
+        this.bootstrapPromise = this.loadBootstrap();
+
         window.sessionId = this.sessionId;
         window.currentQuestion = this.currentQuestion;
         window.loadQuestion = (num) => this.loadQuestion(num);
@@ -63,6 +75,120 @@ class QuestionnaireManager {
         console.log('✅ QuestionnaireManager initialisé - en attente Q0');
     }
 
+    async loadBootstrap() {
+        try {
+            const response = await fetch(`/api/session/${this.sessionId}/bootstrap`);
+
+            if (response.status === 404) {
+                console.error('Session introuvable');
+                window.location.href = '/accueil';
+                return null;
+            }
+
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error);
+            }
+
+            this.bootstrap = result;
+            console.log(`✅ Bootstrap : ${Object.keys(result.questions).length} questions, ${result.responses.length} réponse(s) déjà enregistrée(s)`);
+
+            // Précharger l'audio de la première question à jouer
+            this.prefetchAudio(this.resumeQuestion());
+            return result;
+        } catch (error) {
+            // Repli : chargement question par question (/api/get_question)
+            console.error('⚠️ Bootstrap indisponible:', error);
+            return null;
+        }
+    }
+
+    // Question de départ : paramètre ?question=, sinon première question non répondue
+    resumeQuestion() {
+        if (this.requestedQuestion) {
+            return this.requestedQuestion;
+        }
+        if (this.bootstrap && this.bootstrap.next_question) {
+            return this.bootstrap.next_question;
+        }
+        return 1;
+    }
+
+    async getQuestion(questionNum) {
+        await this.bootstrapPromise;
+
+        if (this.bootstrap && this.bootstrap.questions[questionNum]) {
+            return this.bootstrap.questions[questionNum];
+        }
+
+        const response = await fetch(`/api/get_question/${questionNum}`);
+        const result = await response.json();
+        if (!result.success) {
+            throw new Error(result.error);
+        }
+        return result.question;
+    }
+
+    // Variante compressée lisible par le navigateur : μ-law (3x plus léger)
+    // en mode économie de données ou réseau lent, sinon FLAC sans perte
+    preferredAudioCodec() {
+        const probe = document.createElement('audio');
+        const connection = navigator.connection || {};
+        const slow = connection.saveData || ['slow-2g', '2g', '3g'].includes(connection.effectiveType);
+        if (slow && probe.canPlayType('audio/wav; codecs="7"')) {
+            return 'ulaw';
+        }
+        if (probe.canPlayType('audio/flac')) {
+            return 'flac';
+        }
+        return 'wav';
+    }
+
+    // URL de l'audio d'une question (manifeste du bootstrap, sinon route historique)
+    audioSourceUrl(questionNum) {
+        const entry = this.bootstrap && this.bootstrap.audio[questionNum];
+        if (!entry) {
+            return `/api/get_audio/${questionNum}`;
+        }
+        const rendition = entry.renditions && entry.renditions[this.audioCodec];
+        return rendition ? rendition.url : entry.url;
+    }
+
+    getAudioUrl(questionNum) {
+        if (!this.audioUrls.has(questionNum)) {
+            const promise = this.bootstrapPromise
+                .then(() => fetch(this.audioSourceUrl(questionNum)))
+                .then(async (response) => {
+                    if (!response.ok) {
+                        const errorData = await response.json().catch(() => ({}));
+                        throw new Error(errorData.error || 'Audio non disponible');
+                    }
+                    return URL.createObjectURL(await response.blob());
+                });
+
+            // Un échec ne doit pas rester en cache : nouvel essai au prochain appel
+            promise.catch(() => this.audioUrls.delete(questionNum));
+            this.audioUrls.set(questionNum, promise);
+        }
+        return this.audioUrls.get(questionNum);
+    }
+
+    prefetchAudio(questionNum) {
+        if (questionNum < 0 || questionNum > 30 || this.audioUrls.has(questionNum)) {
+            return;
+        }
+        console.log(`📥 Préchargement audio question ${questionNum}`);
+        this.getAudioUrl(questionNum).catch(() => { });
+
+        // Libérer les audios des questions déjà passées (sauf la précédente)
+        for (const [num, promise] of this.audioUrls) {
+            if (num < questionNum - 2) {
+                promise.then(url => URL.revokeObjectURL(url)).catch(() => { });
+                this.audioUrls.delete(num);
+            }
+        }
+    }
+
     initSpeedControl() {
         // Initialiser le slider avec la vitesse sauvegardée
         const speedSlider = document.getElementById('speed-slider');
@@ -101,24 +227,18 @@ class QuestionnaireManager {
             this.updateProgress();
             this.updateNavigationButtons();
 
-            const response = await fetch(`/api/get_question/${questionNum}`);
-            const result = await response.json();
-
-            if (result.success) {
-                this.questionData = result.question;
-                this.displayQuestion(this.questionData);
-                this.createResponseButtons(this.questionData);
+            // ✅ Catalogue du bootstrap : plus d'aller-retour serveur par question
+            this.questionData = await this.getQuestion(questionNum);
+            this.displayQuestion(this.questionData);
+            this.createResponseButtons(this.questionData);
 
-                this.toggleSpecialMessage(questionNum >= 29);
+            this.toggleSpecialMessage(questionNum >= 29);
 
-                console.log('📊 Lancement automatique de l\'audio dans 1 seconde...');
-                setTimeout(() => {
-                    console.log('📊 Appel de playQuestionAudio()');
-                    this.playQuestionAudio();
-                }, 1000);
-            } else {
-                throw new Error(result.error);
-            }
+            console.log('📊 Lancement automatique de l\'audio dans 1 seconde...');
+            setTimeout(() => {
+                console.log('📊 Appel de playQuestionAudio()');
+                this.playQuestionAudio();
+            }, 1000);
 
         } catch (error) {
             console.error('Erreur chargement question:', error);
@@ -310,123 +430,100 @@ class QuestionnaireManager {
             const statusContainer = document.getElementById('audio-status');
             // Ne pas afficher le status pendant le chargement
 
-            const response = await fetch(`/api/get_audio/${this.currentQuestion}`);
+            // ✅ Audio déjà préchargé pendant la question précédente (sinon téléchargé ici)
+            const audioUrl = await this.getAudioUrl(this.currentQuestion);
+            console.log(`📊 DEBUG: URL audio: ${audioUrl}`);
+
+            // ✅ ARRÊTER l'audio précédent SILENCIEUSEMENT (sans reprendre la reconnaissance)
+            if (this.currentAudio) {
+                this.currentAudio.pause();
+                this.currentAudio = null;
+            }
 
-            console.log(`📊 DEBUG: Réponse serveur - Status: ${response.status}`);
+            this.currentAudio = new Audio(audioUrl);
 
-            if (response.ok) {
-                console.log('📊 DEBUG: Réponse OK, création du blob...');
-                const audioBlob = await response.blob();
-                console.log(`📊 DEBUG: Blob créé - Taille: ${audioBlob.size} bytes`);
+            // ============================================
+            // 🎛️ VITESSE DE LECTURE CONFIGURABLE
+            // ============================================
+            this.currentAudio.playbackRate = this.playbackSpeed;
+            console.log(`🎛️ Vitesse de lecture: ${this.playbackSpeed}x`);
+            // ============================================
+
+            this.currentAudio.onerror = (e) => {
+                console.error('❌ Erreur lecture audio:', e);
+                this.showError('Erreur : Impossible de lire l\'audio');
+                this.toggleAudioButtons(false);
+                if (statusText && statusContainer) {
+                    statusText.textContent = '❌ Erreur de lecture audio';
+                    statusContainer.style.display = 'block';
+                }
 
-                const audioUrl = URL.createObjectURL(audioBlob);
-                console.log(`📊 DEBUG: URL créée: ${audioUrl}`);
+                // ✅ REPRENDRE la reconnaissance vocale
+                if (window.speechManager) {
+                    window.speechManager.resumeRecognition();
+                }
+            };
+
+            this.currentAudio.play().then(() => {
+                console.log('✅ Audio lancé avec succès');
+                this.toggleAudioButtons(true);
+                // ✅ Précharger la question suivante pendant la lecture
+                this.prefetchAudio(this.currentQuestion + 1);
+                // Ne pas afficher le status pendant la lecture
+            }).catch(err => {
+                console.error('❌ Erreur play():', err);
+                this.showError('Erreur : Impossible de lire l\'audio');
+                this.toggleAudioButtons(false);
+                if (statusText && statusContainer) {
+                    statusText.textContent = '❌ Erreur de lecture';
+                    statusContainer.style.display = 'block';
+                }
 
-                // ✅ ARRÊTER l'audio précédent SILENCIEUSEMENT (sans reprendre la reconnaissance)
-                if (this.currentAudio) {
-                    this.currentAudio.pause();
-                    this.currentAudio = null;
+                // ✅ REPRENDRE la reconnaissance vocale
+                if (window.speechManager) {
+                    window.speechManager.resumeRecognition();
                 }
+            });
 
-                this.currentAudio = new Audio(audioUrl);
+            this.currentAudio.onended = () => {
+                console.log('✅ Audio terminé');
 
-                // ============================================
-                // 🎛️ VITESSE DE LECTURE CONFIGURABLE
-                // ============================================
-                this.currentAudio.playbackRate = this.playbackSpeed;
-                console.log(`🎛️ Vitesse de lecture: ${this.playbackSpeed}x`);
-                // ============================================
+                // ✅ DÉLAI ADAPTATIF selon le navigateur
+                const userAgent = navigator.userAgent.toLowerCase();
+                const isFirefox = userAgent.includes('firefox');
 
-                this.currentAudio.onerror = (e) => {
-                    console.error('❌ Erreur lecture audio:', e);
-                    this.showError('Erreur : Impossible de lire l\'audio');
-                    this.toggleAudioButtons(false);
-                    if (statusText && statusContainer) {
-                        statusText.textContent = '❌ Erreur de lecture audio';
-                        statusContainer.style.display = 'block';
-                    }
+                // ✅ NOUVEAU : Délais séparés pour Chrome
+                const displayDelay = isFirefox ? 500 : 500; // Affichage : 0.5s Firefox, 0.5s Chrome
+                const recognitionDelay = isFirefox ? 500 : 500; // Reconnaissance : 0.5s Firefox, 0.5s Chrome
 
-                    // ✅ REPRENDRE la reconnaissance vocale
-                    if (window.speechManager) {
-                        window.speechManager.resumeRecognition();
-                    }
-                };
-
-                this.currentAudio.play().then(() => {
-                    console.log('✅ Audio lancé avec succès');
-                    this.toggleAudioButtons(true);
-                    // Ne pas afficher le status pendant la lecture
-                }).catch(err => {
-                    console.error('❌ Erreur play():', err);
-                    this.showError('Erreur : Impossible de lire l\'audio');
+                console.log(`⏱️ Délai affichage: ${displayDelay}ms, Reconnaissance: ${recognitionDelay}ms (${isFirefox ? 'Firefox' : 'Chrome'})`);
+
+                // ✅ AFFICHAGE du message après le délai d'affichage
+                setTimeout(() => {
+                    // Changer les boutons APRÈS le délai
                     this.toggleAudioButtons(false);
+
                     if (statusText && statusContainer) {
-                        statusText.textContent = '❌ Erreur de lecture';
-                        statusContainer.style.display = 'block';
+                        statusText.textContent = '✅ Lecture terminée - Vous pouvez répondre';
+                        statusContainer.style.display = 'block'; // Afficher maintenant
                     }
+                }, displayDelay);
 
-                    // ✅ REPRENDRE la reconnaissance vocale
+                // ✅ REPRISE de la reconnaissance après le délai de reconnaissance
+                setTimeout(() => {
                     if (window.speechManager) {
+                        console.log('▶️ Reprise de la reconnaissance vocale');
                         window.speechManager.resumeRecognition();
                     }
-                });
-
-                this.currentAudio.onended = () => {
-                    console.log('✅ Audio terminé');
-
-                    // ✅ DÉLAI ADAPTATIF selon le navigateur
-                    const userAgent = navigator.userAgent.toLowerCase();
-                    const isFirefox = userAgent.includes('firefox');
-
-                    // ✅ NOUVEAU : Délais séparés pour Chrome
-                    const displayDelay = isFirefox ? 500 : 500; // Affichage : 0.5s Firefox, 0.5s Chrome
-                    const recognitionDelay = isFirefox ? 500 : 500; // Reconnaissance : 0.5s Firefox, 0.5s Chrome
-
-                    console.log(`⏱️ Délai affichage: ${displayDelay}ms, Reconnaissance: ${recognitionDelay}ms (${isFirefox ? 'Firefox' : 'Chrome'})`);
-
-                    // ✅ AFFICHAGE du message après le délai d'affichage
-                    setTimeout(() => {
-                        // Changer les boutons APRÈS le délai
-                        this.toggleAudioButtons(false);
-
-                        if (statusText && statusContainer) {
-                            statusText.textContent = '✅ Lecture terminée - Vous pouvez répondre';
-                            statusContainer.style.display = 'block'; // Afficher maintenant
-                        }
-                    }, displayDelay);
 
-                    // ✅ REPRISE de la reconnaissance après le délai de reconnaissance
-                    setTimeout(() => {
-                        if (window.speechManager) {
-                            console.log('▶️ Reprise de la reconnaissance vocale');
-                            window.speechManager.resumeRecognition();
-                        }
-
-                        // ✅ REDÉMARRER Firefox aussi
-                        if (window.fallbackManager) {
-                            console.log('🦊 Firefox : Redémarrage de l\'écoute continue');
-                            window.fallbackManager.startContinuousSpeech();
-                        }
-                    }, recognitionDelay);
-                };
-
-            } else {
-                const errorData = await response.json();
-                console.error('❌ Erreur serveur:', errorData);
-
-                const statusContainer2 = document.getElementById('audio-status');
-                if (statusText && statusContainer2) {
-                    statusText.textContent = `⚠️ ${errorData.error || 'Audio non disponible'}`;
-                    statusContainer2.style.display = 'block';
-                }
-
-                // ✅ REPRENDRE la reconnaissance vocale en cas d'erreur
-                if (window.speechManager) {
-                    window.speechManager.resumeRecognition();
-                }
+                    // ✅ REDÉMARRER Firefox aussi
+                    if (window.fallbackManager) {
+                        console.log('🦊 Firefox : Redémarrage de l\'écoute continue');
+                        window.fallbackManager.startContinuousSpeech();
+                    }
+                }, recognitionDelay);
+            };
 
-                throw new Error(errorData.error || 'Audio non disponible');
-            }
         } catch (error) {
             console.error('❌ Erreur lecture audio:', error);
             this.showError('Audio indisponible pour cette question');
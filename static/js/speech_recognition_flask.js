@@ -127,7 +127,8 @@ class SpeechRecognitionManager {
             this.recognition.continuous = true;
             this.recognition.interimResults = true; // ✅ Activé pour meilleure réactivité
             this.recognition.lang = 'fr-FR';
-            this.recognition.maxAlternatives = 1;
+            // ✅ N-best : le serveur interprète toutes les hypothèses
+            this.recognition.maxAlternatives = 3;
 
             this.recognition.onstart = () => {
                 console.log('Reconnaissance vocale démarrée');
@@ -165,15 +166,19 @@ class SpeechRecognitionManager {
                 const transcript = result[0].transcript.trim();
                 const confidence = result[0].confidence;
                 const isFinal = result.isFinal;
+                const alternatives = Array.from(result, alt => ({
+                    transcript: alt.transcript.trim(),
+                    confidence: alt.confidence
+                }));
 
                 console.log('DEBUG: Résultat', isFinal ? 'FINAL' : 'INTERIM', ':', transcript, 'Confiance:', confidence);
 
                 // ✅ AMÉLIORATION : Prioriser les résultats finaux et améliorer la gestion des intermédiaires
                 if (isFinal) {
-                    this.handleSpeechResult(transcript, confidence);
+                    this.handleSpeechResult(transcript, confidence, alternatives);
                 } else if (confidence > 0.5 && transcript.length <= 20) {
                     // Seulement les résultats intermédiaires avec bonne confiance
-                    this.handleSpeechResult(transcript, confidence);
+                    this.handleSpeechResult(transcript, confidence, alternatives);
                 }
             };
 
@@ -273,7 +278,7 @@ class SpeechRecognitionManager {
         }
     }
 
-    handleSpeechResult(transcript, confidence) {
+    handleSpeechResult(transcript, confidence, alternatives = null) {
         console.log('DEBUG: handleSpeechResult appelé avec:', transcript);
 
         // ============================================
@@ -355,7 +360,7 @@ class SpeechRecognitionManager {
 
         // ✅ AMÉLIORATION : Délai réduit de 500ms à 200ms
         setTimeout(() => {
-            this.processVoiceResponse(cleanTranscript);
+            this.processVoiceResponse(cleanTranscript, alternatives);
         }, 200);
     }
 
@@ -401,7 +406,7 @@ class SpeechRecognitionManager {
         }
     }
 
-    async processVoiceResponse(transcript) {
+    async processVoiceResponse(transcript, alternatives = null) {
         console.log('DEBUG: processVoiceResponse appelé avec:', transcript);
 
         if (this.processingResponse) {
@@ -426,7 +431,8 @@ class SpeechRecognitionManager {
                 body: JSON.stringify({
                     session_id: window.sessionId,
                     question_num: window.currentQuestion,
-                    transcript: transcript
+                    transcript: transcript,
+                    alternatives: alternatives
                 })
             });
 
@@ -999,7 +1005,14 @@ class FallbackRecognitionManager {
             formData.append('session_id', window.sessionId);
             formData.append('question_num', window.currentQuestion);
 
-            const response = await fetch('/api/transcribe_chunk', {
+            // ✅ Transcription, interprétation et enregistrement en une seule requête
+            // Mode synchrone par défaut : un seul aller-retour par réponse. Le mode
+            // asynchrone (tâche à interroger) ajoute au moins une interrogation et
+            // son attente : réservé aux déploiements saturés (window.TRANSCRIBE_ASYNC)
+            const url = window.TRANSCRIBE_ASYNC
+                ? '/api/transcribe_and_score?async=1'
+                : '/api/transcribe_and_score';
+            const response = await fetch(url, {
                 method: 'POST',
                 body: formData,
                 headers: {
@@ -1009,6 +1022,12 @@ class FallbackRecognitionManager {
 
             console.log(`📡 Réponse serveur: ${response.status} `);
 
+            if (response.status === 429) {
+                // File de transcription pleine : extrait abandonné, le suivant arrive dans 3 s
+                console.warn('⚠️ Serveur saturé - extrait audio ignoré');
+                return;
+            }
+
             if (!response.ok) {
                 const errorText = await response.text();
                 console.warn('⚠️ Erreur serveur transcription:', response.status, errorText);
@@ -1023,33 +1042,44 @@ class FallbackRecognitionManager {
                 return;
             }
 
-            const result = await response.json();
-            console.log('📝 Résultat serveur:', result);
-
-            if (result.success && result.transcript && result.transcript.trim()) {
-                const transcript = result.transcript.trim();
-                console.log('📝 Transcription serveur:', transcript);
-
-                // ✅ FILTRE : Ignorer les transcriptions trop courtes ou parasites
-                // ✅ CORRECTION : Accepter les réponses courtes valides comme "7" et "une"
-                const shortValidResponses = ['1', '2', '3', '4', '5', '6', '7', 'un', 'une', 'deux', 'trois', 'quatre', 'cinq', 'six', 'sept'];
-                if (transcript.length < 2 && !shortValidResponses.includes(transcript.toLowerCase())) {
-                    console.log('🔇 Transcription trop courte et non reconnue comme réponse valide:', transcript);
+            let result = await response.json();
+            if (response.status === 202 && result.poll_url) {
+                result = await this.waitForTranscription(result.poll_url);
+                if (!result) {
                     return;
                 }
+                if (result.status === 'error' || result.status === 'failed') {
+                    console.warn('⚠️ Transcription en erreur:', result.http_status, result.error);
+                    return;
+                }
+            }
+            console.log('📝 Résultat serveur:', result);
 
-                // ✅ SUPPRIMER : Ne plus afficher le feedback visuel ici
-                // this.showVisualFeedback(transcript);
-
-                this.handleSpeechResult(transcript);
-            } else if (result.success && result.fallback) {
+            if (result.fallback || !result.transcript) {
                 console.log('🦊 Firefox : Fallback activé - transcription vide ignorée');
                 console.log('🦊 Firefox : Continue d\'écouter...');
-                // ✅ IGNORER les transcriptions vides du fallback
+                // ✅ IGNORER les transcriptions vides ou parasites (filtrées par le serveur)
                 return;
-            } else {
-                console.log('📝 Aucune transcription valide reçue');
-                console.log('📝 Résultat complet:', result);
+            }
+
+            if (this.processingResponse) {
+                console.log('⏭️ Déjà en cours de traitement');
+                return;
+            }
+            this.processingResponse = true;
+
+            // Arrêter l'audio de la question si en cours
+            if (window.stopAudioOnSpeech) {
+                window.stopAudioOnSpeech();
+            }
+
+            try {
+                // Réponse déjà interprétée et enregistrée par le serveur
+                this.handleVoiceResult(result.transcript, result);
+            } finally {
+                setTimeout(() => {
+                    this.processingResponse = false;
+                }, 1000);
             }
 
         } catch (error) {
@@ -1057,6 +1087,28 @@ class FallbackRecognitionManager {
         }
     }
 
+    async waitForTranscription(pollUrl, timeoutMs = 15000) {
+        // Interroge la tâche de transcription jusqu'à son résultat (null si abandon)
+        const deadline = Date.now() + timeoutMs;
+        let delay = 200;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, delay));
+            delay = Math.min(delay * 1.5, 1000);
+
+            const response = await fetch(pollUrl, { headers: { 'Accept': 'application/json' } });
+            if (!response.ok) {
+                console.warn('⚠️ Suivi de transcription impossible:', response.status);
+                return null;
+            }
+            const job = await response.json();
+            if (job.status !== 'pending') {
+                return job;
+            }
+        }
+        console.warn('⚠️ Transcription trop longue - extrait ignoré');
+        return null;
+    }
+
     handleSpeechResult(transcript) {
         // ✅ MÊME LOGIQUE que SpeechRecognitionManager
         const text = transcript.toLowerCase().trim();
@@ -1120,51 +1172,7 @@ class FallbackRecognitionManager {
             });
 
             const result = await response.json();
-
-            if (result.valid) {
-                console.log('✅ Réponse validée:', result.response_text);
-
-                // ✅ NOUVEAU : Afficher le signet vert pour les réponses valides
-                this.showVisualFeedback(transcript, 'success');
-
-                if (result.is_complete) {
-                    // ✅ NOUVEAU : Marquer la session comme terminée avant redirection
-                    this.markSessionComplete();
-                    setTimeout(() => {
-                        window.location.href = `/resultat/${window.sessionId}`;
-                    }, 1500);
-                } else if (result.next_question && window.questionnaireManager) {
-                    setTimeout(() => {
-                        window.questionnaireManager.loadQuestion(result.next_question);
-                    }, 1500);
-                }
-            } else {
-                console.log('❌ Réponse non reconnue');
-
-                // ✅ NOUVEAU : Afficher le signet rouge pour les réponses erronées
-                this.showVisualFeedback(transcript, 'error');
-
-                // ✅ AFFICHAGE ERREUR Firefox
-                if (window.questionnaireManager) {
-                    if (typeof window.questionnaireManager.showError === 'function') {
-                        window.questionnaireManager.showError(result.error || 'Réponse non reconnue');
-                    }
-                    if (result.suggestions && typeof window.questionnaireManager.showSuggestions === 'function') {
-                        window.questionnaireManager.showSuggestions(result.suggestions);
-                    }
-                }
-
-                // ✅ REDÉMARRER l'écoute Firefox après erreur (1 seconde)
-                setTimeout(() => {
-                    console.log('🦊 Firefox : Redémarrage après erreur');
-                    // ✅ S'assurer que l'écoute est complètement arrêtée avant de redémarrer
-                    this.stopContinuousSpeech();
-                    setTimeout(() => {
-                        console.log('🦊 Firefox : Démarrage de la nouvelle écoute');
-                        this.startContinuousSpeech();
-                    }, 500); // Délai court entre arrêt et redémarrage
-                }, 1000); // ✅ 1 SECONDE au lieu de 3
-            }
+            this.handleVoiceResult(transcript, result);
 
         } catch (error) {
             console.error('❌ Erreur traitement réponse:', error);
@@ -1195,6 +1203,54 @@ class FallbackRecognitionManager {
         }
     }
 
+    handleVoiceResult(transcript, result) {
+        // Réponse du serveur (process_voice ou transcribe_and_score)
+        if (result.valid) {
+            console.log('✅ Réponse validée:', result.response_text);
+
+            // ✅ NOUVEAU : Afficher le signet vert pour les réponses valides
+            this.showVisualFeedback(transcript, 'success');
+
+            if (result.is_complete) {
+                // ✅ NOUVEAU : Marquer la session comme terminée avant redirection
+                this.markSessionComplete();
+                setTimeout(() => {
+                    window.location.href = `/resultat/${window.sessionId}`;
+                }, 1500);
+            } else if (result.next_question && window.questionnaireManager) {
+                setTimeout(() => {
+                    window.questionnaireManager.loadQuestion(result.next_question);
+                }, 1500);
+            }
+        } else {
+            console.log('❌ Réponse non reconnue');
+
+            // ✅ NOUVEAU : Afficher le signet rouge pour les réponses erronées
+            this.showVisualFeedback(transcript, 'error');
+
+            // ✅ AFFICHAGE ERREUR Firefox
+            if (window.questionnaireManager) {
+                if (typeof window.questionnaireManager.showError === 'function') {
+                    window.questionnaireManager.showError(result.error || 'Réponse non reconnue');
+                }
+                if (result.suggestions && typeof window.questionnaireManager.showSuggestions === 'function') {
+                    window.questionnaireManager.showSuggestions(result.suggestions);
+                }
+            }
+
+            // ✅ REDÉMARRER l'écoute Firefox après erreur (1 seconde)
+            setTimeout(() => {
+                console.log('🦊 Firefox : Redémarrage après erreur');
+                // ✅ S'assurer que l'écoute est complètement arrêtée avant de redémarrer
+                this.stopContinuousSpeech();
+                setTimeout(() => {
+                    console.log('🦊 Firefox : Démarrage de la nouvelle écoute');
+                    this.startContinuousSpeech();
+                }, 500); // Délai court entre arrêt et redémarrage
+            }, 1000); // ✅ 1 SECONDE au lieu de 3
+        }
+    }
+
     // ✅ NOUVELLES FONCTIONS : Affichage des erreurs et succès pour Firefox
     showError(message) {
         if (window.questionnaireManager) {
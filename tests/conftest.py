@@ -0,0 +1,130 @@
+"""
+Fixtures partagées : modules de l'application importables et serveur amont local
+
+``stub_server(respond)`` démarre un serveur HTTP/1.1 keep-alive sur un port
+libre. ``respond(request)`` reçoit ``{"path", "body"}`` (corps JSON décodé)
+et retourne ``(statut, corps JSON)`` ou ``(statut, corps JSON, en-têtes)``.
+Le serveur compte les connexions TCP acceptées et garde les requêtes reçues.
+
+``db`` : DatabaseManager migré sur une base SQLite temporaire.
+
+``legacy_db(version)`` : base SQLite temporaire au schéma d'une version
+antérieure (migrations 1 à ``version`` seulement), à peupler directement
+avec sqlite3 avant d'appeler ``migrate()``.
+
+``app`` : application complète créée dans un dossier temporaire (base
+SQLite et cache audio vides).
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class StubServer:
+    """Serveur amont de test (TTS, Speech-to-Text)"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Sans Nagle : pas d'attente d'ACK différé entre en-têtes et corps
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = {"path": self.path, "body": json.loads(self.rfile.read(length) or b"null")}
+                with stub._lock:
+                    stub.requests.append(request)
+                status, body, *headers = stub.respond(request)
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers[0] if headers else {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(respond):
+        server = StubServer(respond)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    from models.database_flask import DatabaseManager
+
+    db = DatabaseManager(str(tmp_path / "responses.db"))
+    db.migrate()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    import sqlite3
+
+    from models.database_flask import SCHEMA_MIGRATIONS
+
+    def create(version):
+        path = tmp_path / f"responses_v{version}.db"
+        conn = sqlite3.connect(path)
+        for number, _description, statements in SCHEMA_MIGRATIONS:
+            if number <= version:
+                for statement in statements:
+                    conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+        return conn, str(path)
+
+    return create
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Chemins relatifs de la configuration (data/, static/audio_cache) sous tmp_path
+    monkeypatch.chdir(tmp_path)
+    import app_flask
+
+    app = app_flask.create_app()
+    yield app
+    app.transcriptions.shutdown()
@@ -0,0 +1,93 @@
+"""Liste des sessions de l'administration (user-006)"""
+
+SESSION = {"initials": "AB", "birth_date": "01/01/1950", "today_date": "01/01/2025"}
+
+
+def test_admin_page_shows_answered_questions_out_of_30(app):
+    session_id = app.db.create_session(SESSION)
+    for number in range(0, 31):
+        app.db.save_response(session_id, number, f"Q{number}", 1, "Pas du tout")
+
+    html = app.test_client().get("/admin").get_data(as_text=True)
+
+    # La question 0 (préliminaire) n'entre pas dans le compte « N/30 »
+    assert "30/30" in html
+    assert "31/30" not in html
+
+
+def _seed(db):
+    """Sessions à dates contrôlées (ex æquo sur created_at) ; retourne {id: (created_at, terminée)}"""
+    seeded = {}
+    for created_at, completed in (
+        ("2025-01-03 09:00:00", True),
+        ("2025-01-03 09:00:00", False),
+        ("2025-01-03 09:00:00", True),
+        ("2025-01-02 12:00:00", False),
+        ("2025-01-02 23:59:59", True),
+        ("2025-01-01 08:00:00", True),
+        ("2025-01-01 08:00:00", False),
+    ):
+        session_id = db.create_session(SESSION)
+        if completed:
+            db.update_session_completion(session_id)
+        with db._transaction() as cursor:
+            cursor.execute("UPDATE sessions SET created_at = ? WHERE id = ?", (created_at, session_id))
+        seeded[session_id] = (created_at, completed)
+    return seeded
+
+
+def _expected(seeded, keep=lambda created_at, completed: True):
+    ids = [sid for sid, (created_at, completed) in seeded.items() if keep(created_at, completed)]
+    return sorted(ids, key=lambda sid: (seeded[sid][0], sid), reverse=True)
+
+
+def _all_pages(db, cursor=None, **filters):
+    """Identifiants de toutes les pages (2 par page) à partir de ``cursor``"""
+    ids = []
+    while True:
+        page = db.list_sessions(limit=2, cursor=cursor, **filters)
+        assert len(page["sessions"]) <= 2
+        ids.extend(session["id"] for session in page["sessions"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_pages_follow_created_at_then_id_with_ties(db):
+    seeded = _seed(db)
+
+    first = db.list_sessions(limit=2)
+    # Session créée pendant la pagination : n'apparaît pas dans les pages suivantes
+    db.create_session(SESSION)
+    ids = [session["id"] for session in first["sessions"]] + _all_pages(db, first["next_cursor"])
+
+    assert ids == _expected(seeded)
+    assert len(set(ids)) == len(ids)
+
+
+def test_status_and_date_filters(db):
+    seeded = _seed(db)
+
+    assert _all_pages(db, status="completed") == _expected(seeded, lambda _, done: done)
+    assert _all_pages(db, status="in_progress") == _expected(seeded, lambda _, done: not done)
+    # Bornes incluses : toute la journée du 2 janvier
+    assert _all_pages(db, date_from="2025-01-02", date_to="2025-01-02") == _expected(
+        seeded, lambda created_at, _: created_at.startswith("2025-01-02")
+    )
+    assert _all_pages(db, status="completed", date_from="2025-01-02") == _expected(
+        seeded, lambda created_at, done: done and created_at >= "2025-01-02"
+    )
+    assert _all_pages(db, date_to="2024-12-31") == []
+
+
+def test_invalid_filters_return_400(app):
+    client = app.test_client()
+    for query in ("from=bad", "to=2025-13-01", "status=archived", "cursor=invalide"):
+        response = client.get(f"/api/admin/sessions?{query}")
+        assert response.status_code == 400, query
+        assert "error" in response.get_json()
+        assert client.get(f"/admin?{query}").status_code == 400, query
+
+    response = client.get("/api/admin/sessions?status=completed&from=2025-01-01&limit=10")
+    assert response.status_code == 200
+    assert response.get_json()["sessions"] == []
@@ -0,0 +1,79 @@
+"""Fichiers audio immuables adressés par contenu (user-014)"""
+
+import io
+import wave
+from pathlib import Path
+
+
+def _add_wav(app, name="question_1.wav"):
+    """WAV dans le cache audio de l'application ; retourne (hash du contenu, octets)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(bytes(range(256)) * 8)
+    data = buffer.getvalue()
+    cache_dir = Path(app.config["AUDIO_CACHE_DIR"])
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / name).write_bytes(data)
+    app.audio_index.reload()
+    return app.audio_index.for_text_hash(Path(name).stem).content_hash, data
+
+
+def test_full_response_is_immutable_with_content_etag(app):
+    content_hash, data = _add_wav(app)
+    response = app.test_client().get(f"/api/audio/{content_hash}.wav")
+
+    assert response.status_code == 200
+    assert response.data == data
+    assert response.mimetype == "audio/wav"
+    assert response.headers["ETag"] == f'"{content_hash}"'
+    assert response.headers["Accept-Ranges"] == "bytes"
+    cache_control = response.cache_control
+    assert cache_control.public and cache_control.immutable
+    assert cache_control.max_age == 31536000
+
+
+def test_if_none_match_returns_304(app):
+    content_hash, _ = _add_wav(app)
+    client = app.test_client()
+
+    response = client.get(f"/api/audio/{content_hash}.wav", headers={"If-None-Match": f'"{content_hash}"'})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == f'"{content_hash}"'
+
+    stale = client.get(f"/api/audio/{content_hash}.wav", headers={"If-None-Match": '"autre"'})
+    assert stale.status_code == 200
+
+
+def test_range_requests(app):
+    content_hash, data = _add_wav(app)
+    client = app.test_client()
+
+    response = client.get(f"/api/audio/{content_hash}.wav", headers={"Range": "bytes=100-299"})
+    assert response.status_code == 206
+    assert response.data == data[100:300]
+    assert response.headers["Content-Range"] == f"bytes 100-299/{len(data)}"
+    assert response.cache_control.immutable
+
+    # Suffixe : derniers octets
+    tail = client.get(f"/api/audio/{content_hash}.wav", headers={"Range": "bytes=-44"})
+    assert tail.status_code == 206
+    assert tail.data == data[-44:]
+
+    unsatisfiable = client.get(f"/api/audio/{content_hash}.wav", headers={"Range": f"bytes={len(data) + 10}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["Content-Range"] == f"bytes */{len(data)}"
+
+
+def test_unknown_or_removed_audio_returns_404(app):
+    content_hash, _ = _add_wav(app)
+    client = app.test_client()
+    assert client.get("/api/audio/0123456789abcdef0123456789abcdef.wav").status_code == 404
+
+    # Fichier supprimé depuis le parcours : 404, et oublié par l'index
+    Path(app.config["AUDIO_CACHE_DIR"], "question_1.wav").unlink()
+    assert client.get(f"/api/audio/{content_hash}.wav").status_code == 404
+    assert app.audio_index.for_content_hash(content_hash) is None
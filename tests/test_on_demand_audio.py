@@ -0,0 +1,129 @@
+"""Cache borné de la synthèse à la demande et index audio (user-018)"""
+
+import base64
+import io
+import os
+import threading
+import time
+import wave
+
+from audio_handler_simple_flask import AudioHandlerSimple, SynthesisError
+from audio_index_flask import AudioIndex
+
+
+def _cloud_tts(request):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(request["body"]["input"]["text"].encode("utf-8").ljust(1000, b"\0"))
+    return 200, {"audioContent": base64.b64encode(buffer.getvalue()).decode("ascii")}
+
+
+def test_evicted_file_leaves_index_and_only_lru_hits_count(stub_server, tmp_path, monkeypatch):
+    server = stub_server(_cloud_tts)
+    # Index sur un chemin relatif, gestionnaire sur un chemin absolu (comme l'application)
+    monkeypatch.chdir(tmp_path)
+    index = AudioIndex("cache", check_interval=3600)
+    handler = AudioHandlerSimple(
+        api_url=server.url, cache_dir=tmp_path / "cache" / "voix", max_cache_bytes=2500
+    )
+    handler.on_evict = index.forget
+    handler.pin_texts(["épinglé"])
+
+    pinned = handler.get_or_synthesize("épinglé")
+    first = handler.get_or_synthesize("premier")
+    index.reload()
+    assert str(index.for_text_hash(first.stem).path) == os.path.join("cache", "voix", first.name)
+
+    # Hits : seulement les fichiers évinçables du LRU, quel que soit le chemin
+    assert handler.record_hit(index.for_text_hash(first.stem).path)
+    assert not handler.record_hit(index.for_text_hash(pinned.stem).path)
+    assert handler.get_cache_info()["hits"] == 1
+
+    handler.get_or_synthesize("second")  # dépasse le budget : « premier » est évincé
+    assert not first.exists()
+    assert index.for_text_hash(first.stem) is None
+    assert pinned.exists() and index.for_text_hash(pinned.stem) is not None
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.005)
+
+
+def _concurrent_calls(handler, text, count):
+    """Lance ``count`` appels concurrents ; retourne (threads, résultats)"""
+    results = [None] * count
+
+    def call(i):
+        try:
+            results[i] = handler.get_or_synthesize(text)
+        except SynthesisError as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_requests_share_one_synthesis(stub_server, tmp_path):
+    release = threading.Event()
+
+    def slow_tts(request):
+        release.wait(5)
+        return _cloud_tts(request)
+
+    server = stub_server(slow_tts)
+    handler = AudioHandlerSimple(api_url=server.url, cache_dir=tmp_path / "cache")
+    threads, results = _concurrent_calls(handler, "bonjour", 8)
+    # Le leader est chez le serveur amont, les 7 autres attendent son résultat
+    _wait_for(lambda: handler.get_cache_info()["coalesced"] == 7)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(server.requests) == 1
+    assert len(set(results)) == 1 and results[0].exists()
+    info = handler.get_cache_info()
+    assert (info["misses"], info["coalesced"], info["synthesized"], info["errors"]) == (1, 7, 1, 0)
+    assert info["in_flight"] == 0
+
+    # Appel suivant : servi par le cache
+    assert handler.get_or_synthesize("bonjour") == results[0]
+    assert len(server.requests) == 1
+    assert handler.get_cache_info()["hits"] == 1
+
+
+def test_failing_leader_propagates_error_to_waiters(stub_server, tmp_path):
+    release = threading.Event()
+
+    def failing_tts(request):
+        release.wait(5)
+        return 503, {"error": "indisponible"}
+
+    server = stub_server(failing_tts)
+    handler = AudioHandlerSimple(api_url=server.url, cache_dir=tmp_path / "cache")
+    threads, results = _concurrent_calls(handler, "bonjour", 4)
+    _wait_for(lambda: handler.get_cache_info()["coalesced"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(server.requests) == 1
+    assert all(isinstance(result, SynthesisError) for result in results)
+    # Les requêtes en attente reçoivent l'erreur du leader
+    assert len({id(result) for result in results}) == 1
+    assert results[0].retryable
+    info = handler.get_cache_info()
+    assert (info["misses"], info["coalesced"], info["errors"], info["in_flight"]) == (1, 3, 1, 0)
+
+    # Le vol terminé, un nouvel appel retente la synthèse
+    release.clear()
+    server.respond = _cloud_tts
+    assert handler.get_or_synthesize("bonjour").exists()
+    assert len(server.requests) == 2
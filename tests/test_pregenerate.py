@@ -0,0 +1,78 @@
+"""Pré-génération des audios contre un serveur TTS local (user-017)"""
+
+import base64
+import io
+import wave
+
+from audio_handler_simple_flask import AudioHandlerSimple
+from pregenerate_audios import Pregenerator
+
+
+def _wav(text: str) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(text.encode("utf-8").ljust(64, b"\0"))
+    return buffer.getvalue()
+
+
+def _cloud_tts(request):
+    text = request["body"]["input"]["text"]
+    return 200, {"audioContent": base64.b64encode(_wav(text)).decode("ascii")}
+
+
+def _handler(server, tmp_path):
+    return AudioHandlerSimple(api_url=server.url, cache_dir=tmp_path)
+
+
+def test_synthesizes_missing_texts_and_skips_cached(stub_server, tmp_path):
+    server = stub_server(_cloud_tts)
+    handler = _handler(server, tmp_path)
+    texts = {f"t{i}": f"Texte {i}" for i in range(6)}
+    handler.synthesize_to_cache(texts["t0"])
+    server.requests.clear()
+
+    report = Pregenerator(handler, workers=4, rate=0).run(texts)
+
+    assert report["cached"] == 1
+    assert report["synthesized"] == 5
+    assert report["failed"] == []
+    assert sorted(r["body"]["input"]["text"] for r in server.requests) == [f"Texte {i}" for i in range(1, 6)]
+    for text in texts.values():
+        assert handler._get_cache_path(text).read_bytes() == _wav(text)
+    # Écriture atomique : aucun fichier temporaire laissé dans le cache
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # Reprise : tout est déjà en cache, aucun appel amont
+    server.requests.clear()
+    report = Pregenerator(handler, workers=4, rate=0).run(texts)
+    assert report["cached"] == 6 and report["synthesized"] == 0
+    assert server.requests == []
+
+
+def test_retries_transient_errors_only(stub_server, tmp_path):
+    attempts = {}
+
+    def flaky(request):
+        text = request["body"]["input"]["text"]
+        attempts[text] = attempts.get(text, 0) + 1
+        if text == "refusé":
+            return 400, {"error": "texte invalide"}
+        if attempts[text] == 1:
+            return 503, {"error": "indisponible"}
+        return _cloud_tts(request)
+
+    server = stub_server(flaky)
+    handler = _handler(server, tmp_path)
+
+    report = Pregenerator(handler, workers=2, rate=0, retries=2, backoff=0.01).run(
+        {"ok": "accepté", "ko": "refusé"}
+    )
+
+    assert report["synthesized"] == 1
+    assert report["retries"] == 1
+    assert report["failed"] == ["ko"]
+    assert attempts == {"accepté": 2, "refusé": 1}
+    assert not handler._get_cache_path("refusé").exists()
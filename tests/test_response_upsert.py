@@ -0,0 +1,73 @@
+"""Migration v2 et upsert des réponses (user-003)"""
+
+from models.database_flask import SCHEMA_MIGRATIONS, DatabaseManager
+
+SESSION = {"initials": "AB", "birth_date": "01/01/1950", "today_date": "01/01/2025"}
+
+
+def _insert_session(conn, session_id):
+    conn.execute(
+        "INSERT INTO sessions (id, initials, birth_date, today_date, mode, audio_enabled)"
+        " VALUES (?, 'AB', '01/01/1950', '01/01/2025', 'Standard', 1)",
+        (session_id,),
+    )
+
+
+def _insert_response(conn, session_id, question_num, score):
+    return conn.execute(
+        "INSERT INTO responses (session_id, question_num, question_text, score, response_text, response_type)"
+        " VALUES (?, ?, 'Q', ?, 'R', 'manual')",
+        (session_id, question_num, score),
+    ).lastrowid
+
+
+def test_v2_keeps_latest_duplicate_and_adds_unique_index(legacy_db):
+    conn, path = legacy_db(1)
+    _insert_session(conn, "s1")
+    _insert_session(conn, "s2")
+    # Doublons hérités de l'ancien INSERT sans contrainte
+    _insert_response(conn, "s1", 1, 1)
+    _insert_response(conn, "s1", 1, 2)
+    latest_q1 = _insert_response(conn, "s1", 1, 3)
+    latest_q2 = _insert_response(conn, "s1", 2, 4)
+    first_s2 = _insert_response(conn, "s2", 1, 2)
+    _insert_response(conn, "s2", 1, 2)
+    latest_s2 = _insert_response(conn, "s2", 1, 1)
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert db.migrate() == SCHEMA_MIGRATIONS[-1][0]
+        with db._connection() as c:
+            rows = c.execute(
+                "SELECT id, session_id, question_num, score FROM responses ORDER BY id"
+            ).fetchall()
+            indexes = {
+                row["name"]: row["unique"]
+                for row in c.execute("PRAGMA index_list(responses)").fetchall()
+            }
+        assert [tuple(row) for row in rows] == [
+            (latest_q1, "s1", 1, 3),
+            (latest_q2, "s1", 2, 4),
+            (latest_s2, "s2", 1, 1),
+        ]
+        assert first_s2 not in [row["id"] for row in rows]
+        assert indexes.get("idx_responses_session_question") == 1
+        # Index redondants supprimés
+        assert "idx_session_id" not in indexes and "idx_question_num" not in indexes
+        # Idempotent
+        assert db.migrate() == SCHEMA_MIGRATIONS[-1][0]
+    finally:
+        db.close()
+
+
+def test_save_response_overwrites_previous_answer(db):
+    session_id = db.create_session(SESSION)
+    assert db.save_response(session_id, 3, "Question 3", 2, "Un peu", response_type="manual")
+    assert db.save_response(session_id, 3, "Question 3", 4, "Beaucoup", "beaucoup", "voice")
+
+    responses = db.get_responses(session_id)
+    assert len(responses) == 1
+    assert (responses[0]["score"], responses[0]["response_text"]) == (4, "Beaucoup")
+    assert (responses[0]["transcript"], responses[0]["response_type"]) == ("beaucoup", "voice")
@@ -0,0 +1,104 @@
+"""Scores EORTC QLQ-C30 v3.0 (user-009) : valeurs calculées à la main d'après le manuel"""
+
+import numpy as np
+import pytest
+
+from models.score_matrix_flask import MISSING_SCORE, N_ITEMS
+from scoring_logic import SCALE_CODES, score_matrix, score_session
+
+M = MISSING_SCORE
+
+
+def _row(answers, default=M):
+    """Ligne de matrice : {numéro d'item: réponse}, les autres à ``default``"""
+    row = np.full((1, N_ITEMS), default, dtype=np.uint8)
+    for item, value in answers.items():
+        row[0, item - 1] = value
+    return row
+
+
+def _score(answers, code, default=M):
+    return score_matrix(_row(answers, default))[code][0]
+
+
+def test_functional_scale_raw_score_and_reversed_transform():
+    # PF2 : RS = (1+2+2+1+3)/5 = 1,8 ; S = (1 - (1,8-1)/3) × 100
+    assert _score({1: 1, 2: 2, 3: 2, 4: 1, 5: 3}, "PF2") == pytest.approx(73.333, abs=1e-3)
+    # Aucune difficulté = 100, difficulté maximale = 0
+    assert _score({6: 1, 7: 1}, "RF2") == 100.0
+    assert _score({6: 4, 7: 4}, "RF2") == 0.0
+
+
+def test_symptom_scale_transform():
+    # FA : RS = (2+3+4)/3 = 3 ; S = (3-1)/3 × 100
+    assert _score({10: 2, 12: 3, 18: 4}, "FA") == pytest.approx(66.667, abs=1e-3)
+    assert _score({8: 1}, "DY") == 0.0
+    assert _score({8: 4}, "DY") == 100.0
+
+
+def test_global_health_items_are_not_reversed():
+    # Q29-30 : 1 = très mauvais, 7 = excellent ; S = (RS-1)/6 × 100, sans inversion
+    assert _score({29: 5, 30: 6}, "QL2") == pytest.approx(75.0)
+    assert _score({29: 7, 30: 7}, "QL2") == 100.0
+    assert _score({29: 1, 30: 1}, "QL2") == 0.0
+
+
+def test_half_of_items_missing_rule():
+    # PF2 : 3 items sur 5 renseignés -> RS = moyenne des items présents
+    assert _score({1: 2, 2: 2, 3: 2}, "PF2") == pytest.approx(66.667, abs=1e-3)
+    # 2 items sur 5 : moins de la moitié, non calculable
+    assert np.isnan(_score({1: 2, 2: 2}, "PF2"))
+    # Échelle à 2 items : 1 item suffit (exactement la moitié)
+    assert _score({6: 3}, "RF2") == pytest.approx(33.333, abs=1e-3)
+    # FA : 1 item sur 3 non calculable, 2 sur 3 calculable
+    assert np.isnan(_score({10: 2}, "FA"))
+    assert _score({10: 2, 12: 4}, "FA") == pytest.approx(66.667, abs=1e-3)
+    # Échelle à un seul item manquant
+    assert np.isnan(_score({}, "DY"))
+
+
+def test_out_of_range_answers_count_as_missing():
+    # 7 n'est pas une réponse valide sur une échelle 1-4
+    assert _score({6: 7, 7: 2}, "RF2") == pytest.approx(66.667, abs=1e-3)
+    assert np.isnan(_score({8: 5}, "DY"))
+
+
+def test_summary_score_needs_all_13_scales():
+    # Items 1-28 à 2 : fonctionnels 66,67, symptômes 33,33 (inversés : 66,67)
+    # PF2 à 1 : 100 -> SUM = (100 + 12 × 66,667) / 13
+    answers = {item: 2 for item in range(1, 29)}
+    answers.update({item: 1 for item in (1, 2, 3, 4, 5)})
+    assert _score(answers, "SUM") == pytest.approx((100 + 12 * 200 / 3) / 13)
+
+    # QL2 et FI n'entrent pas dans le score résumé
+    without_ql_fi = {k: v for k, v in answers.items() if k != 28}
+    assert _score(without_ql_fi, "SUM") == pytest.approx((100 + 12 * 200 / 3) / 13)
+
+    # Une échelle manquante (DY) : pas de score résumé
+    without_dy = {k: v for k, v in answers.items() if k != 8}
+    assert np.isnan(_score(without_dy, "SUM"))
+
+
+def test_all_missing_row():
+    results = score_matrix(np.full((1, N_ITEMS), MISSING_SCORE, dtype=np.uint8))
+    assert set(results) == set(SCALE_CODES)
+    assert all(np.isnan(results[code][0]) for code in SCALE_CODES)
+    assert all(scale["score"] is None for scale in score_session([]))
+
+
+def test_rows_are_scored_independently():
+    matrix = np.vstack([_row({8: 4}), _row({}), _row({8: 2})])
+    assert score_matrix(matrix)["DY"] == pytest.approx([100.0, np.nan, 33.333], abs=1e-3, nan_ok=True)
+    with pytest.raises(ValueError):
+        score_matrix(np.zeros((2, 29), dtype=np.uint8))
+
+
+def test_score_session_rounds_and_ignores_question_0():
+    responses = [{"question_num": 0, "score": 1}] + [
+        {"question_num": item, "score": value} for item, value in {10: 2, 12: 3, 18: 3, 29: 6, 30: 5}.items()
+    ]
+    scores = {scale["code"]: scale["score"] for scale in score_session(responses)}
+    # FA : RS = 8/3 ; S = (8/3 - 1)/3 × 100 = 55,56
+    assert scores["FA"] == 55.6
+    assert scores["QL2"] == 75.0
+    assert scores["SUM"] is None
@@ -0,0 +1,107 @@
+"""Compteurs incrémentaux session_stats (user-005)"""
+
+from models.database_flask import DatabaseManager
+
+SESSION = {"initials": "AB", "birth_date": "01/01/1950", "today_date": "01/01/2025"}
+
+# Agrégat recalculé depuis responses, question 0 exclue
+FRESH_AGGREGATE = """
+    SELECT s.id AS session_id, COUNT(r.id) AS answered, COALESCE(SUM(r.score), 0) AS score_sum
+    FROM sessions s
+    LEFT JOIN responses r ON r.session_id = s.id AND r.question_num != 0
+    GROUP BY s.id
+"""
+
+
+def _stats(db):
+    with db._connection() as conn:
+        stored = {
+            row["session_id"]: (row["answered"], row["score_sum"])
+            for row in conn.execute("SELECT session_id, answered, score_sum FROM session_stats")
+        }
+        fresh = {
+            row["session_id"]: (row["answered"], row["score_sum"])
+            for row in conn.execute(FRESH_AGGREGATE)
+        }
+    return stored, fresh
+
+
+def test_stats_match_fresh_aggregate_after_saves(db):
+    first = db.create_session(SESSION)
+    second = db.create_session(SESSION)
+    empty = db.create_session(SESSION)
+
+    saves = [
+        (first, 0, 1),  # question 0 : jamais comptée
+        (first, 1, 2),
+        (first, 2, 3),
+        (first, 1, 4),  # score modifié
+        (first, 1, 4),  # même score renvoyé
+        (second, 29, 7),
+        (second, 0, 2),
+        (second, 0, 3),
+        (first, 30, 5),
+        (second, 29, 1),
+    ]
+    for session_id, question_num, score in saves:
+        assert db.save_response(session_id, question_num, f"Question {question_num}", score, "R")
+        stored, fresh = _stats(db)
+        assert stored == fresh
+
+    assert stored == {first: (3, 12), second: (1, 1), empty: (0, 0)}
+    stats = db.get_session_statistics(first)
+    assert (stats["answered"], stats["missed"], stats["average_score"]) == (3, 27, 4.0)
+    with db._connection() as conn:
+        last = conn.execute(
+            "SELECT last_question FROM session_stats WHERE session_id = ?", (second,)
+        ).fetchone()[0]
+    assert last == 29
+
+
+def test_v3_backfills_stats_from_existing_responses(legacy_db):
+    conn, path = legacy_db(2)
+    for session_id in ("s1", "s2"):
+        conn.execute(
+            "INSERT INTO sessions (id, initials, birth_date, today_date, mode, audio_enabled)"
+            " VALUES (?, 'AB', '01/01/1950', '01/01/2025', 'Standard', 1)",
+            (session_id,),
+        )
+    for question_num, score, timestamp in (
+        (0, 1, "2025-01-01 10:00:00"),
+        (1, 2, "2025-01-01 10:01:00"),
+        (3, 4, "2025-01-01 10:03:00"),
+        (2, 3, "2025-01-01 10:02:00"),
+    ):
+        conn.execute(
+            "INSERT INTO responses (session_id, question_num, question_text, score, response_text,"
+            " response_type, timestamp) VALUES ('s1', ?, 'Q', ?, 'R', 'manual', ?)",
+            (question_num, score, timestamp),
+        )
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        db.migrate()
+        with db._connection() as c:
+            rows = {
+                row["session_id"]: tuple(row)[1:]
+                for row in c.execute(
+                    "SELECT session_id, answered, score_sum, last_question, last_activity"
+                    " FROM session_stats"
+                )
+            }
+        assert rows == {
+            "s1": (3, 9, 3, "2025-01-01 10:03:00"),
+            "s2": (0, 0, None, None),
+        }
+        stored, fresh = _stats(db)
+        assert stored == fresh
+
+        # Les écritures suivantes partent des compteurs reconstitués
+        assert db.save_response("s1", 1, "Question 1", 4, "R")
+        assert db.save_response("s2", 5, "Question 5", 2, "R")
+        stored, fresh = _stats(db)
+        assert stored == fresh == {"s1": (3, 11), "s2": (1, 2)}
+    finally:
+        db.close()
@@ -0,0 +1,110 @@
+"""Client Speech-to-Text : connexions persistantes et nouveaux essais (user-021)"""
+
+import socket
+import threading
+import time
+
+import pytest
+import requests
+
+from speech_client_flask import SpeechClient
+
+PAYLOAD = {"config": {"languageCode": "fr-FR"}, "audio": {"content": ""}}
+
+
+def _client(url, **kwargs):
+    kwargs.setdefault("backoff", 0)
+    return SpeechClient(api_url=f"{url}/v1/speech:recognize", **kwargs)
+
+
+def test_reuses_one_keep_alive_connection(stub_server):
+    server = stub_server(lambda request: (200, {"results": []}))
+    client = _client(server.url)
+
+    for _ in range(5):
+        assert client.recognize(PAYLOAD).status_code == 200
+
+    assert len(server.requests) == 5
+    assert server.connections == 1
+    assert client.stats()["connections_opened"] == 1
+    assert client.stats()["latency_ms"]["count"] == 5
+
+
+def test_retries_unprocessed_statuses_with_retry_after(stub_server):
+    statuses = iter([503, 429, 200])
+    server = stub_server(lambda request: (next(statuses), {}, {"Retry-After": "0"}))
+    client = _client(server.url, retries=2)
+
+    assert client.recognize(PAYLOAD).status_code == 200
+    assert len(server.requests) == 3
+    assert client.stats()["retries"] == 2
+
+
+@pytest.mark.parametrize("status", [400, 500])
+def test_does_not_retry_other_errors(stub_server, status):
+    server = stub_server(lambda request: (status, {"error": "refusé"}))
+    client = _client(server.url, retries=2)
+
+    assert client.recognize(PAYLOAD).status_code == status
+    assert len(server.requests) == 1
+
+
+def test_retries_connection_refused():
+    # Port libre sans serveur : la requête n'est jamais envoyée
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = _client(f"http://127.0.0.1:{port}", retries=2)
+
+    with pytest.raises(requests.ConnectionError):
+        client.recognize(PAYLOAD)
+    assert client.stats()["calls"] == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_does_not_retry_reset_after_request_sent():
+    # Le serveur lit la requête puis réinitialise la connexion : l'appel a
+    # pu être traité (et facturé), il n'est pas relancé
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    accepted = []
+
+    def serve():
+        # Une deuxième connexion dans la demi-seconde serait un nouvel essai
+        server.settimeout(0.5)
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            accepted.append(conn)
+            conn.recv(65536)
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+            conn.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    client = _client(f"http://127.0.0.1:{server.getsockname()[1]}", retries=2)
+    try:
+        with pytest.raises(requests.ConnectionError):
+            client.recognize(PAYLOAD)
+        thread.join()
+    finally:
+        server.close()
+    assert len(accepted) == 1
+    assert client.stats()["retries"] == 0
+
+
+def test_does_not_retry_read_timeout(stub_server):
+    def slow(request):
+        time.sleep(0.5)
+        return 200, {}
+
+    server = stub_server(slow)
+    client = _client(server.url, read_timeout=0.1, retries=2)
+
+    with pytest.raises(requests.ReadTimeout):
+        client.recognize(PAYLOAD)
+    time.sleep(0.5)
+    assert len(server.requests) == 1
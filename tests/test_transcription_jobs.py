@@ -0,0 +1,100 @@
+"""Transcriptions asynchrones : file bornée et expiration des tâches (user-022)"""
+
+import io
+import threading
+
+import pytest
+
+from transcription_jobs_flask import TranscriptionExecutor, TranscriptionQueueFullError
+
+
+def test_rejects_submissions_beyond_max_pending(db):
+    executor = TranscriptionExecutor(db, max_workers=1, max_pending=2)
+    release = threading.Event()
+    jobs = [executor.submit(lambda: release.wait(5) and {"transcript": "un peu"}) for _ in range(2)]
+
+    with pytest.raises(TranscriptionQueueFullError):
+        executor.submit(lambda: {})
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["depth"] == 2 and stats["running"] == 1 and stats["queued"] == 1
+    assert db.get_transcription_job(jobs[0])["status"] == "pending"
+
+    release.set()
+    executor.shutdown()
+    for job_id in jobs:
+        job = db.get_transcription_job(job_id)
+        assert job["status"] == "done"
+        assert job["result"] == {"transcript": "un peu"}
+    assert executor.stats()["depth"] == 0
+    # Place libérée : une nouvelle soumission est acceptée
+    executor = TranscriptionExecutor(db, max_workers=1, max_pending=2)
+    executor.submit(lambda: {})
+    executor.shutdown()
+
+
+def test_failed_job_records_error(db):
+    executor = TranscriptionExecutor(db, max_workers=1)
+
+    def boom():
+        raise RuntimeError("amont indisponible")
+
+    job_id = executor.submit(boom)
+    executor.shutdown()
+    job = db.get_transcription_job(job_id)
+    assert job["status"] == "failed"
+    assert job["result"] == {"error": "amont indisponible"}
+    assert executor.stats()["failed"] == 1
+
+
+def test_expired_jobs_are_purged(db):
+    executor = TranscriptionExecutor(db, max_workers=1, job_ttl=600)
+    old = executor.submit(lambda: {})
+    recent = executor.submit(lambda: {})
+    executor.shutdown()
+    with db._transaction() as cursor:
+        cursor.execute(
+            "UPDATE transcription_jobs SET created_at = datetime('now', '-700 seconds') WHERE id = ?",
+            (old,),
+        )
+
+    # Purge au plus une fois par minute, déclenchée par une soumission
+    executor._last_cleanup -= 61
+    executor._maybe_cleanup()
+    assert db.get_transcription_job(old) is None
+    assert db.get_transcription_job(recent) is not None
+
+
+def test_endpoint_answers_429_when_queue_is_full(app):
+    release = threading.Event()
+    app.transcriptions = TranscriptionExecutor(app.db, max_workers=1, max_pending=1)
+    app.transcriptions.submit(lambda: release.wait(5) and {})
+    client = app.test_client()
+
+    response = client.post(
+        "/api/transcribe_chunk?async=1",
+        data={"audio": (io.BytesIO(b"\x1aE\xdf\xa3" * 100), "a.webm")},
+        content_type="multipart/form-data",
+    )
+    release.set()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert app.transcriptions.stats()["rejected"] == 1
+
+
+def test_error_status_is_kept_for_polling(app):
+    client = app.test_client()
+    failed = app.transcriptions.submit(lambda: ({"error": "Session invalide"}, 400))
+    done = app.transcriptions.submit(lambda: ({"valid": False, "fallback": True}, 200))
+    app.transcriptions.shutdown()
+
+    body = client.get(f"/api/transcription_jobs/{failed}").get_json()
+    assert body["status"] == "error"
+    assert body["http_status"] == 400
+    assert body["error"] == "Session invalide"
+
+    body = client.get(f"/api/transcription_jobs/{done}").get_json()
+    assert body["status"] == "done" and "http_status" not in body
+    stats = app.transcriptions.stats()
+    assert stats["errors"] == 1 and stats["completed"] == 1
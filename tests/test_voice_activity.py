@@ -0,0 +1,109 @@
+"""Détection d'activité vocale des extraits PCM (user-025)"""
+
+import base64
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from speech_client_flask import SpeechClient
+from voice_activity_flask import VoiceActivityDetector, decode_pcm
+
+RATE = 16000
+
+
+def _noise(seconds, level, seed=0):
+    return np.random.default_rng(seed).normal(0, level, int(RATE * seconds))
+
+
+def _tone(seconds, amplitude=8000):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return amplitude * np.sin(2 * np.pi * 180 * t)
+
+
+def _pcm(*parts):
+    return np.clip(np.concatenate(parts), -32768, 32767).astype("<i2")
+
+
+def _wav(samples):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+SILENCE = _pcm(_noise(3, 30))
+SPEECH = _pcm(_noise(1, 30), _tone(0.6), _noise(1.4, 30, seed=1))
+
+
+def test_drops_all_silence_chunk():
+    vad = VoiceActivityDetector()
+    result = vad.process(_wav(SILENCE))
+    assert result == {"speech": False, "content": b"", "sample_rate": RATE}
+    stats = vad.stats()
+    assert stats["skipped"] == 1 and stats["bytes_sent"] == 0
+    assert stats["seconds_skipped"] == pytest.approx(3.0)
+
+
+def test_drops_isolated_click():
+    click = _pcm(_noise(1.5, 30), _noise(0.04, 8000, seed=2), _noise(1.5, 30, seed=3))
+    assert VoiceActivityDetector().process(_wav(click))["speech"] is False
+
+
+def test_keeps_and_trims_speech_chunk():
+    vad = VoiceActivityDetector(padding_ms=150)
+    result = vad.process(_wav(SPEECH))
+    assert result["speech"] is True
+    kept = np.frombuffer(result["content"], dtype="<i2")
+    # Tonalité entière plus 150 ms de marge de chaque côté
+    assert len(kept) == RATE * 9 // 10
+    assert np.array_equal(kept, SPEECH[RATE * 85 // 100 : RATE * 175 // 100])
+    stats = vad.stats()
+    assert stats["trimmed"] == 1
+    assert stats["bytes_trimmed"] == len(_wav(SPEECH)) - len(result["content"])
+
+
+def test_unvoiced_consonants_extend_the_speech():
+    hiss = _noise(0.1, 100, seed=4)  # faible énergie, passages par zéro nombreux
+    samples = _pcm(_noise(1, 30), hiss, _tone(0.4), hiss, _noise(1, 30, seed=5))
+    bounds = VoiceActivityDetector(padding_ms=0).speech_bounds(samples, RATE)
+    assert bounds == (RATE, RATE + int(RATE * 0.6))
+
+
+def test_raw_linear16_and_compressed_chunks():
+    samples, rate = decode_pcm(SPEECH.tobytes(), "LINEAR16", 16000)
+    assert rate == RATE and np.array_equal(samples, SPEECH)
+    assert decode_pcm(b"\x1aE\xdf\xa3webm") is None
+    with pytest.raises(ValueError):
+        decode_pcm(b"RIFF\0\0\0\0WAVEjunk")
+
+
+def test_endpoint_skips_upstream_for_silence(app, stub_server):
+    server = stub_server(
+        lambda request: (200, {"results": [{"alternatives": [{"transcript": "beaucoup", "confidence": 0.9}]}]})
+    )
+    app.speech_client = SpeechClient(api_url=f"{server.url}/v1/speech:recognize")
+    client = app.test_client()
+
+    def post(data):
+        return client.post(
+            "/api/transcribe_chunk",
+            data={"audio": (io.BytesIO(data), "a.wav")},
+            content_type="multipart/form-data",
+        ).get_json()
+
+    assert post(_wav(SILENCE)) == {"success": True, "transcript": "", "fallback": True, "silent": True}
+    assert server.requests == []
+
+    assert post(_wav(SPEECH))["transcript"] == "beaucoup"
+    config = server.requests[0]["body"]["config"]
+    assert (config["encoding"], config["sampleRateHertz"]) == ("LINEAR16", RATE)
+    sent = base64.b64decode(server.requests[0]["body"]["audio"]["content"])
+    assert len(sent) < len(SPEECH.tobytes())
+
+    stats = client.get("/api/diagnostic").get_json()["voice_activity"]
+    assert stats["chunks"] == 2 and stats["skipped"] == 1
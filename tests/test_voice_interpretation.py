@@ -0,0 +1,111 @@
+"""Interprétation N-best des transcriptions (user-024)"""
+
+import io
+
+import pytest
+
+from audio_handler_simple_flask import VoiceRecognitionHandler
+from speech_client_flask import SpeechClient
+
+
+@pytest.fixture
+def handler():
+    return VoiceRecognitionHandler()
+
+
+def test_low_confidence_top_is_rescued_by_alternatives(handler):
+    match = handler.interpret_alternatives(
+        [{"transcript": "boku", "confidence": 0.2}, {"transcript": "beaucoup"}], "1-4"
+    )
+    assert match["score"] == 4
+    assert match["transcript"] == "beaucoup"
+    assert match["confidence"] == pytest.approx(0.456)
+    assert handler.stats["matched"] == 1
+
+
+def test_single_transcript_without_confidence_counts_fully(handler):
+    match = handler.interpret_alternatives([{"transcript": "un peu"}], "1-4")
+    assert match["score"] == 2 and match["confidence"] == 1.0
+
+
+def test_top_without_confidence_is_not_certain_among_alternatives(handler):
+    match = handler.interpret_alternatives([{"transcript": "bla"}, {"transcript": "beaucoup"}], "1-4")
+    assert match["score"] == 4
+    assert match["confidence"] == pytest.approx(0.6 * 0.4)
+
+
+def test_rejected_top_keeps_its_probability_mass(handler):
+    navigation = lambda text: "suivant" not in text
+    match = handler.interpret_alternatives(
+        [{"transcript": "question suivante", "confidence": 0.92}, {"transcript": "beaucoup"}],
+        "1-4",
+        accept=navigation,
+    )
+    assert match["score"] == 4
+    assert match["confidence"] == pytest.approx(0.08 * 0.4)
+
+
+def test_navigation_command_is_not_saved_as_an_answer(app, stub_server):
+    """Régression : « question suivante » (0,92) puis « beaucoup » sans confiance"""
+    server = stub_server(
+        lambda request: (
+            200,
+            {
+                "results": [
+                    {
+                        "alternatives": [
+                            {"transcript": "question suivante", "confidence": 0.92},
+                            {"transcript": "beaucoup"},
+                        ]
+                    }
+                ]
+            },
+        )
+    )
+    app.speech_client = SpeechClient(api_url=f"{server.url}/v1/speech:recognize")
+    client = app.test_client()
+    session_id = client.post(
+        "/api/start_session",
+        json={"initials": "AB", "birth_date": "01/01/1950", "today_date": "01/01/2025"},
+    ).get_json()["session_id"]
+
+    body = client.post(
+        "/api/transcribe_and_score",
+        data={"audio": (io.BytesIO(b"\x1aE\xdf\xa3" * 100), "a.webm"), "session_id": session_id, "question_num": "1"},
+        content_type="multipart/form-data",
+    ).get_json()
+
+    assert body["valid"] is False and body["fallback"] is True
+    assert server.requests[0]["body"]["config"]["maxAlternatives"] == app.config["STT_MAX_ALTERNATIVES"]
+    assert app.db.get_responses(session_id) == []
+
+
+def test_transcribe_chunk_returns_alternatives_for_process_voice(app, stub_server):
+    alternatives = [{"transcript": "boku", "confidence": 0.5}, {"transcript": "beaucoup"}]
+    server = stub_server(lambda request: (200, {"results": [{"alternatives": alternatives}]}))
+    app.speech_client = SpeechClient(api_url=f"{server.url}/v1/speech:recognize")
+    client = app.test_client()
+
+    body = client.post(
+        "/api/transcribe_chunk",
+        data={"audio": (io.BytesIO(b"\x1aE\xdf\xa3" * 100), "a.webm")},
+        content_type="multipart/form-data",
+    ).get_json()
+    assert server.requests[0]["body"]["config"]["maxAlternatives"] == app.config["STT_MAX_ALTERNATIVES"]
+    assert body["transcript"] == "boku"
+    assert [alt["transcript"] for alt in body["alternatives"]] == ["boku", "beaucoup"]
+
+    session_id = client.post(
+        "/api/start_session",
+        json={"initials": "AB", "birth_date": "01/01/1950", "today_date": "01/01/2025"},
+    ).get_json()["session_id"]
+    answer = client.post(
+        "/api/process_voice",
+        json={
+            "session_id": session_id,
+            "question_num": 1,
+            "transcript": body["transcript"],
+            "alternatives": body["alternatives"],
+        },
+    ).get_json()
+    assert answer["valid"] is True and answer["score"] == 4
@@ -0,0 +1,95 @@
+"""File d'écriture différée à commit groupé (user-004)"""
+
+import threading
+from contextlib import contextmanager
+
+from models import database_flask
+from models.database_flask import DatabaseManager
+from models.write_behind_flask import WriteBehindQueue
+
+SESSION = {"initials": "AB", "birth_date": "01/01/1950", "today_date": "01/01/2025"}
+
+
+def test_flush_waits_for_commit_of_earlier_writes():
+    committed = []
+    release = threading.Event()
+
+    @contextmanager
+    def transaction():
+        pending = []
+        yield pending
+        release.wait(5)
+        committed.extend(pending)
+
+    queue = WriteBehindQueue(transaction, max_delay=0.01)
+    try:
+        tickets = [queue.submit(lambda cursor, i=i: cursor.append(i)) for i in range(3)]
+        # COMMIT bloqué : la barrière ne passe pas
+        assert not queue.flush(timeout=0.1)
+        assert committed == [] and not any(ticket.done for ticket in tickets)
+
+        release.set()
+        assert queue.flush(timeout=5)
+        assert committed == [0, 1, 2]
+        assert all(ticket.wait(0) for ticket in tickets)
+        assert queue.stats()["committed"] == 3
+    finally:
+        release.set()
+        queue.close()
+
+
+def test_failed_batch_is_replayed_one_write_at_a_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_flask.atexit, "register", lambda callback: None)
+    db = DatabaseManager(str(tmp_path / "responses.db"), write_behind=True, write_behind_max_delay_ms=500)
+    db.migrate()
+    try:
+        session_id = db.create_session(SESSION)
+
+        def save(question_num, score):
+            return lambda cursor: db._write_response(
+                cursor, session_id, question_num, f"Question {question_num}", score, "R", None, "manual"
+            )
+
+        good = db.write_behind.submit(save(1, 2))
+        bad = db.write_behind.submit(lambda cursor: cursor.execute("INSERT INTO absente VALUES (1)"))
+        after = db.write_behind.submit(save(2, 3))
+        assert db.flush(timeout=5)
+
+        # Le lot entier est annulé, puis chaque écriture est rejouée seule
+        assert good.wait(0) and after.wait(0)
+        assert not bad.wait(0) and "absente" in str(bad.error)
+        assert [(r["question_num"], r["score"]) for r in db.get_responses(session_id)] == [(1, 2), (2, 3)]
+        assert db.get_session_statistics(session_id)["answered"] == 2
+
+        stats = db.get_write_behind_stats()
+        assert (stats["submitted"], stats["committed"], stats["failed"]) == (3, 2, 1)
+        assert (stats["batches"], stats["largest_batch"]) == (1, 3)
+    finally:
+        db.close()
+
+
+def test_exit_handler_drains_pending_writes(tmp_path, monkeypatch):
+    exit_handlers = []
+    monkeypatch.setattr(database_flask.atexit, "register", exit_handlers.append)
+    path = str(tmp_path / "responses.db")
+    # Délai de regroupement long : rien n'est écrit avant l'arrêt
+    db = DatabaseManager(path, write_behind=True, write_behind_max_delay_ms=60_000)
+    db.migrate()
+    assert exit_handlers == [db.close]
+
+    session_id = db.create_session(SESSION)
+    for question_num in range(1, 6):
+        assert db.save_response(session_id, question_num, f"Question {question_num}", 2, "R")
+    db.update_session_completion(session_id)
+
+    # Arrêt du worker (atexit) : la file est vidée avant la fermeture du pool
+    for handler in exit_handlers:
+        handler()
+    assert db.get_write_behind_stats()["committed"] == 6
+
+    reopened = DatabaseManager(path)
+    try:
+        assert len(reopened.get_responses(session_id)) == 5
+        assert reopened.get_session(session_id)["completed_at"] is not None
+    finally:
+        reopened.close()
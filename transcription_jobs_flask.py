@@ -0,0 +1,160 @@
+"""
+Transcriptions asynchrones : exécuteur borné et suivi des tâches
+
+Avec ``--workers 2 --threads 2``, quatre patients attendant l'API
+Speech-to-Text (jusqu'à 10 s) bloquaient tout le service, y compris
+``/api/get_question`` et ``/api/health``. En mode asynchrone,
+``/api/transcribe_chunk`` confie l'appel amont à un pool de threads dédié et
+répond aussitôt avec un identifiant de tâche ; le client interroge
+``/api/transcription_jobs/<id>``.
+
+- Pool borné (``max_workers`` appels amont simultanés) et file bornée
+  (``max_pending`` tâches en attente ou en cours) : au-delà, la soumission
+  est refusée (``TranscriptionQueueFullError``, HTTP 429) plutôt que de
+  laisser l'attente croître sans limite.
+- L'état des tâches est dans SQLite (table ``transcription_jobs``) : le
+  client peut être servi par n'importe quel worker Gunicorn.
+- Profondeur de file, attente avant exécution, durée d'exécution et refus
+  sont comptés (``stats()``, exposé par ``/api/diagnostic``).
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Tuple, Union
+
+
+class TranscriptionQueueFullError(Exception):
+    """Trop de transcriptions en attente ou en cours"""
+
+
+def _percentiles(values) -> Dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50": values[len(values) // 2] * 1000 if values else None,
+        "p95": values[int(len(values) * 0.95)] * 1000 if values else None,
+        "max": values[-1] * 1000 if values else None,
+    }
+
+
+class TranscriptionExecutor:
+    """Pool de threads borné pour les appels Speech-to-Text (``app.transcriptions``)"""
+
+    def __init__(
+        self,
+        db,
+        max_workers: int = 8,
+        max_pending: int = 32,
+        job_ttl: float = 600.0,
+    ):
+        self.db = db
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self.job_ttl = job_ttl
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="transcription"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._last_cleanup = time.monotonic()
+
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "errors": 0,
+            "failed": 0,
+            "rejected": 0,
+            "max_depth": 0,
+        }
+        self._wait_times = deque(maxlen=200)
+        self._run_times = deque(maxlen=200)
+
+    def submit(self, fn: Callable[[], Union[Dict, Tuple[Dict, int]]]) -> str:
+        """Planifie ``fn()`` ; retourne l'id de tâche
+
+        ``fn()`` retourne le résultat JSON, ou ``(résultat, statut HTTP)``
+        comme une route : un statut 4xx/5xx termine la tâche en ``error``
+        (statut conservé) au lieu de ``done``. Lève
+        TranscriptionQueueFullError si ``max_pending`` tâches sont déjà en
+        attente ou en cours.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise TranscriptionQueueFullError(
+                    f"{self._pending} transcriptions déjà en attente"
+                )
+            self._pending += 1
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._pending)
+
+        job_id = str(uuid.uuid4())
+        try:
+            # Tâche visible de tous les workers avant que le client ne l'interroge
+            self.db.create_transcription_job(job_id)
+            self._pool.submit(self._run, job_id, fn, time.perf_counter())
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        self._maybe_cleanup()
+        return job_id
+
+    def _run(self, job_id: str, fn: Callable[[], Dict], enqueued_at: float):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._wait_times.append(started - enqueued_at)
+        try:
+            result, http_status = fn(), 200
+            if isinstance(result, tuple):
+                result, http_status = result
+            status = "done" if http_status < 400 else "error"
+        except Exception as e:
+            print(f"WARNING: Transcription {job_id} en échec: {e}")
+            result, status, http_status = {"error": str(e)}, "failed", 500
+        try:
+            self.db.finish_transcription_job(job_id, status, result, http_status)
+        except Exception as e:
+            print(f"WARNING: Résultat de la transcription {job_id} non enregistré: {e}")
+            status = "failed"
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._stats[{"done": "completed", "error": "errors"}.get(status, "failed")] += 1
+                self._run_times.append(time.perf_counter() - started)
+
+    def _maybe_cleanup(self):
+        # Purge des tâches anciennes au plus une fois par minute
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_cleanup < 60:
+                return
+            self._last_cleanup = now
+        try:
+            self.db.cleanup_transcription_jobs(self.job_ttl)
+        except Exception as e:
+            print(f"WARNING: Purge des transcriptions impossible: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "depth": self._pending,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "wait_ms": _percentiles(self._wait_times),
+                "run_ms": _percentiles(self._run_times),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,173 @@
+"""
+Détection d'activité vocale (VAD) des extraits PCM avant l'appel Speech-to-Text
+
+Les seuls filtres de silence étaient dans le navigateur (taille du blob,
+heuristique ``detectSpeech``) : les extraits qui passaient partaient entiers
+vers l'API payante, et beaucoup revenaient avec ``totalBilledTime: "0s"``.
+Pour les extraits LINEAR16 (WAV PCM 16 bits mono, ou PCM brut avec
+``encoding=LINEAR16``), le serveur analyse lui-même le signal par trames de
+20 ms :
+
+- énergie RMS de chaque trame : au-dessus de ``threshold_db`` (dBFS), la
+  trame est de la parole voisée ;
+- moins de ``min_speech_ms`` de parole voisée (silence, clic, souffle) :
+  l'extrait est ignoré sans appel amont ;
+- taux de passages par zéro : les consonnes sourdes (« s », « f », « ch »)
+  sont faibles en énergie mais riches en passages par zéro. Les trames
+  contiguës à la parole qui dépassent ``zcr_hz`` passages par seconde (et
+  restent au-dessus du bruit de fond) sont rattachées à la parole, pour ne
+  pas couper le début de « souvent » ou la fin de « pas du tout » ;
+- les silences de début et de fin sont retirés (marge ``padding_ms``
+  conservée) avant l'encodage base64.
+
+Extraits ignorés, octets et secondes retirés sont comptés (``stats()``,
+exposé par ``/api/diagnostic``). Les formats compressés (WEBM/Opus de
+l'enregistreur du navigateur) ne sont pas décodés : ils passent tels quels.
+"""
+
+import io
+import threading
+import wave
+from typing import Dict, Optional
+
+import numpy as np
+
+FRAME_MS = 20
+
+
+def decode_pcm(data: bytes, encoding: Optional[str] = None, sample_rate: Optional[int] = None):
+    """(échantillons int16, fréquence) d'un extrait LINEAR16, None si compressé
+
+    Lève ValueError pour un WAV qui n'est pas en PCM 16 bits mono.
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            with wave.open(io.BytesIO(data), "rb") as wav:
+                if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                    raise ValueError("WAV PCM 16 bits mono attendu")
+                rate = wav.getframerate()
+                frames = wav.readframes(wav.getnframes())
+        except (wave.Error, EOFError) as e:
+            raise ValueError(f"WAV illisible: {e}")
+        return np.frombuffer(frames, dtype="<i2"), rate
+
+    if (encoding or "").upper() == "LINEAR16":
+        # Octet final isolé (extrait coupé) ignoré
+        return np.frombuffer(data[: len(data) // 2 * 2], dtype="<i2"), int(sample_rate or 16000)
+    return None
+
+
+class VoiceActivityDetector:
+    """VAD énergie + passages par zéro, partagé par les threads (``app.voice_activity``)"""
+
+    def __init__(
+        self,
+        threshold_db: float = -45.0,
+        min_speech_ms: int = 100,
+        padding_ms: int = 150,
+        zcr_hz: float = 3000.0,
+        max_unvoiced_ms: int = 250,
+    ):
+        self.threshold_db = threshold_db
+        self.min_speech_ms = min_speech_ms
+        self.padding_ms = padding_ms
+        self.zcr_hz = zcr_hz
+        self.max_unvoiced_ms = max_unvoiced_ms
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "chunks": 0,
+            "skipped": 0,
+            "trimmed": 0,
+            "bytes_in": 0,
+            "bytes_sent": 0,
+            "bytes_skipped": 0,
+            "bytes_trimmed": 0,
+            "seconds_skipped": 0.0,
+            "seconds_trimmed": 0.0,
+        }
+
+    def speech_bounds(self, samples: np.ndarray, rate: int) -> Optional[tuple]:
+        """(début, fin) de la parole en échantillons, None si aucune parole"""
+        frame = max(1, rate * FRAME_MS // 1000)
+        count = len(samples) // frame
+        if not count:
+            return None
+
+        frames = samples[: count * frame].astype(np.float64).reshape(count, frame)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        # Passages par zéro par seconde (indépendant de la fréquence d'échantillonnage)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) * rate / frame
+
+        threshold = 32768 * 10 ** (self.threshold_db / 20)
+        voiced = np.flatnonzero(rms > threshold)
+        if len(voiced) * FRAME_MS < self.min_speech_ms:
+            return None
+
+        # Consonnes sourdes autour de la parole : énergie au-dessus du bruit
+        # de fond (10e centile), passages par zéro nombreux
+        floor = np.percentile(rms, 10) * 2
+        unvoiced = (zcr > self.zcr_hz) & (rms > floor)
+        first, last = int(voiced[0]), int(voiced[-1])
+        limit = self.max_unvoiced_ms // FRAME_MS
+        steps = 0
+        while first > 0 and steps < limit and unvoiced[first - 1]:
+            first -= 1
+            steps += 1
+        steps = 0
+        while last < count - 1 and steps < limit and unvoiced[last + 1]:
+            last += 1
+            steps += 1
+
+        padding = rate * self.padding_ms // 1000
+        start = max(0, first * frame - padding)
+        end = min(len(samples), (last + 1) * frame + padding)
+        # Dernière trame incomplète : conservée si la parole va jusqu'au bout
+        if last == count - 1:
+            end = len(samples)
+        return start, end
+
+    def process(self, data: bytes, encoding: Optional[str] = None, sample_rate: Optional[int] = None) -> Optional[Dict]:
+        """Analyse un extrait ; None s'il est compressé (envoyé tel quel)
+
+        Sinon ``{"speech", "content", "sample_rate"}`` : ``content`` est le
+        PCM brut (sans en-tête WAV) réduit à la parole, vide si l'extrait
+        est à ignorer. Lève ValueError pour un WAV non pris en charge.
+        """
+        decoded = decode_pcm(data, encoding, sample_rate)
+        if decoded is None:
+            return None
+        samples, rate = decoded
+
+        bounds = self.speech_bounds(samples, rate)
+        duration = len(samples) / rate if rate else 0.0
+        with self._lock:
+            self._stats["chunks"] += 1
+            self._stats["bytes_in"] += len(data)
+            if bounds is None:
+                self._stats["skipped"] += 1
+                self._stats["bytes_skipped"] += len(data)
+                self._stats["seconds_skipped"] += duration
+            else:
+                kept = bounds[1] - bounds[0]
+                self._stats["bytes_sent"] += kept * 2
+                self._stats["bytes_trimmed"] += len(data) - kept * 2
+                if kept < len(samples):
+                    self._stats["trimmed"] += 1
+                    self._stats["seconds_trimmed"] += (len(samples) - kept) / rate
+
+        if bounds is None:
+            return {"speech": False, "content": b"", "sample_rate": rate}
+        return {
+            "speech": True,
+            "content": samples[bounds[0] : bounds[1]].tobytes(),
+            "sample_rate": rate,
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["seconds_skipped"] = round(stats["seconds_skipped"], 2)
+        stats["seconds_trimmed"] = round(stats["seconds_trimmed"], 2)
+        return stats